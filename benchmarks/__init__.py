@@ -0,0 +1,13 @@
+import os
+import sys
+
+# ===========================
+#      基准测试包
+# ===========================
+# 用法 (在仓库根目录执行): python -m benchmarks.run_benchmarks --sizes 1k 100k
+# 与 case_viewer/main.py 相同，把项目根目录、change_evalout 与 case_viewer 加入 sys.path，
+# 使 tool2 / tool3 模块内部的 sibling import 可以正常工作。
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _path in (project_root, os.path.join(project_root, "change_evalout"), os.path.join(project_root, "case_viewer")):
+    if os.path.exists(_path) and _path not in sys.path:
+        sys.path.append(_path)
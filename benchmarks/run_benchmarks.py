@@ -0,0 +1,268 @@
+import os
+import sys
+import gc
+import json
+import time
+import shutil
+import platform
+import argparse
+import subprocess
+import tempfile
+from datetime import datetime
+import pandas as pd
+from change_evalout import change_module
+from change_evalout import path_prefix
+from change_evalout import table_io
+import load_cache  # load_data 的磁盘快照缓存
+import search_utils  # Index 哈希表查找与全文搜索
+import dataset_registry  # 数据集登记表
+from benchmarks import synthetic
+
+# ===========================
+#      配置区域
+# ===========================
+DEFAULT_SIZES = ["1k", "100k", "1M"]
+
+# 超过该行数时不生成 xlsx 原始文件 (xlsx 单表上限约 104 万行，且百万行写入需要数十分钟)，
+# 转换阶段改为计时内存中的 add_prefix_to_df + 列式写出
+DEFAULT_XLSX_MAX_ROWS = 100000
+
+# 查看器每页条数 (与 tool3_show_* 一致)
+ITEMS_PER_PAGE = 10
+
+# 图片根目录只参与字符串拼接，不需要真实存在
+BENCH_LMU_DATA_PATH = "/bench/LMUData"
+
+
+def time_call(fn, repeat=1):
+    """
+    多次执行并取最短耗时 (排除偶发的 GC / IO 抖动)
+
+    Returns:
+        tuple: (最后一次的返回值, 最短耗时秒数)
+    """
+    best = None
+    result = None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def git_commit():
+    """当前仓库的 commit (无法获取时返回 None)"""
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_dataset(dataset, rows, work_dir, output_formats, xlsx_max_rows, repeat, seed):
+    """
+    对一个数据集、一种行数执行全部计时
+
+    阶段:
+        generate        生成合成数据 (不属于被测代码，仅供参考)
+        write_raw       写出 xlsx 原始文件 (行数不超过 xlsx_max_rows 时)
+        convert         tool2 模块的 add_prefix_to_xlsx (读取 xlsx + 改写路径 + 按输出格式保存)
+        prefix          内存中的 add_prefix_to_df (虚拟模式同样走这条路径，含一次 DataFrame 复制)
+        write_output    按输出格式保存转换结果
+        load            查看器的 _load_data (读取 + 预处理)
+        load_snapshot   load_cache.cached_load 命中磁盘快照时的加载
+        filter_hit      按 Hit 过滤
+        index_build     构建 index 哈希表；index_lookup 查询 20 个 index
+        text_build      构建整词搜索的倒排索引；text_search 一次整词查询；text_substring 一次子串查询
+        page_slice      首页 / 中间页 / 末页的切片与 image_path 拆分 (三页平均)
+
+    Returns:
+        dict: {"dataset", "rows", "timings": {阶段: 秒}, "bytes": {文件: 大小}, "notes": [...]}
+    """
+    result = {"dataset": dataset, "rows": rows, "timings": {}, "bytes": {}, "notes": []}
+    timings = result["timings"]
+    filename, config = synthetic.get_file_config(dataset)
+    module_name = change_module.tool_module_name(config["module"])
+    tool_module = change_module.load_tool_module(module_name)
+    prefix_path = change_module.build_prefix_path(BENCH_LMU_DATA_PATH, config["folder"])
+    viewer = dataset_registry.get_viewer_module(dataset)
+
+    raw_dir = os.path.join(work_dir, "raw")
+    out_dir = os.path.join(work_dir, "for_check")
+    os.makedirs(raw_dir, exist_ok=True)
+    os.makedirs(out_dir, exist_ok=True)
+    raw_file = os.path.join(raw_dir, filename)
+    out_file = os.path.join(out_dir, filename)
+
+    df_raw, timings["generate"] = time_call(lambda: synthetic.generate_frame(dataset, rows, seed))
+
+    # --- 转换 ---
+    if rows <= xlsx_max_rows:
+        _, timings["write_raw"] = time_call(lambda: df_raw.to_excel(raw_file, index=False))
+        result["bytes"]["raw_xlsx"] = os.path.getsize(raw_file)
+        ok, timings["convert"] = time_call(lambda: tool_module.add_prefix_to_xlsx(raw_file, out_file, prefix_path, output_formats))
+        if not ok:
+            result["notes"].append("add_prefix_to_xlsx 返回失败")
+    else:
+        result["notes"].append(f"行数超过 {xlsx_max_rows}，跳过 xlsx 原始文件与 convert 阶段")
+
+    df_converted, timings["prefix"] = time_call(lambda: tool_module.add_prefix_to_df(df_raw.copy(), prefix_path), repeat)
+    written, timings["write_output"] = time_call(lambda: table_io.write_table(df_converted, out_file, output_formats))
+    for path in written:
+        result["bytes"][os.path.basename(path)] = os.path.getsize(path)
+    del df_raw, df_converted
+    gc.collect()
+
+    # --- 加载 ---
+    (df, error_msg), timings["load"] = time_call(lambda: viewer._load_data(out_file), repeat)
+    if error_msg:
+        result["notes"].append(f"加载失败: {error_msg}")
+        return result
+
+    options = {"columns": viewer.LOAD_COLS, "path_rewrite": None}
+    load_cache.cached_load(lambda: (df, None), out_file, dataset, options)
+    _, timings["load_snapshot"] = time_call(lambda: load_cache.cached_load(lambda: (df, None), out_file, dataset, options), repeat)
+
+    # --- 过滤与搜索 ---
+    hit_values = [df['hit'].iloc[0]] if len(df) else []
+    df_display, timings["filter_hit"] = time_call(lambda: df[df['hit'].isin(hit_values)], repeat)
+
+    index_map, timings["index_build"] = time_call(lambda: search_utils.build_index_map(df['index']), repeat)
+    step = max(1, len(df) // 20)
+    query = ", ".join(df['index'].iloc[::step].head(20))
+    _, timings["index_lookup"] = time_call(lambda: search_utils.lookup_indices(df, index_map, search_utils.parse_index_query(query)), repeat)
+
+    # 第一次 get_text_index 构建并缓存倒排索引，之后的整词搜索直接命中缓存；子串搜索每次扫描各列
+    cache_key = ("bench", dataset, rows)
+    _, timings["text_build"] = time_call(lambda: search_utils.get_text_index(df, cache_key))
+    _, timings["text_search"] = time_call(lambda: search_utils.text_search(df, "the final answer", cache_key, mode=search_utils.MODE_WORD), repeat)
+    _, timings["text_substring"] = time_call(lambda: search_utils.text_search(df, "the final answer"), repeat)
+
+    # --- 分页切片 ---
+    total_pages = max(1, (len(df_display) - 1) // ITEMS_PER_PAGE + 1)
+
+    def slice_pages():
+        for page in (0, total_pages // 2, total_pages - 1):
+            batch = df_display.iloc[page * ITEMS_PER_PAGE:(page + 1) * ITEMS_PER_PAGE]
+            path_prefix.split_image_paths(batch['image_path'])
+
+    _, elapsed = time_call(slice_pages, repeat)
+    timings["page_slice"] = elapsed / 3
+    return result
+
+
+def run_benchmarks(sizes, datasets=None, work_dir=None, output_formats=("parquet",),
+                   xlsx_max_rows=DEFAULT_XLSX_MAX_ROWS, repeat=3, seed=0, keep_files=False):
+    """
+    对每种行数、每个数据集执行基准测试
+
+    Args:
+        sizes (list): 行数列表 (如 [1000, 100000])
+        datasets (list, optional): 数据集名称，None 表示全部
+        work_dir (str, optional): 合成文件目录，None 时使用临时目录
+        output_formats (tuple): 转换输出格式
+        xlsx_max_rows (int): 生成 xlsx 原始文件的最大行数
+        repeat (int): 内存中的阶段重复次数 (取最短耗时)
+        seed (int): 随机种子
+        keep_files (bool): 是否保留合成文件
+
+    Returns:
+        dict: {"meta": 环境信息, "results": [bench_dataset 的返回值, ...]}
+    """
+    datasets = datasets or synthetic.list_datasets()
+    owns_work_dir = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix="vlm_bench_")
+    # 磁盘快照写入工作目录，不污染查看器的缓存目录
+    os.environ[load_cache.LOAD_CACHE_ENV] = os.path.join(work_dir, "load_cache")
+
+    report = {
+        "meta": {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": sys.version.split()[0],
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "sizes": sizes,
+            "output_formats": list(output_formats),
+            "xlsx_max_rows": xlsx_max_rows,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": [],
+    }
+    try:
+        for rows in sizes:
+            for dataset in datasets:
+                print(f"[基准测试] {dataset} × {rows} 行")
+                try:
+                    entry = bench_dataset(dataset, rows, os.path.join(work_dir, f"{rows}"), output_formats, xlsx_max_rows, repeat, seed)
+                except Exception as e:
+                    entry = {"dataset": dataset, "rows": rows, "timings": {}, "bytes": {}, "notes": [f"异常: {e}"]}
+                report["results"].append(entry)
+                summary = ", ".join(f"{k}={v * 1000:.1f}ms" for k, v in entry["timings"].items())
+                print(f"  - {summary}" + (f" ({'; '.join(entry['notes'])})" if entry["notes"] else ""))
+    finally:
+        if owns_work_dir and not keep_files:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return report
+
+
+def compare_reports(current, baseline):
+    """
+    按 (数据集, 行数, 阶段) 对比两份结果
+
+    Returns:
+        list: [(数据集, 行数, 阶段, 基线秒数, 当前秒数, 当前 / 基线)]
+    """
+    base = {(r["dataset"], r["rows"]): r["timings"] for r in baseline["results"]}
+    rows = []
+    for r in current["results"]:
+        base_timings = base.get((r["dataset"], r["rows"]), {})
+        for phase, seconds in r["timings"].items():
+            if phase in base_timings and base_timings[phase] > 0:
+                rows.append((r["dataset"], r["rows"], phase, base_timings[phase], seconds, seconds / base_timings[phase]))
+    return rows
+
+
+__all__ = [
+    'time_call',
+    'bench_dataset',
+    'run_benchmarks',
+    'compare_reports',
+]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="用合成评测结果对格式转换与查看器加载、过滤、分页进行基准测试")
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES, help="行数，支持 1k / 100k / 1M 写法")
+    parser.add_argument("--datasets", nargs="+", default=None, help="只测试这些数据集，默认全部")
+    parser.add_argument("--formats", default="parquet", help="转换输出格式，如 parquet 或 xlsx+parquet")
+    parser.add_argument("--xlsx-max-rows", type=int, default=DEFAULT_XLSX_MAX_ROWS, help="生成 xlsx 原始文件 (并计时 convert) 的最大行数")
+    parser.add_argument("--repeat", type=int, default=3, help="内存中的阶段重复次数，取最短耗时")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--work-dir", default=None, help="合成文件目录，默认使用临时目录并在结束后删除")
+    parser.add_argument("--keep-files", action="store_true", help="保留合成文件")
+    parser.add_argument("-o", "--output", default=None, help="结果 JSON 路径，默认 benchmark_<commit>_<时间>.json")
+    parser.add_argument("--baseline", default=None, help="基线结果 JSON，给出时打印各阶段的耗时比值")
+    args = parser.parse_args()
+
+    report = run_benchmarks(
+        [synthetic.parse_size(s) for s in args.sizes], args.datasets, args.work_dir,
+        table_io.normalize_output_formats(args.formats), args.xlsx_max_rows, args.repeat, args.seed, args.keep_files,
+    )
+
+    output = args.output or f"benchmark_{(report['meta']['commit'] or 'nogit')[:8]}_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存: {output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"{'数据集':<12} {'行数':>8} {'阶段':<14} {'基线 ms':>10} {'当前 ms':>10} {'比值':>7}")
+        for dataset, rows, phase, before, after, ratio in compare_reports(report, baseline):
+            flag = "  ⚠️" if ratio > 1.2 else ""
+            print(f"{dataset:<12} {rows:>8} {phase:<14} {before * 1000:>10.1f} {after * 1000:>10.1f} {ratio:>6.2f}x{flag}")
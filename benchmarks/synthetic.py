@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+from change_evalout import change_module
+import dataset_registry
+
+# ===========================
+#      合成评测结果生成
+# ===========================
+# 按 dataset_registry 中各数据集的必要列 / 加载列生成与原始评测结果 (格式转换前) 结构一致的数据：
+# 选项列 A-I、列表形式的 image_path、长 prediction (思维链) 等都与真实文件一致，
+# 转换、加载、过滤各环节走的都是真实代码路径。
+
+OPTION_COLS = dataset_registry.OPTION_COLS
+
+# 答案为候选列表字符串的数据集 (如 "['foo', 'bar']")
+LIST_ANSWER_DATASETS = ("DocVQA", "OCRBench")
+# 原始 image_path 可能为多图列表的数据集及多图行的比例
+MULTI_IMAGE_DATASETS = {"MMMU": 0.15}
+# 原始 image_path 为相对路径的数据集 (其它数据集的图片路径由 index / id 生成，原始值不参与转换)
+RELATIVE_IMAGE_DATASETS = {"AI2D": "images/", "DocVQA": "documents/"}
+
+# prediction 文本池大小与平均长度 (字符)；从池中抽样，避免百万行时逐行生成长字符串
+PREDICTION_POOL_SIZE = 4096
+DEFAULT_PREDICTION_CHARS = 1500
+
+_WORDS = np.array(
+    "the model first reads the chart then compares each bar with the axis label and computes "
+    "the difference step by step so the final answer should be option because value area angle "
+    "triangle circle sum ratio percent year total image shows text document page table".split()
+)
+
+
+def list_datasets():
+    """全部数据集名称 (dataset_registry.DATASETS，与 case_viewer/main.py 一致)"""
+    return list(dataset_registry.DATASETS)
+
+
+def get_file_config(dataset, model_prefix="bench"):
+    """
+    查找数据集的原始文件名与转换配置
+
+    Returns:
+        tuple: (文件名, {"module", "folder"})
+    """
+    for filename, config in change_module.create_file_config(model_prefix).items():
+        if change_module.tool_module_name(config["module"]).endswith(f"_{dataset}"):
+            return filename, config
+    raise ValueError(f"未知的数据集: {dataset}")
+
+
+def get_schema(dataset):
+    """
+    数据集的列结构 (取自 dataset_registry)
+
+    Returns:
+        dict: {"required": 必要列, "columns": 需要生成的全部列}
+    """
+    required = dataset_registry.required_cols(dataset)
+    columns = list(dict.fromkeys(required + dataset_registry.load_cols(dataset)))
+    # hit 不在必要列中的数据集 (ChartQA / DocVQA) 原始文件没有 hit 列，由查看器计算
+    if "hit" not in required:
+        columns.remove("hit")
+    return {"required": list(required), "columns": columns}
+
+
+def _sentences(rng, n, n_words):
+    """生成 n 条由 n_words 个随机单词组成的文本"""
+    words = _WORDS[rng.integers(0, len(_WORDS), size=(n, n_words))]
+    return [" ".join(row) for row in words]
+
+
+def _text_pool(rng, size, mean_chars):
+    """长文本池，长度在平均值的 0.2 ~ 1.8 倍之间均匀分布"""
+    pool = []
+    for n_chars in rng.integers(int(mean_chars * 0.2), int(mean_chars * 1.8) + 1, size=size):
+        n_words = max(1, int(n_chars) // 6)
+        pool.append(" ".join(_WORDS[rng.integers(0, len(_WORDS), size=n_words)]))
+    return np.array(pool, dtype=object)
+
+
+def generate_frame(dataset, rows, seed=0, prediction_chars=DEFAULT_PREDICTION_CHARS):
+    """
+    生成一个数据集的合成原始评测结果
+
+    Args:
+        dataset (str): 数据集名称
+        rows (int): 行数
+        seed (int): 随机种子 (相同参数生成相同数据)
+        prediction_chars (int): prediction 的平均长度
+
+    Returns:
+        pd.DataFrame: 合成数据
+    """
+    rng = np.random.default_rng(seed)
+    columns = get_schema(dataset)["columns"]
+    index = np.arange(rows)
+    data = {}
+
+    question_pool = np.array(_sentences(rng, 512, 24), dtype=object)
+    short_pool = np.array(_sentences(rng, 256, 2), dtype=object)
+    prediction_pool = _text_pool(rng, PREDICTION_POOL_SIZE, prediction_chars)
+
+    option_cols = [c for c in OPTION_COLS if c in columns]
+    # 每行的选项个数：必要列中的选项 (如 AI2D 的 A-D) 始终存在，其余选项随机缺失
+    n_options = rng.integers(2, len(option_cols) + 1, size=rows) if option_cols else None
+    required_options = [c for c in option_cols if c in get_schema(dataset)["required"]]
+    option_pool = np.array(_sentences(rng, 512, 6), dtype=object)
+
+    for col in columns:
+        if col == "index":
+            data[col] = index
+        elif col == "question":
+            data[col] = question_pool[rng.integers(0, len(question_pool), size=rows)]
+        elif col in option_cols:
+            pos = option_cols.index(col)
+            values = option_pool[rng.integers(0, len(option_pool), size=rows)]
+            if col not in required_options:
+                values = np.where(pos < n_options, values, None)
+            data[col] = values
+        elif col == "answer":
+            if option_cols:
+                n = n_options if not required_options else np.maximum(n_options, len(required_options))
+                data[col] = np.array(option_cols)[rng.integers(0, 1 << 30, size=rows) % n]
+            elif dataset in LIST_ANSWER_DATASETS:
+                answers = short_pool[rng.integers(0, len(short_pool), size=rows)]
+                data[col] = np.array([f"['{a}', '{a.upper()}']" for a in answers], dtype=object)
+            else:
+                data[col] = rng.integers(0, 1000, size=rows).astype(str)
+        elif col == "prediction":
+            data[col] = prediction_pool[rng.integers(0, len(prediction_pool), size=rows)]
+        elif col == "hit":
+            data[col] = (rng.random(rows) < 0.6).astype(int)
+        elif col in ("res", "extract"):
+            data[col] = short_pool[rng.integers(0, len(short_pool), size=rows)]
+        elif col == "id":
+            data[col] = np.array([f"id_{i}" for i in index], dtype=object)
+        elif col == "image_path":
+            data[col] = _image_paths(dataset, index, rng)
+        else:
+            data[col] = short_pool[rng.integers(0, len(short_pool), size=rows)]
+
+    df = pd.DataFrame(data)
+    # 模型预测与答案一致的行 (exact match 为真)，保证 ChartQA / DocVQA 计算出的 hit 有正有负
+    if "answer" in df.columns and not option_cols:
+        matched = rng.random(rows) < 0.5
+        df.loc[matched, "prediction"] = df.loc[matched, "answer"].str.strip("[]").str.split(",").str[0].str.strip(" '")
+    return df
+
+
+def _image_paths(dataset, index, rng):
+    """生成原始 image_path 列 (单图相对路径、文件名，或列表形式的字符串)"""
+    names = np.array([f"{i}.png" for i in index], dtype=object)
+    if dataset in RELATIVE_IMAGE_DATASETS:
+        return RELATIVE_IMAGE_DATASETS[dataset] + names
+    if dataset in MULTI_IMAGE_DATASETS:
+        multi = rng.random(len(index)) < MULTI_IMAGE_DATASETS[dataset]
+        paths = names.copy()
+        for pos in np.flatnonzero(multi):
+            paths[pos] = str([f"{index[pos]}_{k}.png" for k in range(1, 3)])
+        return paths
+    return names
+
+
+def parse_size(text):
+    """解析行数写法: 1000 / 1k / 100k / 1M"""
+    text = str(text).strip().lower()
+    units = {"k": 1000, "m": 1000000}
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+__all__ = [
+    'list_datasets',
+    'get_file_config',
+    'get_schema',
+    'generate_frame',
+    'parse_size',
+]
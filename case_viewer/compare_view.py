@@ -0,0 +1,211 @@
+import streamlit as st
+import pandas as pd
+import os
+import importlib
+from change_evalout import path_prefix
+import image_utils  # 图片读取 (PIL 延迟导入) 与图片存在性索引
+import load_cache  # load_data 的磁盘快照缓存
+import search_utils  # Index 哈希表查找与全文搜索
+import shared_store  # 进程内共享的数据与派生索引
+
+# ===========================
+#      配置区域
+# ===========================
+# 对比的两侧：A 为当前文件夹 (新 checkpoint)，B 为基线文件夹
+STATUS_REGRESSED = "📉 退化 (hit → miss)"
+STATUS_IMPROVED = "📈 改进 (miss → hit)"
+STATUS_STABLE_HIT = "✅ 均正确"
+STATUS_STABLE_MISS = "❌ 均错误"
+STATUS_OPTIONS = [STATUS_REGRESSED, STATUS_IMPROVED, STATUS_STABLE_HIT, STATUS_STABLE_MISS]
+
+# 两侧共有的展示列 (取自 A)
+SHARED_COLS = ["index", "question", "answer", "image_path"]
+# 每侧各自的列 (res / extract 为部分数据集的答案抽取结果，存在时一并展示)
+SIDE_COLS = ["prediction", "hit", "res", "extract"]
+
+ITEMS_PER_PAGE = 10
+
+
+def _as_bool(series):
+    """hit 列可能是 bool / 0-1 / 字符串，统一转为 bool"""
+    if series.dtype == bool:
+        return series
+    return pd.to_numeric(series, errors='coerce').fillna(0) > 0
+
+
+# 1. 加载并连接两次评测结果
+def load_compare(viewer_module, path_a, path_b, path_rewrite=None, token_a=None, token_b=None):
+    """
+    用同一个查看器的 load_data 加载两侧文件，并按 index 连接
+
+    B 侧先按 index 建立索引 (重复的 index 只保留第一条)，连接为哈希查找；
+    结果在进程内共享 (所有会话共用一份)，切换过滤条件时不需要重新连接。
+
+    Args:
+        viewer_module (str): 查看器模块名 (如 "tool3_show_DocVQA")，保证两侧预处理一致
+        path_a (str): 当前文件路径
+        path_b (str): 基线文件路径
+        path_rewrite (tuple, optional): 虚拟模式的路径改写规则
+        token_a / token_b (tuple, optional): 两侧文件标识，文件修改后缓存失效
+
+    Returns:
+        tuple: (连接结果 df, 统计信息 dict, 错误信息)
+    """
+    cache_key = (viewer_module, path_a, path_b, path_rewrite, token_a, token_b)
+    return shared_store.get_derived(
+        "compare", cache_key,
+        lambda: _join_runs(viewer_module, path_a, path_b, path_rewrite, token_a, token_b),
+    )
+
+
+def _join_runs(viewer_module, path_a, path_b, path_rewrite, token_a, token_b):
+    """load_compare 的实际加载与连接逻辑"""
+    module = importlib.import_module(viewer_module)
+    df_a, error_msg = module.load_data(path_a, path_rewrite, token_a)
+    if error_msg:
+        return None, None, f"当前文件读取失败: {error_msg}"
+    df_b, error_msg = module.load_data(path_b, path_rewrite, token_b)
+    if error_msg:
+        return None, None, f"基线文件读取失败: {error_msg}"
+
+    side_cols = [c for c in SIDE_COLS if c in df_a.columns and c in df_b.columns]
+    left = df_a[[c for c in SHARED_COLS if c in df_a.columns] + side_cols].drop_duplicates('index')
+    right = df_b[['index'] + side_cols].drop_duplicates('index').set_index('index')
+
+    joined = left.join(right, on='index', how='inner', lsuffix='_a', rsuffix='_b').reset_index(drop=True)
+    hit_a = _as_bool(joined['hit_a'])
+    hit_b = _as_bool(joined['hit_b'])
+    joined['hit_a'] = hit_a
+    joined['hit_b'] = hit_b
+
+    status = pd.Series(STATUS_STABLE_MISS, index=joined.index)
+    status[hit_a & hit_b] = STATUS_STABLE_HIT
+    status[hit_a & ~hit_b] = STATUS_IMPROVED
+    status[~hit_a & hit_b] = STATUS_REGRESSED
+    joined['status'] = pd.Categorical(status, categories=STATUS_OPTIONS)
+
+    stats = {
+        "only_a": len(left) - len(joined),
+        "only_b": len(right) - len(joined),
+        "counts": joined['status'].value_counts().to_dict(),
+        "acc_a": float(hit_a.mean()) if len(joined) else 0.0,
+        "acc_b": float(hit_b.mean()) if len(joined) else 0.0,
+    }
+    return joined, stats, None
+
+
+def _render_side(row, side, title):
+    """展示一侧的预测结果"""
+    is_hit = bool(row[f'hit_{side}'])
+    st.caption(f"{title} {'✅' if is_hit else '❌'}")
+    short = next((row[f'{c}_{side}'] for c in ("res", "extract") if f'{c}_{side}' in row.index), None)
+    text = f"**Res:** {short}" if short is not None else str(row[f'prediction_{side}'])
+    if is_hit:
+        st.success(text)
+    else:
+        st.error(text)
+    if short is not None:
+        with st.expander("完整模型输出"):
+            st.code(str(row[f'prediction_{side}']), language="text", wrap_lines=True)
+
+
+# ===========================
+#      模块主入口函数
+# ===========================
+def run(viewer_module, path_a, path_b, path_rewrite=None):
+
+    prefix = "compare"
+
+    token_a = load_cache.file_token(path_a)
+    token_b = load_cache.file_token(path_b)
+    with st.spinner("正在加载并连接两次评测结果..."):
+        df, stats, error_msg = load_compare(viewer_module, path_a, path_b, path_rewrite, token_a, token_b)
+    if error_msg:
+        st.error(f"❌ {error_msg}")
+        return
+
+    st.title("🆚 Checkpoint 对比")
+    st.caption(f"当前: `{os.path.basename(os.path.dirname(path_a))}`  ·  基线: `{os.path.basename(os.path.dirname(path_b))}`")
+
+    # --- 统计 ---
+    m1, m2, m3, m4, m5 = st.columns(5)
+    m1.metric("准确率 (当前)", f"{stats['acc_a']:.2%}", f"{stats['acc_a'] - stats['acc_b']:+.2%}")
+    m2.metric("准确率 (基线)", f"{stats['acc_b']:.2%}")
+    m3.metric("退化", stats['counts'].get(STATUS_REGRESSED, 0))
+    m4.metric("改进", stats['counts'].get(STATUS_IMPROVED, 0))
+    m5.metric("未变化", stats['counts'].get(STATUS_STABLE_HIT, 0) + stats['counts'].get(STATUS_STABLE_MISS, 0))
+    if stats['only_a'] or stats['only_b']:
+        st.caption(f"仅当前存在 {stats['only_a']} 条，仅基线存在 {stats['only_b']} 条 (未参与对比)")
+
+    # --- 侧边栏过滤 ---
+    st.sidebar.divider()
+    filter_status = st.sidebar.multiselect(
+        "对比状态过滤",
+        options=STATUS_OPTIONS,
+        default=[STATUS_REGRESSED, STATUS_IMPROVED],
+        key=f"{prefix}_filter_status"
+    )
+
+    col_search, _ = st.columns([1, 2])
+    with col_search:
+        search_query = st.text_input("🔍 按 Index 搜索", key=f"{prefix}_search_input", placeholder="输入 Index ID，支持多个或范围，如 1, 5, 10-20")
+
+    if search_query:
+        index_map = search_utils.get_index_map(df['index'], cache_key=("compare", token_a, token_b, path_rewrite))
+        df_display, not_found = search_utils.lookup_indices(df, index_map, search_utils.parse_index_query(search_query))
+        if not_found:
+            st.warning(search_utils.format_not_found(not_found))
+    else:
+        df_display = df[df['status'].isin(filter_status)]
+
+    st.sidebar.markdown(f"**展示:** {len(df_display)} / {len(df)} 条")
+
+    # --- 分页 (过滤条件变化时回到第一页) ---
+    total_pages = max(1, (len(df_display) - 1) // ITEMS_PER_PAGE + 1)
+    page_key = f"{prefix}_page_input"
+    filter_key = f"{prefix}_last_filter"
+    current_filter = (search_query, tuple(filter_status), token_a, token_b)
+    if st.session_state.get(filter_key) != current_filter or st.session_state.get(page_key, 1) > total_pages:
+        st.session_state[filter_key] = current_filter
+        st.session_state[page_key] = 1
+
+    c1, c2 = st.columns([1, 4])
+    with c1:
+        current_page = st.number_input("Page", min_value=1, max_value=total_pages, key=page_key, label_visibility="collapsed")
+    with c2:
+        st.markdown(f"<div style='padding-top: 8px; font-weight: bold;'>/ {total_pages} 页</div>", unsafe_allow_html=True)
+
+    start_idx = (current_page - 1) * ITEMS_PER_PAGE
+    current_batch = df_display.iloc[start_idx:start_idx + ITEMS_PER_PAGE]
+    image_utils.prefetch_pages(df_display['image_path'], start_idx, ITEMS_PER_PAGE)
+
+    if current_batch.empty:
+        st.info("当前过滤条件下无数据。")
+
+    # --- 列表内容 ---
+    batch_images = path_prefix.split_image_paths(current_batch['image_path'])
+    for idx, row in current_batch.iterrows():
+        with st.container(border=True):
+            col_img, col_text = st.columns([1, 2])
+
+            with col_img:
+                image_paths = [p for p in batch_images[idx] if p.lower() != 'nan']
+                for img_path in image_paths:
+                    if image_utils.image_exists(img_path):
+                        try:
+                            st.image(image_utils.image_source(image_utils.default_display_path(img_path)), caption=os.path.basename(img_path), use_container_width=True)
+                        except Exception as e:
+                            st.error(f"Image Error: {e}")
+                    else:
+                        st.warning(f"图片缺失: {img_path}")
+
+            with col_text:
+                st.markdown(f"<h4 style='margin:0;'>Index: {row['index']} &nbsp;&nbsp; {row['status']}</h4>", unsafe_allow_html=True)
+                st.markdown(f"**Q:** {row['question']}")
+                st.info(f"**Standard Answer:** {row['answer']}")
+
+                c_a, c_b = st.columns(2)
+                with c_a:
+                    _render_side(row, "a", "当前")
+                with c_b:
+                    _render_side(row, "b", "基线")
@@ -0,0 +1,197 @@
+import streamlit as st
+import pandas as pd
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from change_evalout import change_module
+from change_evalout import table_io
+from change_evalout import hit_rules  # 没有 hit 列时按查看器的规则计算
+import image_utils  # 图片读取 (PIL 延迟导入) 与图片存在性索引
+import load_cache  # load_data 的磁盘快照缓存
+
+# ===========================
+#      配置区域
+# ===========================
+# 统计结果保存在数据文件夹 (_for_check) 中，文件和统计参数都没变时直接复用
+SUMMARY_FILENAME = ".dashboard_summary.json"
+
+# 统计逻辑版本号：修改 summarize_file 后需要递增，使已有的统计结果失效
+SUMMARY_VERSION = 2
+
+
+def summarize_file(file_path, required_cols, path_rewrite=None, dataset=None):
+    """
+    统计单个结果文件 (在子进程中执行)
+
+    只读取表头判断缺失列，数据只读取 hit / image_path 等统计需要的列。
+
+    Args:
+        file_path (str): 结果文件路径
+        required_cols (list): 对应查看器的必要列
+        path_rewrite (tuple, optional): 虚拟模式的路径改写规则
+        dataset (str, optional): 数据集名称，没有 hit 列时按该数据集查看器的规则计算 (见 hit_rules)
+
+    Returns:
+        dict: {"rows", "hit_rate", "hit_source", "images", "missing_images", "missing_cols", "error"}
+    """
+    summary = {"rows": None, "hit_rate": None, "hit_source": None, "images": None,
+               "missing_images": None, "missing_cols": [], "error": None}
+    try:
+        columns = table_io.read_columns(file_path)
+        summary["missing_cols"] = [c for c in required_cols if c not in columns]
+
+        needed = ["hit", "image_path"]
+        if "hit" not in columns:
+            # 没有 hit 列的数据集 (ChartQA / DocVQA) 按查看器的规则计算
+            needed += ["answer", "prediction"]
+        if path_rewrite:
+            # 部分数据集的图片路径由 index / id 生成
+            needed += ["index", "id"]
+        df = table_io.read_table(file_path, columns=needed)
+        df = change_module.apply_path_rewrite(df, path_rewrite)
+        summary["rows"] = len(df)
+
+        if "hit" in df.columns:
+            hit = pd.to_numeric(df["hit"], errors="coerce").fillna(0) > 0
+            summary["hit_source"] = "hit"
+        elif "answer" in df.columns and "prediction" in df.columns:
+            hit = hit_rules.fallback_hit(dataset, df["answer"], df["prediction"])
+            summary["hit_source"] = "rule"
+        else:
+            hit = None
+        if hit is not None and len(df):
+            summary["hit_rate"] = float(hit.mean())
+
+        if "image_path" in df.columns:
+            images = image_utils.missing_image_summary(df["image_path"])
+            summary["images"] = images["images"]
+            summary["missing_images"] = images["missing"]
+    except Exception as e:
+        summary["error"] = str(e)
+    return summary
+
+
+def load_sidecar(folder_path):
+    """读取统计结果文件，不存在、损坏或版本不一致时返回空字典"""
+    try:
+        with open(os.path.join(folder_path, SUMMARY_FILENAME), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data.get("files", {}) if data.get("version") == SUMMARY_VERSION else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_sidecar(folder_path, entries):
+    """原子地写入统计结果文件"""
+    sidecar_path = os.path.join(folder_path, SUMMARY_FILENAME)
+    tmp_path = f"{sidecar_path}.tmp.{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"version": SUMMARY_VERSION, "files": entries}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, sidecar_path)
+
+
+def summarize_folder(folder_path, tasks, max_workers=None, use_sidecar=True, force=False):
+    """
+    并行统计文件夹中的全部结果文件
+
+    Args:
+        folder_path (str): 数据文件夹
+        tasks (dict): {filename: {"dataset": 数据集名, "required": 必要列, "path_rewrite": 改写规则}}
+        max_workers (int, optional): 并行进程数，None 表示使用全部 CPU
+        use_sidecar (bool): 是否读写统计结果文件 (虚拟模式下不向原始文件夹写文件)
+        force (bool): 为 True 时忽略已有的统计结果，全部重新统计
+
+    Returns:
+        dict: {filename: 统计结果}，文件不存在时 error 为 "文件不存在"
+    """
+    sidecar = load_sidecar(folder_path) if use_sidecar and not force else {}
+    results = {}
+    pending = {}
+
+    for filename, task in tasks.items():
+        file_path = os.path.join(folder_path, filename)
+        token = load_cache.file_token(file_path)
+        if token[1] is None:
+            results[filename] = {"error": "文件不存在"}
+            continue
+        # 经过一次 JSON 往返，保证与统计结果文件中保存的键可以直接比较
+        key = json.loads(json.dumps({"token": token, "required": task["required"], "path_rewrite": task["path_rewrite"]}))
+        entry = sidecar.get(filename)
+        if entry and entry.get("key") == key:
+            results[filename] = entry["summary"]
+        else:
+            pending[filename] = (file_path, key)
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(summarize_file, file_path, tasks[filename]["required"], tasks[filename]["path_rewrite"],
+                                tasks[filename]["dataset"]): filename
+                for filename, (file_path, _) in pending.items()
+            }
+            for future in as_completed(futures):
+                filename = futures[future]
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    # 子进程异常退出等情况
+                    summary = {"error": str(e)}
+                results[filename] = summary
+                if not summary.get("error"):
+                    sidecar[filename] = {"key": pending[filename][1], "summary": summary}
+
+        if use_sidecar:
+            try:
+                save_sidecar(folder_path, sidecar)
+            except OSError as e:
+                print(f"[总览] 统计结果保存失败: {e}")
+
+    return results
+
+
+@st.cache_data
+def cached_summary(folder_path, tasks, tokens, max_workers=None, use_sidecar=True, force=False):
+    """summarize_folder 的内存缓存，tokens 为各文件标识，只用于区分缓存键"""
+    return summarize_folder(folder_path, tasks, max_workers, use_sidecar, force)
+
+
+# ===========================
+#      模块主入口函数
+# ===========================
+def run(folder_path, tasks, max_workers=None, use_sidecar=True):
+
+    st.title("📈 准确率总览")
+    st.caption(f"数据文件夹: `{folder_path}`")
+
+    force = st.button("🔄 重新统计", help="忽略已缓存的统计结果，重新读取全部文件")
+    if force:
+        cached_summary.clear()
+
+    tokens = {filename: load_cache.file_token(os.path.join(folder_path, filename)) for filename in tasks}
+    with st.spinner("正在统计各数据集..."):
+        results = cached_summary(folder_path, tasks, tokens, max_workers, use_sidecar, force)
+
+    rows = []
+    for filename, task in tasks.items():
+        summary = results.get(filename, {})
+        hit_rate = summary.get("hit_rate")
+        missing_cols = summary.get("missing_cols") or []
+        rows.append({
+            "数据集": task["dataset"],
+            "条数": summary.get("rows"),
+            "准确率": f"{hit_rate:.2%}" if hit_rate is not None else "—",
+            "hit 来源": {"hit": "hit 列", "rule": "按查看器规则计算"}.get(summary.get("hit_source"), "—"),
+            "缺失图片": f"{summary['missing_images']} / {summary['images']}" if summary.get("images") is not None else "—",
+            "缺失列": ", ".join(missing_cols) if missing_cols else "✅",
+            "状态": f"❌ {summary['error']}" if summary.get("error") else "✅",
+            "文件": filename,
+        })
+    table = pd.DataFrame(rows)
+
+    valid = [r for r in results.values() if r.get("hit_rate") is not None]
+    m1, m2, m3 = st.columns(3)
+    m1.metric("数据集", f"{len(valid)} / {len(tasks)}")
+    m2.metric("总条数", sum(r["rows"] for r in valid))
+    m3.metric("平均准确率 (按数据集)", f"{sum(r['hit_rate'] for r in valid) / len(valid):.2%}" if valid else "—")
+
+    st.dataframe(table, use_container_width=True, hide_index=True)
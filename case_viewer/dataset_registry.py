@@ -0,0 +1,107 @@
+import importlib
+
+# ===========================
+#      数据集登记表
+# ===========================
+# main.py (数据集选择与准确率总览)、各查看器、html_report 与基准测试共用这一份配置。
+# 这里只有常量，不导入任何查看器：总览页只需要必要列，不必为此导入全部 12 个查看器模块。
+#
+# 每个数据集:
+#   module    查看器模块名，选中该数据集时才通过 get_viewer_module 导入
+#   keyword   与 tool2 模块名后缀一致，用于在文件夹中匹配结果文件与转换配置
+#   required  核心必须存在的列 (缺少时查看器报错)
+#   load      加载时读取的列 (不存在的可选列会被自动忽略)
+
+# 选择题的选项列 (展示时只显示数据中实际存在且非空的选项)
+OPTION_COLS = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I']
+
+_MC_REQUIRED = ["index", "question", "answer", "image_path", "prediction", "hit"]
+_QA_REQUIRED = ["index", "question", "answer", "prediction", "image_path"]
+
+DATASETS = {
+    "AI2D": {
+        "module": "tool3_show_AI2D", "keyword": "AI2D",
+        "required": ["index", "question", "A", "B", "C", "D", "answer", "image_path", "prediction", "hit"],
+    },
+    "ChartQA": {
+        # hit 由查看器按答案计算，原始文件中可以没有
+        "module": "tool3_show_ChartQA", "keyword": "ChartQA",
+        "required": _QA_REQUIRED, "load": _QA_REQUIRED + ["hit"],
+    },
+    "DocVQA": {
+        "module": "tool3_show_DocVQA", "keyword": "DocVQA",
+        "required": _QA_REQUIRED, "load": _QA_REQUIRED + ["hit"],
+    },
+    "LogicVista": {
+        # 虚拟模式下图片路径由 id 列生成
+        "module": "tool3_show_LogicVista", "keyword": "LogicVista",
+        "required": ["index", "question", "answer", "prediction", "res", "image_path", "hit"],
+        "load": ["index", "question", "answer", "prediction", "res", "image_path", "hit", "id"],
+    },
+    "MathVerse": {
+        "module": "tool3_show_MathVerse", "keyword": "MathVerse",
+        "required": ["index", "question", "answer", "prediction", "extract", "image_path", "hit"],
+    },
+    "MathVision": {
+        "module": "tool3_show_MathVision", "keyword": "MathVision",
+        "required": ["index", "question", "answer", "prediction", "res", "image_path", "hit"],
+    },
+    "MathVista": {
+        "module": "tool3_show_MathVista", "keyword": "MathVista",
+        "required": ["index", "question", "answer", "prediction", "res", "image_path", "hit"],
+    },
+    "MMMU": {
+        "module": "tool3_show_MMMU", "keyword": "MMMU",
+        "required": _MC_REQUIRED, "load": _MC_REQUIRED + OPTION_COLS,
+    },
+    "MMStar": {
+        "module": "tool3_show_MMStar", "keyword": "MMStar",
+        "required": _MC_REQUIRED, "load": _MC_REQUIRED + OPTION_COLS,
+    },
+    "OCRBench": {
+        "module": "tool3_show_OCRBench", "keyword": "OCRBench",
+        "required": ["index", "question", "answer", "prediction", "image_path", "hit"],
+    },
+    "RealWorldQA": {
+        "module": "tool3_show_RealWorldQA", "keyword": "RealWorldQA",
+        "required": _MC_REQUIRED, "load": _MC_REQUIRED + OPTION_COLS,
+    },
+    "WeMath": {
+        "module": "tool3_show_WeMath", "keyword": "WeMath",
+        "required": _MC_REQUIRED, "load": _MC_REQUIRED + OPTION_COLS,
+    },
+}
+
+# 没有单独列出 load 的数据集只读取必要列
+for _config in DATASETS.values():
+    _config.setdefault("load", _config["required"])
+
+
+def required_cols(dataset_name):
+    """数据集的必要列"""
+    return DATASETS[dataset_name]["required"]
+
+
+def load_cols(dataset_name):
+    """数据集加载时读取的列"""
+    return DATASETS[dataset_name]["load"]
+
+
+def find_dataset(module_name):
+    """按 tool2 / tool3 模块名的后缀找到对应的数据集名称，找不到时返回 None"""
+    return next((name for name, d in DATASETS.items() if module_name.endswith(f"_{d['keyword']}")), None)
+
+
+def get_viewer_module(dataset_name):
+    """首次使用时导入数据集查看器模块 (之后由 sys.modules 缓存，脚本重跑不会重复导入)"""
+    return importlib.import_module(DATASETS[dataset_name]["module"])
+
+
+__all__ = [
+    'OPTION_COLS',
+    'DATASETS',
+    'required_cols',
+    'load_cols',
+    'find_dataset',
+    'get_viewer_module',
+]
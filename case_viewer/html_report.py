@@ -0,0 +1,407 @@
+import os
+import sys
+import io
+import base64
+import html
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# 与 main.py 相同：命令行直接运行时也需要能导入 change_evalout 及其内部的 sibling import
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+for _path in (project_root, os.path.join(project_root, "change_evalout")):
+    if os.path.exists(_path) and _path not in sys.path:
+        sys.path.append(_path)
+
+import pandas as pd
+from change_evalout import path_prefix
+from change_evalout import table_io
+from change_evalout import thumbnails
+import load_cache  # load_data 的磁盘快照缓存 (与查看器共用快照)
+import search_utils  # Index 哈希表查找与全文搜索
+import dataset_registry  # 数据集登记表
+
+# ===========================
+#      配置区域
+# ===========================
+# 无法访问 Streamlit 端口的同事也能查看的离线错例报告：
+# 按与查看器相同的卡片布局生成分页的静态 HTML，图片以缩略图形式内嵌在页面中。
+
+# 数据集与查看器模块的对应关系 (加载逻辑与查看器完全一致) 及选项列见 dataset_registry
+DATASETS = dataset_registry.DATASETS
+OPTION_COLS = dataset_registry.OPTION_COLS
+
+DEFAULT_ITEMS_PER_PAGE = 50
+# 没有离线缩略图时，现场缩放到的长边像素上限
+DEFAULT_THUMB_SIZE = 512
+THUMB_QUALITY = 80
+
+PAGE_CSS = """
+body { font-family: -apple-system, "Segoe UI", "PingFang SC", "Microsoft YaHei", sans-serif; margin: 0 auto; max-width: 1400px; padding: 16px 24px; color: #31333f; }
+a { color: #667eea; }
+.nav { display: flex; gap: 16px; align-items: center; margin: 12px 0; font-weight: bold; }
+.card { border: 1px solid #dee2e6; border-radius: 8px; padding: 16px; margin-bottom: 16px; display: flex; gap: 24px; }
+.card .img-col { flex: 1; min-width: 0; }
+.card .text-col { flex: 2; min-width: 0; }
+.card img { max-width: 100%; display: block; }
+.caption { color: #808495; font-size: 13px; margin: 4px 0 12px; word-break: break-all; }
+.warn { background: #fffce7; color: #926c05; padding: 8px 12px; border-radius: 6px; margin-bottom: 8px; word-break: break-all; }
+.opt { padding: 8px 12px; border-radius: 6px; margin-bottom: 6px; border: 1px solid; }
+.opt-answer { background-color: #d1e7dd; color: #0f5132; border-color: #badbcc; }
+.opt-pred { background-color: #f8d7da; color: #842029; border-color: #f5c6cb; }
+.opt-plain { background-color: #f8f9fa; color: #333333; border-color: #dee2e6; }
+.box { padding: 12px 16px; border-radius: 6px; margin: 8px 0; white-space: pre-wrap; word-break: break-word; }
+.box-info { background: rgba(28, 131, 225, 0.1); color: #004280; }
+.box-success { background: rgba(33, 195, 84, 0.1); color: #177233; }
+.box-error { background: rgba(255, 43, 43, 0.09); color: #7d353b; }
+pre { white-space: pre-wrap; word-break: break-word; background: #f8f9fa; padding: 12px; border-radius: 6px; }
+table { border-collapse: collapse; }
+th, td { border: 1px solid #dee2e6; padding: 6px 12px; text-align: left; }
+"""
+
+
+def find_dataset_file(folder_path, keyword):
+    """
+    在文件夹中查找文件名包含数据集关键字的数据文件 (规则与 main.py 的 find_dataset_files 一致)
+
+    Returns:
+        str | None: 第一个匹配的文件路径
+    """
+    data_exts = (".xlsx",) + tuple(table_io.COLUMNAR_FORMATS.values())
+    files_by_stem = {}
+    for f in sorted(os.listdir(folder_path)):
+        stem, ext = os.path.splitext(f)
+        if ext.lower() in data_exts and not f.startswith("~$") and keyword in f:
+            if stem not in files_by_stem or ext.lower() == ".xlsx":
+                files_by_stem[stem] = f
+    names = sorted(files_by_stem.values())
+    return os.path.join(folder_path, names[0]) if names else None
+
+
+def _as_bool(series):
+    """hit 列可能是 bool / 0-1 / 字符串，统一转为 bool"""
+    if series.dtype == bool:
+        return series
+    return pd.to_numeric(series, errors='coerce').fillna(0) > 0
+
+
+# ===========================
+#      数据加载与过滤 (子进程)
+# ===========================
+def load_cases(dataset, file_path, hit=None, index_query=None, text_query=None, text_mode=search_utils.MODE_SUBSTRING):
+    """
+    用查看器的加载逻辑读取一个数据集并按条件过滤
+
+    Args:
+        dataset (str): 数据集名称 (DATASETS 的键)
+        file_path (str): 结果文件路径
+        hit (bool, optional): 只保留 hit 为该值的行，None 表示不过滤
+        index_query (str, optional): 按 Index 过滤，写法与查看器搜索框相同 (如 "1, 5, 10-20")
+        text_query (str, optional): 全文搜索，以 re: 开头使用正则
+        text_mode (str): 全文搜索的匹配方式，见 search_utils.SEARCH_MODES
+
+    Returns:
+        dict: {"dataset", "rows", "hit_rate", "records": 卡片数据列表, "error"}
+    """
+    result = {"dataset": dataset, "rows": 0, "hit_rate": None, "records": [], "error": None}
+    try:
+        module = dataset_registry.get_viewer_module(dataset)
+        options = {"columns": dataset_registry.load_cols(dataset), "path_rewrite": None}
+        df, error_msg = load_cache.cached_load(lambda: module._load_data(file_path), file_path, dataset, options)
+        if error_msg:
+            result["error"] = error_msg
+            return result
+
+        hits = _as_bool(df['hit'])
+        result["rows"] = len(df)
+        result["hit_rate"] = float(hits.mean()) if len(df) else None
+
+        df = df.assign(hit=hits)
+        if index_query:
+            index_map = search_utils.build_index_map(df['index'])
+            df, _ = search_utils.lookup_indices(df, index_map, search_utils.parse_index_query(index_query))
+        if hit is not None:
+            df = df[df['hit'] == hit]
+        if text_query:
+            matched, error_msg = search_utils.text_search(df, text_query, mode=text_mode)
+            if error_msg:
+                result["error"] = error_msg
+                return result
+            df = df.iloc[matched]
+
+        images = path_prefix.split_image_paths(df['image_path'])
+        for idx, row in df.iterrows():
+            record = {
+                "index": str(row['index']),
+                "question": row['question'],
+                "answer": row['answer'],
+                "prediction": row['prediction'],
+                "hit": bool(row['hit']),
+                "images": [p for p in images[idx] if p.lower() != 'nan'],
+                "options": {opt: row[opt] for opt in OPTION_COLS if opt in df.columns and pd.notna(row[opt])},
+            }
+            for col in ("res", "extract", "anls"):
+                if col in df.columns and pd.notna(row[col]):
+                    record[col] = row[col]
+            result["records"].append(record)
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+# ===========================
+#      页面渲染 (子进程)
+# ===========================
+# 每个子进程只读取一次缩略图清单
+_thumb_entries = None
+
+
+def _thumb_data_uri(img_path, max_size):
+    """
+    生成内嵌图片的 data URI
+
+    优先使用 thumbnails.py 离线生成的缩略图；没有时读取原图并现场缩放为 JPEG。
+
+    Returns:
+        str | None: data URI，图片不存在或无法解码时返回 None
+    """
+    global _thumb_entries
+    if _thumb_entries is None:
+        _thumb_entries = thumbnails.load_thumb_manifest()
+
+    entry = _thumb_entries.get(img_path)
+    if entry:
+        thumb_path = os.path.join(thumbnails.get_cache_dir(), entry["thumb"])
+        if os.path.exists(thumb_path):
+            with open(thumb_path, 'rb') as f:
+                mime = "image/webp" if entry.get("format") == "webp" else "image/jpeg"
+                return f"data:{mime};base64,{base64.b64encode(f.read()).decode('ascii')}"
+
+    if not os.path.exists(img_path):
+        return None
+    from PIL import Image
+
+    with Image.open(img_path) as img:
+        img.draft("RGB", (max_size, max_size))
+        img.thumbnail((max_size, max_size))
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG", quality=THUMB_QUALITY)
+    return f"data:image/jpeg;base64,{base64.b64encode(buf.getvalue()).decode('ascii')}"
+
+
+def _text(value):
+    """转义后的展示文本"""
+    return html.escape(str(value))
+
+
+def render_card(record, max_size):
+    """渲染一条案例的卡片 (布局与查看器一致：左侧图片，右侧题目、选项、答案与模型输出)"""
+    parts = ['<div class="card"><div class="img-col">']
+    if not record["images"]:
+        parts.append('<div class="warn">无图片路径</div>')
+    for i, img_path in enumerate(record["images"]):
+        try:
+            uri = _thumb_data_uri(img_path, max_size)
+        except Exception as e:
+            parts.append(f'<div class="warn">Image Error: {_text(e)}</div>')
+            continue
+        if uri is None:
+            parts.append(f'<div class="warn">⚠️ 图片缺失: {_text(img_path)}</div>')
+            continue
+        caption_prefix = f"[{i + 1}/{len(record['images'])}] " if len(record["images"]) > 1 else ""
+        parts.append(f'<img src="{uri}" loading="lazy"><div class="caption">{caption_prefix}{_text(os.path.basename(img_path))}</div>')
+    parts.append('</div><div class="text-col">')
+
+    is_hit = record["hit"]
+    header_color = "#198754" if is_hit else "#dc3545"
+    anls = f" &nbsp;&nbsp; ANLS: {record['anls']:.2f}" if "anls" in record else ""
+    parts.append(f"<h4 style='color: {header_color}; margin:0;'>Index: {_text(record['index'])} &nbsp;&nbsp; {'✅' if is_hit else '❌'}{anls}</h4>")
+    parts.append(f"<p><b>Q:</b> {_text(record['question'])}</p>")
+
+    for opt, text in record["options"].items():
+        is_answer = str(opt) == str(record['answer'])
+        is_pred = str(opt) == str(record['prediction'])
+        if is_answer:
+            css, icon = "opt-answer", " ✅"
+        elif is_pred:
+            css, icon = "opt-pred", " ❌ <b>(Pred)</b>"
+        else:
+            css, icon = "opt-plain", ""
+        parts.append(f'<div class="opt {css}"><b>{opt}:</b> {_text(text)}{icon}</div>')
+
+    short = record.get("res", record.get("extract"))
+    result_css = "box-success" if is_hit else "box-error"
+    parts.append(f'<div class="box box-info"><b>Standard Answer:</b>\n{_text(record["answer"])}</div>')
+    if short is not None:
+        parts.append(f'<div class="box {result_css}"><b>Model Res:</b>\n{_text(short)}</div>')
+        parts.append(f'<details><summary>查看完整模型输出 (Prediction / Chain of Thought)</summary><pre>{_text(record["prediction"])}</pre></details>')
+    else:
+        parts.append(f'<div class="box {result_css}"><b>Model Prediction:</b>\n{_text(record["prediction"])}</div>')
+    parts.append('</div></div>')
+    return "".join(parts)
+
+
+def page_filename(page_no):
+    """分页文件名 (page_no 从 1 开始)"""
+    return f"page_{page_no:04d}.html"
+
+
+def _write_html(path, title, body):
+    """原子地写入 HTML 文件"""
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(f'<!DOCTYPE html><html lang="zh"><head><meta charset="utf-8"><title>{_text(title)}</title>'
+                f'<style>{PAGE_CSS}</style></head><body>{body}</body></html>')
+    os.replace(tmp_path, path)
+
+
+def render_page(out_dir, dataset, page_no, total_pages, records, max_size=DEFAULT_THUMB_SIZE):
+    """
+    渲染一个分页并写入 <out_dir>/<dataset>/page_xxxx.html
+
+    Returns:
+        str: 写入的文件路径
+    """
+    page_dir = os.path.join(out_dir, dataset)
+    os.makedirs(page_dir, exist_ok=True)
+
+    prev_link = f'<a href="{page_filename(page_no - 1)}">◀ 上一页</a>' if page_no > 1 else '<span>◀ 上一页</span>'
+    next_link = f'<a href="{page_filename(page_no + 1)}">下一页 ▶</a>' if page_no < total_pages else '<span>下一页 ▶</span>'
+    nav = f'<div class="nav"><a href="../index.html">🏠 总览</a>{prev_link}<span>{page_no} / {total_pages} 页</span>{next_link}</div>'
+
+    body = [f"<h2>📊 {_text(dataset)}</h2>", nav]
+    body.extend(render_card(record, max_size) for record in records)
+    body.append(nav)
+
+    path = os.path.join(page_dir, page_filename(page_no))
+    _write_html(path, f"{dataset} - {page_no}/{total_pages}", "".join(body))
+    return path
+
+
+def render_index(out_dir, folder_path, summaries, filters):
+    """写入报告首页：各数据集的条数、准确率与入口链接"""
+    rows = []
+    for summary in summaries:
+        dataset = summary["dataset"]
+        if summary.get("error"):
+            status = f"❌ {_text(summary['error'])}"
+            link = _text(dataset)
+        else:
+            status = "✅"
+            link = f'<a href="{dataset}/{page_filename(1)}">{_text(dataset)}</a>' if summary["pages"] else _text(dataset)
+        hit_rate = f"{summary['hit_rate']:.2%}" if summary.get("hit_rate") is not None else "—"
+        rows.append(f"<tr><td>{link}</td><td>{summary.get('matched', 0)} / {summary.get('rows', 0)}</td>"
+                    f"<td>{hit_rate}</td><td>{summary.get('pages', 0)}</td><td>{status}</td></tr>")
+
+    body = (
+        f"<h2>📈 错例报告: {_text(os.path.basename(folder_path.rstrip(os.sep)))}</h2>"
+        f"<p>数据文件夹: <code>{_text(folder_path)}</code><br>过滤条件: <code>{_text(filters)}</code></p>"
+        "<table><tr><th>数据集</th><th>条数 (过滤后 / 全部)</th><th>准确率</th><th>页数</th><th>状态</th></tr>"
+        f"{''.join(rows)}</table>"
+    )
+    _write_html(os.path.join(out_dir, "index.html"), "错例报告", body)
+
+
+# ===========================
+#      报告生成入口
+# ===========================
+def build_report(folder_path, out_dir, datasets=None, hit=None, index_query=None, text_query=None,
+                 text_mode=search_utils.MODE_SUBSTRING, items_per_page=DEFAULT_ITEMS_PER_PAGE, max_size=DEFAULT_THUMB_SIZE, max_workers=None):
+    """
+    生成静态 HTML 错例报告
+
+    先并行加载并过滤各数据集，每个数据集加载完成后立即把它的各个分页提交到同一个进程池渲染，
+    图片读取与缩放分散在全部进程中。
+
+    Args:
+        folder_path (str): 转换后的数据文件夹 (xxx_for_check)
+        out_dir (str): 报告输出目录
+        datasets (list, optional): 数据集名称，None 表示全部
+        hit (bool, optional): 只导出 hit 为该值的行 (False 即只看错例)
+        index_query (str, optional): 按 Index 过滤
+        text_query (str, optional): 全文搜索
+        text_mode (str): 全文搜索的匹配方式 (子串 / 整词)
+        items_per_page (int): 每页条数
+        max_size (int): 现场缩放图片的长边像素上限
+        max_workers (int, optional): 并行进程数，None 表示使用全部 CPU
+
+    Returns:
+        list: 各数据集的统计 {"dataset", "rows", "matched", "pages", "hit_rate", "error"}
+    """
+    datasets = datasets or list(DATASETS)
+    unknown = [d for d in datasets if d not in DATASETS]
+    if unknown:
+        raise ValueError(f"未知的数据集: {unknown}，可选: {list(DATASETS)}")
+    os.makedirs(out_dir, exist_ok=True)
+
+    summaries = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        load_futures = {}
+        for dataset in datasets:
+            file_path = find_dataset_file(folder_path, dataset)
+            if file_path is None:
+                summaries[dataset] = {"dataset": dataset, "error": "文件不存在", "pages": 0}
+                continue
+            future = executor.submit(load_cases, dataset, file_path, hit, index_query, text_query, text_mode)
+            load_futures[future] = dataset
+
+        page_futures = []
+        for future in as_completed(load_futures):
+            result = future.result()
+            dataset = result["dataset"]
+            records = result.pop("records")
+            total_pages = (len(records) - 1) // items_per_page + 1 if records else 0
+            summaries[dataset] = dict(result, matched=len(records), pages=total_pages)
+            print(f"[报告] {dataset}: {len(records)} / {result['rows']} 条，{total_pages} 页" + (f"，错误: {result['error']}" if result["error"] else ""))
+            for page_no in range(1, total_pages + 1):
+                batch = records[(page_no - 1) * items_per_page:page_no * items_per_page]
+                page_futures.append(executor.submit(render_page, out_dir, dataset, page_no, total_pages, batch, max_size))
+
+        for done, future in enumerate(as_completed(page_futures), 1):
+            future.result()
+            if done % 20 == 0:
+                print(f"  - 已渲染 {done} / {len(page_futures)} 页")
+
+    ordered = [summaries[d] for d in datasets]
+    filters = {"hit": hit, "index": index_query, "text": text_query}
+    if text_query:
+        filters["text_mode"] = search_utils.SEARCH_MODES.get(text_mode, text_mode)
+    render_index(out_dir, folder_path, ordered, {k: v for k, v in filters.items() if v is not None})
+    return ordered
+
+
+__all__ = [
+    'DATASETS',
+    'find_dataset_file',
+    'load_cases',
+    'render_card',
+    'render_page',
+    'render_index',
+    'build_report',
+]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="将转换后的评测结果导出为分页的静态 HTML 错例报告 (图片内嵌)")
+    parser.add_argument("folder", help="转换后的数据文件夹 (xxx_for_check)")
+    parser.add_argument("-o", "--out-dir", required=True, help="报告输出目录，打开其中的 index.html 查看")
+    parser.add_argument("--datasets", nargs="+", default=None, help=f"只导出这些数据集，默认全部: {' '.join(DATASETS)}")
+    parser.add_argument("--hit", type=int, choices=[0, 1], default=None, help="只导出 hit==0 (错例) 或 hit==1 的行，默认不过滤")
+    parser.add_argument("--index", dest="index_query", default=None, help="按 Index 过滤，如 \"1, 5, 10-20\"")
+    parser.add_argument("--text", dest="text_query", default=None, help="全文搜索，以 re: 开头使用正则")
+    parser.add_argument("--text-mode", choices=list(search_utils.SEARCH_MODES), default=search_utils.MODE_SUBSTRING, help="全文搜索的匹配方式: substring 子串 (默认) / word 整词")
+    parser.add_argument("--per-page", type=int, default=DEFAULT_ITEMS_PER_PAGE, help="每页条数")
+    parser.add_argument("--thumb-size", type=int, default=DEFAULT_THUMB_SIZE, help="没有离线缩略图时现场缩放的长边像素上限")
+    parser.add_argument("--workers", type=int, default=None, help="并行进程数，默认使用全部 CPU")
+    args = parser.parse_args()
+
+    summaries = build_report(
+        args.folder, args.out_dir, args.datasets,
+        hit=None if args.hit is None else bool(args.hit),
+        index_query=args.index_query, text_query=args.text_query, text_mode=args.text_mode,
+        items_per_page=args.per_page, max_size=args.thumb_size, max_workers=args.workers,
+    )
+    failed = [s["dataset"] for s in summaries if s.get("error")]
+    print(f"报告已生成: {os.path.join(args.out_dir, 'index.html')}" + (f" (失败: {failed})" if failed else ""))
@@ -0,0 +1,201 @@
+import os
+import socket
+import hashlib
+import shutil
+import mimetypes
+from urllib.parse import quote
+import threading
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from change_evalout import thumbnails
+
+# ===========================
+#      图片静态服务
+# ===========================
+# st.image(PIL 图片) 在每次脚本重跑 (翻页、调整过滤条件) 时都会重新编码并发送图片数据。
+# 这里在 Streamlit 进程内启动一个多线程 HTTP 服务，查看器改为传入图片 URL：
+# URL 按内容寻址 (标识由 image_utils.url_token 给出：优先使用缩略图清单中的 sha256，
+# 不逐张 stat)，响应带长期缓存头，浏览器在不同重跑、不同会话之间都直接命中本地缓存。
+# 服务只响应查看器登记过的图片，不能通过 URL 读取任意文件。
+# 默认只监听本机 (通过 ssh 端口转发访问)；需要其它机器直接访问时设置 VLM_IMAGE_SERVER_HOST=0.0.0.0。
+
+# 是否默认启用 (侧边栏可按会话切换)
+IMAGE_SERVER_ENV = "VLM_IMAGE_SERVER"
+# 监听地址与端口 (slurm_node.sh 中 Streamlit 使用 8501)
+IMAGE_SERVER_HOST_ENV = "VLM_IMAGE_SERVER_HOST"
+IMAGE_SERVER_PORT_ENV = "VLM_IMAGE_SERVER_PORT"
+DEFAULT_IMAGE_SERVER_HOST = "127.0.0.1"
+DEFAULT_IMAGE_SERVER_PORT = 8502
+# 浏览器访问图片服务使用的地址，默认为 http://<监听地址>:<端口> (监听全部地址时使用本机主机名)
+IMAGE_BASE_URL_ENV = "VLM_IMAGE_BASE_URL"
+
+# URL 中的内容标识一年内不变，浏览器无需再次校验
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# 最多登记的图片数量 (超出时淘汰最久未访问的登记)
+MAX_REGISTERED = 100000
+
+# {内容标识: 图片路径}
+_registry = OrderedDict()
+_registry_lock = threading.Lock()
+
+_server = None
+_server_error = None
+_server_lock = threading.Lock()
+
+
+def is_enabled_by_default():
+    """环境变量设置为 1 / true / yes 时默认启用"""
+    return os.environ.get(IMAGE_SERVER_ENV, "").strip().lower() in ("1", "true", "yes")
+
+
+def get_host():
+    """监听地址：环境变量 > 默认值 (只监听本机)"""
+    return os.environ.get(IMAGE_SERVER_HOST_ENV) or DEFAULT_IMAGE_SERVER_HOST
+
+
+def get_base_url():
+    """浏览器访问图片服务的地址：环境变量 > http://<监听地址或主机名>:<端口>"""
+    base_url = os.environ.get(IMAGE_BASE_URL_ENV)
+    if base_url:
+        return base_url.rstrip("/")
+    port = int(os.environ.get(IMAGE_SERVER_PORT_ENV) or DEFAULT_IMAGE_SERVER_PORT)
+    host = get_host()
+    if host in ("0.0.0.0", "::", ""):
+        host = socket.gethostname()
+    return f"http://{host}:{port}"
+
+
+def content_token(img_path):
+    """
+    计算图片的内容标识
+
+    缩略图文件名本身就是内容 sha256 (见 thumbnails.thumb_relpath)，直接使用；
+    原图按 (绝对路径, 修改时间, 大小) 取哈希，文件被替换后 URL 随之变化。
+    需要 stat 原图，查看器通过 image_utils.url_token 调用并按目录缓存结果。
+
+    Returns:
+        str | None: 内容标识，文件不存在时返回 None
+    """
+    abs_path = os.path.abspath(img_path)
+    if abs_path.startswith(os.path.abspath(thumbnails.get_cache_dir()) + os.sep):
+        return os.path.splitext(os.path.basename(abs_path))[0]
+    try:
+        stat = os.stat(abs_path)
+    except OSError:
+        return None
+    key = f"{abs_path}\0{stat.st_mtime_ns}\0{stat.st_size}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]
+
+
+class _ImageHandler(BaseHTTPRequestHandler):
+    """GET /img/<内容标识>/<文件名>，只返回已登记的图片"""
+
+    def do_GET(self):
+        parts = self.path.split("?", 1)[0].strip("/").split("/")
+        if len(parts) != 3 or parts[0] != "img":
+            self.send_error(404)
+            return
+        token = parts[1]
+        with _registry_lock:
+            img_path = _registry.get(token)
+            if img_path is not None:
+                _registry.move_to_end(token)
+        if img_path is None:
+            self.send_error(404)
+            return
+
+        etag = f'"{token}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", CACHE_CONTROL)
+            self.end_headers()
+            return
+
+        try:
+            f = open(img_path, 'rb')
+        except OSError:
+            self.send_error(404)
+            return
+        with f:
+            self.send_response(200)
+            self.send_header("Content-Type", mimetypes.guess_type(img_path)[0] or "application/octet-stream")
+            self.send_header("Content-Length", str(os.fstat(f.fileno()).st_size))
+            self.send_header("Cache-Control", CACHE_CONTROL)
+            self.send_header("ETag", etag)
+            # 页面与图片服务端口不同，允许跨域读取
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.end_headers()
+            shutil.copyfileobj(f, self.wfile)
+
+    def log_message(self, format, *args):
+        # 每张图片一条访问日志会淹没 slurm 日志，这里不输出
+        pass
+
+
+def ensure_server():
+    """
+    启动图片服务 (每个进程只启动一次，在后台守护线程中运行)
+
+    Returns:
+        bool: 服务是否可用；端口被占用等启动失败时返回 False，查看器回退为直接发送图片
+    """
+    global _server, _server_error
+    with _server_lock:
+        if _server is not None:
+            return True
+        if _server_error is not None:
+            return False
+        host = get_host()
+        port = int(os.environ.get(IMAGE_SERVER_PORT_ENV) or DEFAULT_IMAGE_SERVER_PORT)
+        try:
+            server = ThreadingHTTPServer((host, port), _ImageHandler)
+        except OSError as e:
+            _server_error = str(e)
+            print(f"[图片服务] 启动失败 ({host}:{port})，回退为直接发送图片: {e}")
+            return False
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="image_server", daemon=True).start()
+        _server = server
+        print(f"[图片服务] 已启动: {host}:{port}，访问地址 {get_base_url()}")
+        return True
+
+
+def image_url(img_path, token=None):
+    """
+    登记图片并返回其缓存友好的 URL
+
+    Args:
+        img_path (str): 图片路径 (原图或缩略图)
+        token (str, optional): 内容标识 (见 image_utils.url_token)，None 时由 content_token 计算
+
+    Returns:
+        str | None: 图片 URL；服务不可用或文件不存在时返回 None
+    """
+    if not ensure_server():
+        return None
+    if token is None:
+        token = content_token(img_path)
+    if token is None:
+        return None
+    with _registry_lock:
+        _registry[token] = img_path
+        _registry.move_to_end(token)
+        while len(_registry) > MAX_REGISTERED:
+            _registry.popitem(last=False)
+    return f"{get_base_url()}/img/{token}/{quote(os.path.basename(img_path))}"
+
+
+__all__ = [
+    'IMAGE_SERVER_ENV',
+    'IMAGE_SERVER_HOST_ENV',
+    'IMAGE_SERVER_PORT_ENV',
+    'IMAGE_BASE_URL_ENV',
+    'is_enabled_by_default',
+    'get_host',
+    'get_base_url',
+    'content_token',
+    'ensure_server',
+    'image_url',
+]
@@ -0,0 +1,442 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from change_evalout import path_prefix
+from change_evalout import thumbnails
+import image_server  # 图片静态 URL 服务
+import shared_store  # 路径分组与缺失统计在进程内共享 (有数量上限)
+import perf  # 单次重跑的分阶段计时
+
+# ===========================
+#      图片读取工具
+# ===========================
+# PIL 只在真正需要展示图片时才导入，查看器冷启动和首屏渲染不再为它付出导入开销
+
+
+def open_image(img_path):
+    """
+    打开图片 (延迟导入 PIL)
+
+    Args:
+        img_path (str): 图片路径
+
+    Returns:
+        PIL.Image.Image: 图片对象
+    """
+    from PIL import Image
+    return Image.open(img_path)
+
+
+# ===========================
+#      图片目录索引
+# ===========================
+# Lustre 上每次 os.path.exists 都是一次元数据 RPC。这里对每个图片目录只做一次 os.scandir，
+# 把文件名集合缓存在进程内 (所有会话共享)，之后的存在性检查都是集合查找。
+# 缓存按目录 mtime 失效；同一目录在 INDEX_RECHECK_SECONDS 内不重复 stat。
+INDEX_RECHECK_SECONDS = 30
+
+# {目录: (目录 mtime, 文件名集合, 上次校验时间)}
+_dir_index = {}
+_dir_index_lock = threading.Lock()
+
+
+def _scan_dir(directory):
+    """一次 scandir 列出目录下的全部条目名 (只用 d_type，不额外 stat)"""
+    try:
+        with os.scandir(directory) as it:
+            return frozenset(entry.name for entry in it)
+    except OSError:
+        return frozenset()
+
+
+def _get_dir_entry(directory):
+    """目录的 (mtime, 文件名集合)，见 get_dir_index"""
+    now = time.monotonic()
+    with _dir_index_lock:
+        cached = _dir_index.get(directory)
+    if cached is not None and now - cached[2] < INDEX_RECHECK_SECONDS:
+        return cached[0], cached[1]
+
+    try:
+        mtime = os.stat(directory).st_mtime
+    except OSError:
+        mtime = None
+
+    if cached is not None and cached[0] == mtime:
+        names = cached[1]
+    else:
+        names = _scan_dir(directory) if mtime is not None else frozenset()
+
+    with _dir_index_lock:
+        _dir_index[directory] = (mtime, names, now)
+    return mtime, names
+
+
+def get_dir_index(directory):
+    """
+    获取目录的文件名索引
+
+    Args:
+        directory (str): 目录路径
+
+    Returns:
+        frozenset: 目录下的文件名集合，目录不存在时为空集合
+    """
+    return _get_dir_entry(directory)[1]
+
+
+def image_exists(img_path):
+    """
+    基于目录索引判断图片是否存在 (替代逐个 os.path.exists)
+
+    Args:
+        img_path (str): 图片路径
+
+    Returns:
+        bool: 是否存在
+    """
+    if not img_path:
+        return False
+    directory, name = os.path.split(str(img_path))
+    return name in get_dir_index(directory)
+
+
+def _group_paths_by_dir(image_paths):
+    """把整列图片路径拆成 {目录: [(行号, 文件名), ...]}"""
+    grouped = {}
+    for pos, paths in enumerate(path_prefix.split_image_paths(image_paths)):
+        for p in paths:
+            if p.lower() == 'nan':
+                continue
+            directory, name = os.path.split(p)
+            grouped.setdefault(directory, []).append((pos, name))
+    return grouped
+
+
+def missing_image_summary(image_paths, cache_key=None):
+    """
+    统计整个文件的图片缺失情况
+
+    路径拆分结果按 cache_key 缓存；统计结果在各目录索引没有变化时直接复用。
+    两者都保存在 shared_store 的派生数据中，与 index 哈希表等一起按 LRU 淘汰，不会随打开的文件数无限增长。
+
+    Args:
+        image_paths (pd.Series): image_path 列
+        cache_key (hashable, optional): 缓存键 (例如文件路径)，None 表示不缓存
+
+    Returns:
+        dict: {"rows": 总行数, "images": 图片总数, "missing": 缺失图片数,
+               "rows_missing": 存在缺失图片的行数, "rows_without_path": 无图片路径的行数}
+    """
+    grouped = shared_store.get_derived("image_groups", cache_key, lambda: _group_paths_by_dir(image_paths))
+    indexes = {directory: get_dir_index(directory) for directory in grouped}
+    # 各目录索引的标识：目录重新扫描后索引对象会被替换，统计结果随之失效
+    token = tuple(sorted((d, id(names)) for d, names in indexes.items()))
+    return shared_store.get_derived("image_summary", cache_key, lambda: _summarize(grouped, indexes, len(image_paths)),
+                                    version=token)
+
+
+def _summarize(grouped, indexes, rows):
+    """按目录索引统计缺失图片 (missing_image_summary 的计算部分)"""
+    images = 0
+    missing = 0
+    rows_with_path = set()
+    rows_missing = set()
+    for directory, entries in grouped.items():
+        names = indexes[directory]
+        images += len(entries)
+        for pos, name in entries:
+            rows_with_path.add(pos)
+            if name not in names:
+                missing += 1
+                rows_missing.add(pos)
+
+    return {
+        "rows": rows,
+        "images": images,
+        "missing": missing,
+        "rows_missing": len(rows_missing),
+        "rows_without_path": rows - len(rows_with_path),
+    }
+
+
+# ===========================
+#      缩略图查找
+# ===========================
+# 缩略图由 change_evalout/thumbnails.py 离线生成。查看器只读取其清单，
+# 清单文件在 INDEX_RECHECK_SECONDS 内不重复 stat，修改时间变化时才重新加载。
+_thumb_manifest = {"mtime": None, "entries": {}, "checked": None}
+_thumb_manifest_lock = threading.Lock()
+
+
+def _get_thumb_entries():
+    now = time.monotonic()
+    with _thumb_manifest_lock:
+        checked = _thumb_manifest["checked"]
+        if checked is not None and now - checked < INDEX_RECHECK_SECONDS:
+            return _thumb_manifest["entries"]
+
+        manifest_path = os.path.join(thumbnails.get_cache_dir(), thumbnails.THUMB_MANIFEST_FILENAME)
+        try:
+            mtime = os.stat(manifest_path).st_mtime
+        except OSError:
+            mtime = None
+
+        if mtime != _thumb_manifest["mtime"]:
+            _thumb_manifest["entries"] = thumbnails.load_thumb_manifest() if mtime is not None else {}
+            _thumb_manifest["mtime"] = mtime
+        _thumb_manifest["checked"] = now
+        return _thumb_manifest["entries"]
+
+
+def thumbnail_path(img_path):
+    """
+    查找图片对应的缩略图
+
+    Args:
+        img_path (str): 原图路径
+
+    Returns:
+        str | None: 缩略图路径，没有生成过缩略图时返回 None
+    """
+    entry = _get_thumb_entries().get(str(img_path))
+    if not entry:
+        return None
+    path = os.path.join(thumbnails.get_cache_dir(), entry["thumb"])
+    return path if image_exists(path) else None
+
+
+# ===========================
+#      图片预取与内存缓存
+# ===========================
+# 翻页后的等待主要花在 Lustre 上的图片读取与解码。这里用后台线程池提前读取并解码
+# 当前页及前后相邻页的图片 (默认展示的版本：有缩略图时取缩略图)，放入按字节数限制的 LRU 缓存，
+# 翻页时直接命中内存。缓存在进程内所有会话间共享。
+IMAGE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+PREFETCH_WORKERS = 4
+
+# {图片路径: (解码后的图片, 占用字节数)}
+_image_cache = OrderedDict()
+_image_cache_bytes = 0
+# {图片路径: Future}，正在后台解码的图片
+_pending = {}
+_image_cache_lock = threading.Lock()
+_prefetch_pool = None
+
+
+def _get_prefetch_pool():
+    global _prefetch_pool
+    with _image_cache_lock:
+        if _prefetch_pool is None:
+            _prefetch_pool = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="img_prefetch")
+        return _prefetch_pool
+
+
+def _decode_image(img_path):
+    """读取并完整解码图片，写入 LRU 缓存"""
+    global _image_cache_bytes
+    image = open_image(img_path)
+    image.load()
+    nbytes = image.width * image.height * len(image.getbands())
+    with _image_cache_lock:
+        if img_path not in _image_cache:
+            _image_cache[img_path] = (image, nbytes)
+            _image_cache_bytes += nbytes
+        # 超出上限时淘汰最久未使用的图片 (至少保留刚放入的这一张)
+        while _image_cache_bytes > IMAGE_CACHE_MAX_BYTES and len(_image_cache) > 1:
+            _, (_, old_bytes) = _image_cache.popitem(last=False)
+            _image_cache_bytes -= old_bytes
+    return image
+
+
+def _decode_task(img_path):
+    try:
+        return _decode_image(img_path)
+    finally:
+        with _image_cache_lock:
+            _pending.pop(img_path, None)
+
+
+def load_image(img_path):
+    """
+    读取图片，优先使用预取缓存
+
+    已在缓存中时直接返回；正在后台解码时等待其完成；否则同步读取并放入缓存。
+
+    Args:
+        img_path (str): 图片路径
+
+    Returns:
+        PIL.Image.Image: 已解码的图片对象
+    """
+    with _image_cache_lock:
+        cached = _image_cache.get(img_path)
+        if cached is not None:
+            _image_cache.move_to_end(img_path)
+            return cached[0]
+        future = _pending.get(img_path)
+    if future is not None:
+        return future.result()
+    return _decode_image(img_path)
+
+
+def default_display_path(img_path):
+    """默认展示的图片路径：有缩略图时取缩略图，否则为原图"""
+    return thumbnail_path(img_path) or img_path
+
+
+def prefetch_images(image_paths):
+    """
+    在后台预取并解码一组图片 (已缓存、正在解码或不存在的图片会被跳过)
+
+    URL 模式下图片由浏览器直接向图片服务请求，不需要预取。
+
+    Args:
+        image_paths (pd.Series): image_path 列的一部分
+    """
+    if url_mode_enabled():
+        return
+    paths = []
+    for items in path_prefix.split_image_paths(image_paths):
+        for p in items:
+            if p and p.lower() != 'nan' and image_exists(p):
+                paths.append(default_display_path(p))
+    if not paths:
+        return
+
+    pool = _get_prefetch_pool()
+    with _image_cache_lock:
+        for p in paths:
+            if p not in _image_cache and p not in _pending:
+                _pending[p] = pool.submit(_decode_task, p)
+
+
+def prefetch_pages(image_paths, start_idx, items_per_page):
+    """
+    预取当前页与前后相邻页的图片
+
+    当前页排在最前面，页面渲染时可以直接等待后台解码结果，多张图片并行读取；
+    随后是下一页、上一页。
+
+    Args:
+        image_paths (pd.Series): 当前展示范围 (过滤后) 的 image_path 列
+        start_idx (int): 当前页起始位置
+        items_per_page (int): 每页条数
+    """
+    end_idx = start_idx + items_per_page
+    prefetch_images(image_paths.iloc[start_idx:end_idx])
+    prefetch_images(image_paths.iloc[end_idx:end_idx + items_per_page])
+    prefetch_images(image_paths.iloc[max(0, start_idx - items_per_page):start_idx])
+
+
+# ===========================
+#      图片展示来源
+# ===========================
+# URL 模式：st.image 接收图片服务的 URL，浏览器按 URL 缓存，重跑时不再重新发送图片数据。
+# Streamlit 每个会话的脚本在各自的线程中运行，开关按线程保存，侧边栏切换只影响当前会话。
+_url_mode = threading.local()
+
+
+# ===========================
+#      图片 URL 的内容标识
+# ===========================
+# 每次重跑都要为当前页的每张图片生成 URL，这里不再逐张 os.stat：
+#   缩略图      文件名就是内容 sha256
+#   有缩略图的原图  直接使用缩略图清单中记录的原图 sha256
+#   其它原图    第一次按 (路径, 修改时间, 大小) 计算标识后缓存，所在目录的 mtime 变化
+#               (文件被替换、新增、删除) 时才重新计算；目录 mtime 复用图片目录索引，不额外 stat
+# 原地改写图片内容但不改变目录的情况与图片目录索引一样，不会被察觉。
+MAX_URL_TOKENS = 100000
+
+# {原图路径: (所在目录的 mtime, 内容标识)}
+_url_tokens = OrderedDict()
+_url_tokens_lock = threading.Lock()
+
+
+def url_token(img_path):
+    """
+    图片 URL 的内容标识
+
+    Args:
+        img_path (str): 图片路径 (原图或缩略图)
+
+    Returns:
+        str | None: 内容标识，文件不存在时返回 None
+    """
+    img_path = str(img_path)
+    entry = _get_thumb_entries().get(img_path)
+    if entry and entry.get("sha256"):
+        return entry["sha256"][:32]
+
+    abs_path = os.path.abspath(img_path)
+    if abs_path.startswith(os.path.abspath(thumbnails.get_cache_dir()) + os.sep):
+        # 缩略图：由文件名得到，不访问文件系统
+        return image_server.content_token(abs_path)
+    directory, name = os.path.split(abs_path)
+    dir_mtime, names = _get_dir_entry(directory)
+    if name not in names:
+        return None
+
+    with _url_tokens_lock:
+        cached = _url_tokens.get(abs_path)
+        if cached is not None and cached[0] == dir_mtime:
+            _url_tokens.move_to_end(abs_path)
+            return cached[1]
+    token = image_server.content_token(abs_path)
+    if token is not None:
+        with _url_tokens_lock:
+            _url_tokens[abs_path] = (dir_mtime, token)
+            _url_tokens.move_to_end(abs_path)
+            while len(_url_tokens) > MAX_URL_TOKENS:
+                _url_tokens.popitem(last=False)
+    return token
+
+
+def set_url_mode(enabled):
+    """设置当前会话是否使用图片 URL (由 main.py 在每次脚本运行时设置)"""
+    _url_mode.enabled = bool(enabled)
+
+
+def url_mode_enabled():
+    """当前会话是否使用图片 URL，未设置时取环境变量的默认值"""
+    enabled = getattr(_url_mode, "enabled", None)
+    return image_server.is_enabled_by_default() if enabled is None else enabled
+
+
+def image_source(img_path):
+    """
+    st.image 的图片参数
+
+    URL 模式下返回图片服务的 URL；未启用或图片服务不可用时返回解码后的图片 (优先使用预取缓存)。
+
+    Args:
+        img_path (str): 图片路径 (原图或缩略图)
+
+    Returns:
+        str | PIL.Image.Image: 图片 URL 或图片对象
+    """
+    with perf.phase("image"):
+        if url_mode_enabled():
+            url = image_server.image_url(img_path, url_token(img_path))
+            if url is not None:
+                return url
+        return load_image(img_path)
+
+
+__all__ = [
+    'open_image',
+    'get_dir_index',
+    'image_exists',
+    'missing_image_summary',
+    'thumbnail_path',
+    'load_image',
+    'default_display_path',
+    'prefetch_images',
+    'prefetch_pages',
+    'url_token',
+    'set_url_mode',
+    'url_mode_enabled',
+    'image_source',
+]
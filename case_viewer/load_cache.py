@@ -0,0 +1,247 @@
+import os
+import json
+import hashlib
+import importlib.util
+import pandas as pd
+from change_evalout import table_io
+import shared_store
+
+# ===========================
+#      磁盘加载缓存
+# ===========================
+# st.cache_data 只在进程内有效，slurm_node.sh 重启服务后会全部丢失。
+# 这里把 load_data 预处理后的 DataFrame 以 Parquet 快照保存在磁盘上，
+# 键为 (查看器, 加载版本, 数据源文件路径 + 修改时间 + 大小, 加载参数)，
+# 重启后的第一次访问直接读取快照；数据源被修改后键随之变化，不会读到过期数据。
+
+# 缓存目录可通过环境变量覆盖
+LOAD_CACHE_ENV = "VLM_LOAD_CACHE_DIR"
+DEFAULT_LOAD_CACHE_DIR = '/mnt/lustre/houbingxi/1212_moe_eval_badcase/case_viewer/load_cache'
+
+# 加载逻辑版本号：修改任一查看器的 load_data 处理逻辑后需要递增，使已有快照全部失效
+LOADER_VERSION = 5
+
+
+def get_cache_dir():
+    """获取加载缓存目录：环境变量 > 默认目录"""
+    return os.environ.get(LOAD_CACHE_ENV) or DEFAULT_LOAD_CACHE_DIR
+
+
+def file_token(file_path):
+    """
+    计算数据源文件的标识
+
+    read_table 会优先读取同名的列式文件，因此这里对实际被读取的文件取 stat。
+    标识同时作为 st.cache_data 的参数，使内存缓存也能感知文件修改。
+
+    Args:
+        file_path (str): 查看器打开的文件路径
+
+    Returns:
+        tuple: (实际读取的文件路径, 修改时间 ns, 文件大小)，文件不存在时后两项为 None
+    """
+    found = table_io.find_columnar(file_path)
+    path = found[0] if found is not None else file_path
+    try:
+        stat = os.stat(path)
+        return path, stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return path, None, None
+
+
+# ===========================
+#      紧凑的内存表示
+# ===========================
+# 每个查看器把整张评测表缓存在内存中 (每个文件一份)，同时打开多个数据集、多个 run 时
+# object 列会占满节点内存。加载完成后统一压缩：
+#   - hit / answer 等取值很少的列转为 category
+#   - question / prediction 等长文本转为 Arrow 字符串 (连续缓冲区，没有逐个 Python 对象的开销)
+#   - 其它取值重复率高的文本列 (选项、类别等) 按重复率自动转为 category
+# 不需要展示的列已经由各查看器的 LOAD_COLS 在读取时剔除。
+
+# 总是转为 category 的列
+CATEGORY_COLS = ["hit", "answer"]
+# 转为 Arrow 字符串的长文本列 (需要 pyarrow，未安装时保持原样)
+ARROW_STRING_COLS = ["question", "prediction"]
+# 不做转换的列：index 用于哈希查找且几乎不重复；image_path 在虚拟模式下可能是列表
+KEEP_COLS = ["index", "image_path"]
+# 其它文本列不同取值数 / 行数不超过该比例时转为 category
+CATEGORY_MAX_RATIO = 0.5
+
+# 内存报告保存在 df.attrs 中 (随 st.cache_data 与 Parquet 快照一起保存)
+MEMORY_REPORT_ATTR = "memory_report"
+
+
+def _arrow_string_dtype():
+    """Arrow 字符串类型，未安装 pyarrow 时返回 None"""
+    if importlib.util.find_spec("pyarrow") is None:
+        return None
+    return pd.StringDtype("pyarrow")
+
+
+def _is_text(series):
+    return series.dtype == object or isinstance(series.dtype, pd.StringDtype)
+
+
+def compact_frame(df):
+    """
+    压缩 DataFrame 的内存占用，并在 df.attrs 中记录压缩前后的内存报告
+
+    已经压缩过的列 (例如从快照读回的 category 列) 不会重复转换；转换失败的列 (如包含列表) 保持原样。
+
+    Args:
+        df (pd.DataFrame): 查看器预处理后的数据
+
+    Returns:
+        pd.DataFrame: 压缩后的数据 (与输入为同一对象)
+    """
+    before = df.memory_usage(deep=True, index=False)
+    string_dtype = _arrow_string_dtype()
+
+    for col in df.columns:
+        series = df[col]
+        if col in KEEP_COLS or isinstance(series.dtype, pd.CategoricalDtype):
+            continue
+        try:
+            if col in ARROW_STRING_COLS:
+                if string_dtype is not None and _is_text(series) and series.dtype != string_dtype:
+                    df[col] = series.astype(string_dtype)
+            elif col in CATEGORY_COLS:
+                df[col] = series.astype("category")
+            elif _is_text(series) and len(series) and series.nunique(dropna=True) <= len(series) * CATEGORY_MAX_RATIO:
+                df[col] = series.astype("category")
+        except (TypeError, ValueError):
+            # 包含列表等不可哈希的值
+            continue
+
+    after = df.memory_usage(deep=True, index=False)
+    report = df.attrs.get(MEMORY_REPORT_ATTR, {})
+    # 快照读回时保留首次加载时记录的压缩前大小
+    report_before = report.get("before_bytes") or int(before.sum())
+    df.attrs[MEMORY_REPORT_ATTR] = {
+        "before_bytes": report_before,
+        "after_bytes": int(after.sum()),
+        "columns": {col: {"dtype": str(df[col].dtype), "bytes": int(after[col])} for col in df.columns},
+    }
+    return df
+
+
+def format_memory_report(df):
+    """
+    内存报告的展示文本，例如 "12.3 MB (压缩前 45.6 MB，节省 73%)"
+
+    Returns:
+        str | None: 没有内存报告时返回 None
+    """
+    report = df.attrs.get(MEMORY_REPORT_ATTR)
+    if not report:
+        return None
+    before, after = report["before_bytes"], report["after_bytes"]
+    saved = max(1 - after / before, 0) if before else 0
+    return f"{after / 1024 ** 2:.1f} MB (压缩前 {before / 1024 ** 2:.1f} MB，节省 {saved:.0%})"
+
+
+def _snapshot_path(cache_dir, namespace, file_path, key_parts):
+    """快照路径: <缓存目录>/<查看器>_<文件路径哈希>_<键哈希>.parquet"""
+    path_hash = hashlib.sha256(os.path.abspath(file_path).encode('utf-8')).hexdigest()[:16]
+    key = json.dumps(key_parts, ensure_ascii=False, sort_keys=True, default=str)
+    key_hash = hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{namespace}_{path_hash}_{key_hash}.parquet")
+
+
+def _remove_stale(cache_dir, snapshot_path):
+    """删除同一查看器、同一文件的旧快照 (文件修改或参数变化后留下的)"""
+    name = os.path.basename(snapshot_path)
+    prefix = name[:name.rindex('_') + 1]
+    try:
+        for entry in os.scandir(cache_dir):
+            if entry.name.startswith(prefix) and entry.name != name:
+                os.remove(entry.path)
+    except OSError:
+        pass
+
+
+def cached_load(loader, file_path, namespace, options=None):
+    """
+    带磁盘快照的数据加载
+
+    Args:
+        loader (callable): 原始加载函数，loader() 返回 (df, error_msg)
+        file_path (str): 数据文件路径
+        namespace (str): 查看器名称 (不同查看器的预处理结果不同，快照互不共用)
+        options (dict, optional): 影响加载结果的其它参数 (例如读取的列、虚拟模式的路径改写)
+
+    Returns:
+        tuple: (df, error_msg)，与 loader 的返回值一致
+    """
+    token = file_token(file_path)
+    if token[1] is None:
+        # 文件不存在时交给原始加载函数报错
+        df, error_msg = loader()
+        return (compact_frame(df) if df is not None else df), error_msg
+
+    cache_dir = get_cache_dir()
+    snapshot_path = _snapshot_path(cache_dir, namespace, file_path, [LOADER_VERSION, list(token), options])
+
+    if os.path.exists(snapshot_path):
+        try:
+            return compact_frame(pd.read_parquet(snapshot_path)), None
+        except Exception as e:
+            # 快照损坏时重新加载并覆盖
+            print(f"[加载缓存] 快照读取失败，重新加载: {e}")
+
+    df, error_msg = loader()
+    if df is None:
+        return df, error_msg
+    df = compact_frame(df)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{snapshot_path}.tmp.{os.getpid()}"
+        table_io.to_columnar_frame(df).to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, snapshot_path)
+        _remove_stale(cache_dir, snapshot_path)
+    except Exception as e:
+        # 缓存目录不可写等情况不影响正常展示
+        print(f"[加载缓存] 快照保存失败: {e}")
+    return df, error_msg
+
+
+def shared_load(namespace, loader, file_path, columns, path_rewrite=None, token=None):
+    """
+    查看器 load_data 的通用实现：进程内共享 (shared_store) + 磁盘快照 (cached_load)
+
+    同一文件在整个进程中只保存一份，所有会话共用 (不能原地修改返回的 df)；
+    token 变化 (文件被修改) 后自动重新加载。磁盘快照使服务重启后的首次加载也无需重新解析 xlsx。
+
+    Args:
+        namespace (str): 查看器名称 (如 "AI2D")
+        loader (callable): 查看器的原始加载函数，loader(file_path, path_rewrite) 返回 (df, error_msg)
+        file_path (str): 数据文件路径
+        columns (list): 读取的列 (影响加载结果，计入快照的键)
+        path_rewrite (tuple, optional): 虚拟模式的路径改写规则
+        token (tuple, optional): 数据源文件标识 (见 file_token)
+
+    Returns:
+        tuple: (df, error_msg)
+    """
+    options = {"columns": columns, "path_rewrite": path_rewrite}
+    return shared_store.get_frame(
+        namespace, file_path, path_rewrite, token,
+        lambda: cached_load(lambda: loader(file_path, path_rewrite), file_path, namespace, options),
+    )
+
+
+__all__ = [
+    'LOAD_CACHE_ENV',
+    'DEFAULT_LOAD_CACHE_DIR',
+    'LOADER_VERSION',
+    'get_cache_dir',
+    'file_token',
+    'cached_load',
+    'shared_load',
+    'CATEGORY_COLS',
+    'ARROW_STRING_COLS',
+    'compact_frame',
+    'format_memory_report',
+]
@@ -23,39 +23,23 @@ if os.path.exists(change_evalout_dir) and change_evalout_dir not in sys.path:
 
 # 3. 现在导入模块，内部的 sibling import 就能正常工作了
 from change_evalout import change_module 
+from change_evalout import table_io
+import image_utils  # 图片读取 (PIL 延迟导入) 与图片存在性索引
+import perf  # 单次重跑的分阶段计时
+import dataset_registry  # 数据集登记表 (不导入查看器模块)
+# 对比视图、准确率总览、案例库等模块只在对应分支中导入 (与 get_viewer_module 相同，之后由 sys.modules 缓存)
 
 # 1. 设置页面配置
 st.set_page_config(layout="wide", page_title="VLM-Dataset Case Viewer")
+perf.start_run()
 
-# 2. 导入子模块
-import tool3_show_AI2D
-import tool3_show_ChartQA
-import tool3_show_DocVQA
-import tool3_show_LogicVista
-import tool3_show_MathVerse
-import tool3_show_MathVision
-import tool3_show_MathVista
-import tool3_show_MMMU
-import tool3_show_MMStar
-import tool3_show_OCRBench
-import tool3_show_RealWorldQA
-import tool3_show_WeMath
-
-# 3. 定义数据集配置
-DATASETS = {
-    "AI2D":         {"module": tool3_show_AI2D,       "keyword": "AI2D"},
-    "ChartQA":      {"module": tool3_show_ChartQA,    "keyword": "ChartQA"},
-    "DocVQA":       {"module": tool3_show_DocVQA,     "keyword": "DocVQA"},
-    "LogicVista":   {"module": tool3_show_LogicVista, "keyword": "LogicVista"},
-    "MathVerse":    {"module": tool3_show_MathVerse,  "keyword": "MathVerse"},
-    "MathVision":   {"module": tool3_show_MathVision, "keyword": "MathVision"},
-    "MathVista":    {"module": tool3_show_MathVista,  "keyword": "MathVista"},
-    "MMMU":         {"module": tool3_show_MMMU,       "keyword": "MMMU"},
-    "MMStar":       {"module": tool3_show_MMStar,     "keyword": "MMStar"},
-    "OCRBench":     {"module": tool3_show_OCRBench,   "keyword": "OCRBench"},
-    "RealWorldQA":  {"module": tool3_show_RealWorldQA,"keyword": "RealWorldQA"},
-    "WeMath":       {"module": tool3_show_WeMath,     "keyword": "WeMath"},
-}
+# 2. 数据集配置 (查看器模块名、匹配关键字、必要列) 登记在 dataset_registry，
+# 选中某个数据集时才通过 importlib 导入对应模块，冷启动不再一次性加载全部 12 个查看器
+DATASETS = dataset_registry.DATASETS
+get_viewer_module = dataset_registry.get_viewer_module
+
+# 图片数据根目录 (各数据集图片文件夹的父目录)
+LMU_DATA_PATH = '/mnt/lustre/houbingxi/1212_moe_eval_badcase/LMUData'
 
 # ===========================
 #      侧边栏配置
@@ -67,30 +51,97 @@ default_raw_folder = "Your Eval Out Folder Path Here----taichu_vl_moe"
 raw_input_path = st.sidebar.text_input("📂 原始数据文件夹 (Raw):", value=default_raw_folder)
 folder_name = os.path.basename(raw_input_path.rstrip(os.sep))
 
-# 计算预期的检查文件夹路径 (添加 _for_check 后缀)
-clean_raw_path = raw_input_path.rstrip(os.sep)
-processed_folder_path = "/mnt/lustre/houbingxi/1212_moe_eval_badcase/tmp_data" + f"{clean_raw_path}_for_check"
+# 加载模式：转换副本需要先生成 _for_check 文件夹；虚拟模式直接读取原始文件，在内存中改写图片路径
+LOAD_MODE_CONVERTED = "📦 转换副本 (_for_check)"
+LOAD_MODE_VIRTUAL = "⚡ 虚拟模式 (直接读取原始数据)"
+# 案例库模式：从 case_store.py 导入的 SQLite 数据库中按页查询，只把当前页读入内存
+LOAD_MODE_STORE = "🗄️ 案例库 (SQLite)"
+load_mode = st.sidebar.radio(
+    "🧭 加载模式:",
+    options=[LOAD_MODE_CONVERTED, LOAD_MODE_VIRTUAL, LOAD_MODE_STORE],
+    help="虚拟模式不写任何文件，加载时按与格式转换相同的规则为 image_path 添加 LMUData 前缀"
+)
+virtual_mode = (load_mode == LOAD_MODE_VIRTUAL)
+store_mode = (load_mode == LOAD_MODE_STORE)
+
+def get_processed_folder_path(raw_path):
+    """计算预期的检查文件夹路径 (添加 _for_check 后缀)"""
+    clean_raw_path = raw_path.rstrip(os.sep)
+    return "/mnt/lustre/houbingxi/1212_moe_eval_badcase/tmp_data" + f"{clean_raw_path}_for_check"
+
+processed_folder_path = get_processed_folder_path(raw_input_path)
 File_Config = change_module.create_file_config(folder_name)
+
+# 格式转换的并行进程数 (每个数据集一个独立任务，超过任务数没有意义)
+convert_workers = st.sidebar.number_input(
+    "⚙️ 格式转换并行进程数:",
+    min_value=1,
+    max_value=len(File_Config),
+    value=min(len(File_Config), os.cpu_count() or 1),
+    help="为 1 时按顺序转换；大于 1 时使用进程池并行转换各数据集文件"
+)
+
+# 转换输出格式：列式文件 (Parquet / Arrow) 加载速度远快于 xlsx，查看器会优先读取
+convert_formats = st.sidebar.multiselect(
+    "💾 转换输出格式:",
+    options=list(table_io.OUTPUT_FORMATS),
+    default=list(table_io.DEFAULT_OUTPUT_FORMATS),
+    help="可同时输出多种格式；查看器优先加载同名的 parquet / arrow 文件"
+)
+
+def summarize_convert_results(results):
+    """统计转换结果，例如: 更新 1 个，未变化 11 个"""
+    updated = sum(1 for r in results.values() if r["status"] == "success")
+    unchanged = sum(1 for r in results.values() if r["status"] == "up_to_date")
+    return f"更新 {updated} 个，未变化 {unchanged} 个"
+
+def show_convert_results(results, container):
+    """在指定容器中展示失败的转换任务"""
+    failed = {name: r for name, r in results.items() if r["status"] == "failed"}
+    for name, r in failed.items():
+        container.error(f"❌ {name}: {r['error']}")
+    return len(failed)
+
 # ===========================
 #      处理逻辑控制 (核心修改)
 # ===========================
 # 检查目标文件夹是否存在
 target_exists = os.path.exists(processed_folder_path) and os.path.isdir(processed_folder_path)
 
-if target_exists:
+if store_mode:
+    # --- 案例库模式: 数据已由 case_store.py 导入，不读取数据文件夹 ---
+    from change_evalout import case_store
+    case_store_path = st.sidebar.text_input("🗄️ 案例库路径:", value=case_store.get_store_path())
+    if os.path.exists(case_store_path):
+        st.sidebar.success("✅ 案例库模式：按页从数据库查询。")
+    else:
+        st.sidebar.error("❌ 案例库文件不存在。")
+
+elif virtual_mode:
+    # --- 虚拟模式: 不需要 _for_check 文件夹 ---
+    target_exists = os.path.isdir(raw_input_path)
+    if target_exists:
+        st.sidebar.success("✅ 虚拟模式：直接读取原始数据文件夹。")
+    else:
+        st.sidebar.error("❌ 原始路径不存在。")
+
+elif target_exists:
     # --- 情况 A: 文件夹已存在 ---
     st.sidebar.success(f"✅ 检测到目标文件夹已存在，直接使用。")
     st.sidebar.caption(f"路径: `{os.path.basename(processed_folder_path)}`")
     
     # (可选) 如果用户想强制覆盖，可以提供一个折叠的按钮，防止误触
     with st.sidebar.expander("🛠️ 需要重新生成？"):
-        if st.button("🔄 强制重新格式转换"):
+        # 默认按转换清单增量更新，只重新生成有变化或缺失的文件
+        force_convert = st.checkbox("忽略转换清单，全部重新转换", value=False)
+        if st.button("🔄 重新格式转换"):
             with st.spinner("正在重新处理文件..."):
                 try:
-                    change_module.process_xlsx_files(raw_input_path, processed_folder_path, '/mnt/lustre/houbingxi/1212_moe_eval_badcase/LMUData', File_Config)
-                    st.success("重新处理完成！")
-                    time.sleep(1)
-                    st.rerun() # 刷新页面
+                    results = change_module.process_xlsx_files(raw_input_path, processed_folder_path, LMU_DATA_PATH, File_Config, max_workers=convert_workers, output_formats=convert_formats or None, force=force_convert)
+                    if show_convert_results(results, st) == 0:
+                        st.success(f"重新处理完成！{summarize_convert_results(results)}")
+                        time.sleep(1)
+                        st.rerun() # 刷新页面
                 except Exception as e:
                     st.error(f"错误: {e}")
 
@@ -103,18 +154,19 @@ else:
         if os.path.exists(raw_input_path):
             with st.spinner("正在调用 change_module 处理文件..."):
                 try:
-                    change_module.process_xlsx_files(raw_input_path,processed_folder_path,'/mnt/lustre/houbingxi/1212_moe_eval_badcase/LMUData', File_Config)
-                    st.sidebar.success("处理成功！正在加载...")
-                    time.sleep(1)
-                    st.rerun() # 刷新页面以进入“情况A”
+                    results = change_module.process_xlsx_files(raw_input_path,processed_folder_path,LMU_DATA_PATH, File_Config, max_workers=convert_workers, output_formats=convert_formats or None)
+                    if show_convert_results(results, st.sidebar) == 0:
+                        st.sidebar.success("处理成功！正在加载...")
+                        time.sleep(1)
+                        st.rerun() # 刷新页面以进入“情况A”
                 except Exception as e:
                     st.sidebar.error(f"处理失败: {e}")
                     st.exception(e)
         else:
             st.sidebar.error("❌ 原始路径不存在，无法转换。")
 
-# 无论哪种情况，后续逻辑都使用 processed_folder_path
-folder_path = processed_folder_path
+# 转换模式使用 processed_folder_path，虚拟模式直接使用原始文件夹
+folder_path = raw_input_path if virtual_mode else processed_folder_path
 
 st.sidebar.markdown("---")
 
@@ -122,6 +174,43 @@ st.sidebar.markdown("---")
 if "last_folder_path" not in st.session_state:
     st.session_state.last_folder_path = None
 
+# 图片静态 URL：图片按内容寻址的 URL 交给浏览器缓存，翻页与调整过滤条件时不再重新发送图片数据
+import image_server  # 图片静态 URL 服务
+use_image_urls = st.sidebar.checkbox(
+    "🌐 图片静态 URL (浏览器缓存)",
+    value=image_server.is_enabled_by_default(),
+    help=f"由本进程内的图片服务提供 (默认只监听本机，端口 {image_server.DEFAULT_IMAGE_SERVER_PORT})，浏览器需要能访问该端口 "
+         f"(ssh 端口转发，或设置 {image_server.IMAGE_SERVER_HOST_ENV}=0.0.0.0)；"
+         f"启动失败时自动回退为直接发送图片。默认值由环境变量 {image_server.IMAGE_SERVER_ENV} 控制"
+)
+image_utils.set_url_mode(use_image_urls)
+
+# 性能分析：页面底部展示本次重跑各阶段耗时，并追加写入日志
+show_perf = st.sidebar.checkbox(
+    "⏱️ 性能分析",
+    value=perf.is_enabled_by_default(),
+    key=perf.PERF_SESSION_KEY,
+    help=f"记录 load_data、过滤、分页、渲染与图片读取的耗时，写入 {perf.get_log_path()}。默认值由环境变量 {perf.PERF_ENV} 控制"
+)
+
+# 3. 准确率总览：一次统计全部数据集
+show_dashboard = st.sidebar.checkbox("📈 准确率总览 (全部数据集)", value=False)
+
+def build_dashboard_tasks(file_config):
+    """为总览页生成统计任务：每个文件对应的数据集、必要列与虚拟模式下的路径改写规则 (不导入查看器模块)"""
+    tasks = {}
+    for filename, config in file_config.items():
+        module_name = change_module.tool_module_name(config["module"])
+        dataset = dataset_registry.find_dataset(module_name)
+        if dataset is None:
+            continue
+        tasks[filename] = {
+            "dataset": dataset,
+            "required": list(dataset_registry.required_cols(dataset)),
+            "path_rewrite": change_module.get_path_rewrite(file_config, DATASETS[dataset]["keyword"], LMU_DATA_PATH) if virtual_mode else None,
+        }
+    return tasks
+
 # 4. 选择数据集
 selected_dataset_name = st.sidebar.selectbox(
     "请选择要查看的数据集:",
@@ -137,10 +226,50 @@ target_keyword = current_config["keyword"]
 auto_suggested_path = ""
 match_status_msg = ""
 
-# 在 folder_path (即 _for_check 目录) 中查找文件
+@st.cache_data(show_spinner=False)
+def list_data_files(folder_path, dir_mtime=None):
+    """
+    列出文件夹中的数据文件 (按目录修改时间缓存)
+
+    dir_mtime 只用于区分缓存键：文件增删、重命名 (包括转换时的原子替换) 都会更新目录修改时间，
+    目录没有变化时整页重跑不再重复扫描 Lustre 上的 _for_check 文件夹。
+
+    同名的 xlsx / parquet / arrow 视为同一份数据：优先返回 xlsx (加载时会自动优先读取列式文件)，
+    只有列式输出时才直接返回列式文件
+    """
+    data_exts = (".xlsx",) + tuple(table_io.COLUMNAR_FORMATS.values())
+    files_by_stem = {}
+    for f in sorted(os.listdir(folder_path)):
+        stem, ext = os.path.splitext(f)
+        if ext.lower() in data_exts and not f.startswith("~$"):
+            if stem not in files_by_stem or ext.lower() == ".xlsx":
+                files_by_stem[stem] = f
+    return sorted(files_by_stem.values())
+
+def find_dataset_files(folder_path, keyword, file_config=None):
+    """
+    在文件夹中查找数据集的数据文件
+
+    Args:
+        folder_path (str): 数据文件夹
+        keyword (str): 数据集关键字
+        file_config (dict, optional): 虚拟模式下传入该文件夹的转换配置 (见 change_module.create_file_config)。
+                                      原始文件夹中同一数据集往往有多个文件 (如裸预测文件与带 hit 的评分文件)，
+                                      此时只返回配置中登记的文件名，与格式转换 / 总览页选取的文件一致；
+                                      None 表示 _for_check 文件夹，按文件名包含关键字匹配
+    """
+    if file_config is not None:
+        return [
+            filename for filename, config in file_config.items()
+            if change_module.tool_module_name(config["module"]).endswith(f"_{keyword}")
+            and os.path.exists(os.path.join(folder_path, filename))
+        ]
+    files = list_data_files(folder_path, os.path.getmtime(folder_path))
+    return [f for f in files if keyword.lower() in f.lower()]
+
+# 在 folder_path (_for_check 目录，虚拟模式下为原始文件夹) 中查找文件
 if os.path.exists(folder_path) and os.path.isdir(folder_path):
-    all_files = [f for f in os.listdir(folder_path) if f.endswith(".xlsx") and not f.startswith("~$")]
-    matched_files = [f for f in all_files if target_keyword.lower() in f.lower()]
+    matched_files = find_dataset_files(folder_path, target_keyword, File_Config if virtual_mode else None)
     
     if len(matched_files) >= 1:
         auto_suggested_path = os.path.join(folder_path, matched_files[0])
@@ -150,7 +279,7 @@ if os.path.exists(folder_path) and os.path.isdir(folder_path):
     else:
         match_status_msg = f"❌ 文件夹中未找到包含 '{target_keyword}' 的文件"
 else:
-    # 如果代码走到这里，说明 target_exists 为 False 且用户还没点生成
+    # 如果代码走到这里，说明 target_exists 为 False 且用户还没点生成 (或虚拟模式下原始路径不存在)
     match_status_msg = "⚠️ 等待生成数据文件夹..."
 
 if match_status_msg:
@@ -179,12 +308,55 @@ final_file_path = st.sidebar.text_input(
     key=input_key
 )
 
+# ===========================
+#      对比模式
+# ===========================
+# 从另一个 checkpoint 的文件夹中按同样规则找到同一数据集的文件，按 index 连接后对比
+compare_mode = st.sidebar.checkbox("🆚 对比模式", value=False, help="与另一个 checkpoint 的评测结果按 index 对比")
+compare_file_path = None
+if compare_mode:
+    compare_raw_path = st.sidebar.text_input("📂 对比基线文件夹 (Raw):", key="compare_raw_path")
+    compare_folder_path = compare_raw_path if virtual_mode else get_processed_folder_path(compare_raw_path)
+    if compare_raw_path and os.path.isdir(compare_folder_path):
+        compare_config = change_module.create_file_config(os.path.basename(compare_raw_path.rstrip(os.sep))) if virtual_mode else None
+        compare_files = find_dataset_files(compare_folder_path, target_keyword, compare_config)
+        if compare_files:
+            compare_file_path = os.path.join(compare_folder_path, compare_files[0])
+            st.sidebar.caption(f"✅ 基线文件: {compare_files[0]}")
+        else:
+            st.sidebar.caption(f"❌ 基线文件夹中未找到包含 '{target_keyword}' 的文件")
+    elif compare_raw_path:
+        st.sidebar.caption("⚠️ 基线文件夹不存在 (转换副本模式下需要先对其执行格式转换，或切换到虚拟模式)")
+
 # ===========================
 #      路由分发
 # ===========================
-if final_file_path and os.path.exists(final_file_path):
+perf.lap("main.sidebar")
+if store_mode:
     try:
-        current_config["module"].run(final_file_path)
+        import store_view  # SQLite 案例库视图
+        store_view.run(case_store_path, selected_dataset_name)
+    except Exception as e:
+        st.title(f"📊 {selected_dataset_name} Viewer")
+        st.error("运行模块时发生错误:")
+        st.exception(e)
+elif show_dashboard:
+    if target_exists:
+        # 统计结果缓存在 _for_check 文件夹中；虚拟模式不向原始文件夹写文件
+        import dashboard  # 全部数据集的准确率总览
+        dashboard.run(folder_path, build_dashboard_tasks(File_Config), max_workers=convert_workers, use_sidecar=not virtual_mode)
+    else:
+        st.title("📈 准确率总览")
+        st.info("👈 请先准备数据文件夹 (执行格式转换，或使用虚拟模式)。")
+elif final_file_path and os.path.exists(final_file_path):
+    try:
+        # 虚拟模式下把该数据集的路径改写规则传给查看器，在加载时应用
+        path_rewrite = change_module.get_path_rewrite(File_Config, target_keyword, LMU_DATA_PATH) if virtual_mode else None
+        if compare_file_path:
+            import compare_view  # 两个 checkpoint 的对比视图
+            compare_view.run(DATASETS[selected_dataset_name]["module"], final_file_path, compare_file_path, path_rewrite)
+        else:
+            get_viewer_module(selected_dataset_name).run(final_file_path, path_rewrite)
     except Exception as e:
         st.title(f"📊 {selected_dataset_name} Viewer")
         st.error("运行模块时发生错误:")
@@ -192,9 +364,13 @@ if final_file_path and os.path.exists(final_file_path):
 else:
     st.title(f"📊 {selected_dataset_name} Viewer")
     if not final_file_path:
-        if not target_exists:
+        if not target_exists and virtual_mode:
+            st.info("👈 请在左侧填写存在的原始数据文件夹路径。")
+        elif not target_exists:
             st.info("👈 请在左侧点击【执行格式转换生成】以准备数据。")
         else:
             st.info(f"等待加载文件... 请检查 {selected_dataset_name} 是否存在于文件夹中。")
     else:
-        st.warning(f"⚠️ 文件不存在: {final_file_path}")
\ No newline at end of file
+        st.warning(f"⚠️ 文件不存在: {final_file_path}")
+
+perf.finish_run(show_perf, {"dataset": selected_dataset_name, "load_mode": load_mode, "file": final_file_path})
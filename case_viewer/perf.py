@@ -0,0 +1,168 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+import streamlit as st
+
+# ===========================
+#      单次重跑的性能分析
+# ===========================
+# 把一次脚本重跑拆分为 main.py 侧边栏、load_data、过滤、分页切片、卡片渲染等阶段计时，
+# 图片打开 + 解码单独累计 (包含在卡片渲染阶段内)。开启后在页面底部的折叠面板中展示，
+# 并追加写入 slurm 日志目录下的 JSON Lines 文件，便于事后按数据集、阶段汇总。
+#
+# 计时用 lap 记录 "距上一个计时点的耗时"，查看器中只需在阶段结束处插入一行，不需要改动缩进。
+# Streamlit 每个会话的脚本在各自的线程中运行，计时数据按线程保存，会话之间互不干扰。
+# 查看器的结果列表是 fragment，翻页时只重跑 fragment，main.py 的 start_run / finish_run 不会执行，
+# 这类重跑由 fragment_run 单独开始并记录一次计时 (日志中 fragment 为 true)。
+
+# 是否默认开启 (侧边栏可按会话切换)
+PERF_ENV = "VLM_PERF"
+# 日志目录可通过环境变量覆盖，默认与 slurm_node.sh 的日志目录相同
+PERF_LOG_DIR_ENV = "VLM_PERF_LOG_DIR"
+DEFAULT_PERF_LOG_DIR = '/mnt/lustre/houbingxi/1212_moe_eval_badcase/case_viewer/logs'
+PERF_LOG_FILENAME = "perf.jsonl"
+# 侧边栏开关的 session_state 键 (fragment 单独重跑时从这里读取是否开启)
+PERF_SESSION_KEY = "perf_enabled"
+
+_state = threading.local()
+_log_lock = threading.Lock()
+
+
+def is_enabled_by_default():
+    """环境变量设置为 1 / true / yes 时默认开启"""
+    return os.environ.get(PERF_ENV, "").strip().lower() in ("1", "true", "yes")
+
+
+def get_log_path():
+    """性能日志路径：环境变量指定的目录 > 默认目录"""
+    return os.path.join(os.environ.get(PERF_LOG_DIR_ENV) or DEFAULT_PERF_LOG_DIR, PERF_LOG_FILENAME)
+
+
+def start_run():
+    """开始一次脚本重跑的计时 (main.py 最开始调用)"""
+    now = time.perf_counter()
+    _state.run = {"start": now, "last": now, "phases": {}}
+
+
+def _add(name, seconds):
+    phases = _state.run["phases"]
+    total, count = phases.get(name, (0.0, 0))
+    phases[name] = (total + seconds, count + 1)
+
+
+def lap(name):
+    """记录距上一个计时点的耗时，计入阶段 name (未开始计时时不做任何事)"""
+    run = getattr(_state, "run", None)
+    if run is None:
+        return
+    now = time.perf_counter()
+    _add(name, now - run["last"])
+    run["last"] = now
+
+
+@contextmanager
+def phase(name):
+    """
+    累计一段代码的耗时 (可多次进入，例如每张图片一次)
+
+    与 lap 独立计时，不影响计时点，因此可以嵌套在 lap 的阶段之内。
+    """
+    if getattr(_state, "run", None) is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _add(name, time.perf_counter() - start)
+
+
+@contextmanager
+def fragment_run(context=None):
+    """
+    fragment 单独重跑时的计时 (可作为装饰器写在 @st.fragment 下面)
+
+    整页重跑时计时已由 main.py 开始，这里不做任何事；fragment 单独重跑时开始一次新的计时，
+    结束时按侧边栏开关 (st.session_state[PERF_SESSION_KEY]) 展示并写入日志。
+
+    Args:
+        context (dict, optional): 随日志记录的上下文，例如数据集、文件路径
+    """
+    if getattr(_state, "run", None) is not None:
+        yield
+        return
+    start_run()
+    try:
+        yield
+    except BaseException:
+        # st.rerun 等以异常结束的重跑不记录
+        _state.run = None
+        raise
+    finish_run(bool(st.session_state.get(PERF_SESSION_KEY, False)), {**(context or {}), "fragment": True})
+
+
+def _append_log(record):
+    """追加一行 JSON 到性能日志 (日志目录不可写时只打印错误，不影响页面)"""
+    log_path = get_log_path()
+    try:
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with _log_lock:
+            with open(log_path, 'a', encoding='utf-8') as f:
+                f.write(line)
+    except OSError as e:
+        print(f"[性能分析] 日志写入失败: {e}")
+
+
+def finish_run(enabled, context=None):
+    """
+    结束计时；开启时展示各阶段耗时并写入日志
+
+    Args:
+        enabled (bool): 是否展示并记录 (关闭时只丢弃本次计时)
+        context (dict, optional): 随日志记录的上下文，例如数据集、加载模式
+
+    Returns:
+        dict | None: 本次记录，未开启时返回 None
+    """
+    run = getattr(_state, "run", None)
+    if run is None:
+        return None
+    # 最后一个计时点之后的耗时 (底部翻页、JS 注入等)
+    lap("other")
+    _state.run = None
+    if not enabled:
+        return None
+
+    record = {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "pid": os.getpid(),
+        **(context or {}),
+        "total_ms": round((run["last"] - run["start"]) * 1000, 2),
+        "phases": {name: {"ms": round(total * 1000, 2), "count": count} for name, (total, count) in run["phases"].items()},
+    }
+    _append_log(record)
+
+    with st.expander(f"⏱️ 性能分析: 本次重跑 {record['total_ms']:.0f} ms", expanded=False):
+        rows = [{"阶段": name, "耗时 (ms)": v["ms"], "次数": v["count"]} for name, v in record["phases"].items()]
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+        st.caption(f"image 为图片打开 + 解码的累计耗时，包含在 render 阶段内。日志: `{get_log_path()}`")
+    return record
+
+
+__all__ = [
+    'PERF_ENV',
+    'PERF_LOG_DIR_ENV',
+    'DEFAULT_PERF_LOG_DIR',
+    'PERF_SESSION_KEY',
+    'is_enabled_by_default',
+    'get_log_path',
+    'start_run',
+    'lap',
+    'phase',
+    'fragment_run',
+    'finish_run',
+]
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+from rapidfuzz.distance import Levenshtein
+from rapidfuzz.process import cpdist
+from change_evalout import hit_rules
+
+# ===========================
+#      答案匹配打分
+# ===========================
+# DocVQA / OCRBench 的 answer 可能是单个答案，也可能是 "['a', 'b']" 形式的多个候选答案。
+# 候选答案由 hit_rules.answer_lists 整列解析一次 (hit 与 ANLS 共用同一份解析结果)，展开为 (答案, 预测) 对后批量计算
+# ANLS (1 - 归一化编辑距离，取各候选答案中的最大值；距离 >= 阈值时记为 0)。
+# hit 的计算规则不做规范化，见 change_evalout/hit_rules.py
+# 编辑距离使用 rapidfuzz (C++ 实现，批量多线程计算，见 requirements.txt)，
+# 距离超过阈值的对 (这些对的 ANLS 必然为 0) 不计算精确距离。
+# 相同的 (答案, 预测) 对只计算一次。
+
+# ANLS 的标准阈值
+ANLS_THRESHOLD = 0.5
+
+
+def normalize_text(series):
+    """规范化文本 (向量化)：转小写、去掉首尾空白、合并连续空白"""
+    return series.astype(str).str.lower().str.split().str.join(" ")
+
+
+def parse_answer_lists(answers, lists=None):
+    """
+    将 answer 列转为规范化的候选答案列表
+
+    能解析为非空列表的行使用列表中的各个答案，其余按单个答案处理。
+
+    Args:
+        answers (pd.Series): answer 列
+        lists (pd.Series, optional): hit_rules.answer_lists(answers) 的结果，已经为 hit 解析过时传入以免重复解析
+
+    Returns:
+        pd.Series: 每行为规范化后的候选答案列表 (至少包含一个元素)
+    """
+    if lists is None:
+        lists = hit_rules.answer_lists(answers)
+    single = normalize_text(answers).to_numpy(dtype=object)
+    values = [
+        [" ".join(str(x).lower().split()) for x in items] if isinstance(items, list) and items else [text]
+        for text, items in zip(single, lists.to_numpy(dtype=object))
+    ]
+    return pd.Series(values, index=answers.index, dtype=object)
+
+
+def _pairs(answer_lists, predictions):
+    """展开为 (答案, 预测) 对，行索引与原数据一致 (每个候选答案一行)"""
+    answers = answer_lists.explode()
+    preds = normalize_text(predictions).reindex(answers.index)
+    return pd.DataFrame({"answer": answers.values, "prediction": preds.values}, index=answers.index)
+
+
+def normalized_distances(answers, predictions, score_cutoff=None):
+    """
+    批量计算归一化编辑距离 (编辑距离 / 较长字符串的长度)
+
+    Args:
+        answers (list): 答案列表
+        predictions (list): 预测列表 (与 answers 一一对应)
+        score_cutoff (float, optional): 只关心不大于该值的距离 (如 ANLS 阈值)，
+                                        超过该值的对直接返回 1.0，不再计算精确距离
+
+    Returns:
+        np.ndarray: 距离，取值 0 ~ 1
+    """
+    # 逐对批量计算，多线程
+    return np.asarray(cpdist(answers, predictions, scorer=Levenshtein.normalized_distance,
+                             score_cutoff=score_cutoff, workers=-1), dtype=float)
+
+
+def anls(answer_lists, predictions, threshold=ANLS_THRESHOLD):
+    """
+    计算每行的 ANLS 分数
+
+    Args:
+        answer_lists (pd.Series): parse_answer_lists 的返回值
+        predictions (pd.Series): prediction 列
+        threshold (float): 归一化编辑距离不小于该值时记为 0 分
+
+    Returns:
+        pd.Series: float，取值 0 ~ 1
+    """
+    pairs = _pairs(answer_lists, predictions)
+    unique = pairs.drop_duplicates().reset_index(drop=True)
+    dist = normalized_distances(unique["answer"].tolist(), unique["prediction"].tolist(), score_cutoff=threshold)
+    unique["anls"] = np.where(dist < threshold, 1.0 - dist, 0.0)
+
+    scored = pairs.reset_index().merge(unique, on=["answer", "prediction"], how="left")
+    scored = scored.set_index(scored.columns[0])["anls"]
+    result = scored.groupby(level=0, sort=False).max().reindex(answer_lists.index, fill_value=0.0)
+    return result.round(4)
+
+
+__all__ = [
+    'ANLS_THRESHOLD',
+    'normalize_text',
+    'parse_answer_lists',
+    'normalized_distances',
+    'anls',
+]
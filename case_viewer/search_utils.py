@@ -0,0 +1,277 @@
+import re
+import numpy as np
+import pandas as pd
+import shared_store  # 哈希表与倒排索引在进程内共享，所有会话只构建一次
+
+# ===========================
+#      Index 搜索工具
+# ===========================
+# 每个加载的文件只构建一次 index -> 行号 的哈希表，之后按 index 查询只需 O(k)，不再整列扫描。
+# 搜索框支持一次粘贴多个 index (例如同事发来的整份错例列表) 以及范围写法。
+
+# 多个 index 之间的分隔符：逗号 (中英文)、分号、空白
+_SPLIT_RE = re.compile(r"[,，;；\s]+")
+# 范围写法: 10-20 / 10~20 / 10..20 (两端均包含)
+_RANGE_RE = re.compile(r"^(\d+)\s*(?:-|~|\.\.)\s*(\d+)$")
+# 粘贴 Python / JSON 列表时需要去掉的括号与引号
+_STRIP_CHARS = "[](){}'\""
+
+# 单个范围最多展开的 index 数量，防止误输入 (如 1-99999999) 占满内存
+MAX_RANGE_SIZE = 100000
+
+
+def parse_index_query(query):
+    """
+    解析搜索框输入
+
+    Args:
+        query (str): 如 "12"、"1, 5, 7"、"10-20"、"['a1', 'a2']"，多种写法可以混合
+
+    Returns:
+        list: 去重后的 index 字符串列表，保持输入顺序
+    """
+    tokens = {}
+    for part in _SPLIT_RE.split(str(query)):
+        part = part.strip(_STRIP_CHARS)
+        if not part:
+            continue
+        m = _RANGE_RE.match(part)
+        if m:
+            start, end = int(m.group(1)), int(m.group(2))
+            if start <= end and end - start < MAX_RANGE_SIZE:
+                for i in range(start, end + 1):
+                    tokens[str(i)] = None
+                continue
+        tokens[part] = None
+    return list(tokens)
+
+
+def build_index_map(index_series):
+    """
+    构建 index -> 行号列表 的哈希表 (index 可能重复，因此值为列表)
+
+    Args:
+        index_series (pd.Series): index 列 (已转为字符串)
+
+    Returns:
+        dict: {index: [行号, ...]}
+    """
+    index_map = {}
+    for pos, value in enumerate(index_series.tolist()):
+        index_map.setdefault(value, []).append(pos)
+    return index_map
+
+
+def get_index_map(index_series, cache_key=None):
+    """
+    获取 index 哈希表，按 cache_key 在进程内共享 (cache_key 应包含文件标识，文件修改后自动重建)
+
+    Args:
+        index_series (pd.Series): index 列
+        cache_key (hashable, optional): 缓存键，None 表示不缓存
+
+    Returns:
+        dict: {index: [行号, ...]}
+    """
+    return shared_store.get_derived("index_map", cache_key, lambda: build_index_map(index_series))
+
+
+def lookup_indices(df, index_map, tokens):
+    """
+    按 index 列表取出对应的行 (结果顺序与输入顺序一致)
+
+    Args:
+        df (pd.DataFrame): 完整数据
+        index_map (dict): get_index_map 的返回值
+        tokens (list): parse_index_query 的返回值
+
+    Returns:
+        tuple: (命中的行, 未找到的 index 列表)
+    """
+    positions = []
+    not_found = []
+    for token in tokens:
+        rows = index_map.get(token)
+        if rows is None:
+            not_found.append(token)
+        else:
+            positions.extend(rows)
+    return df.iloc[positions], not_found
+
+
+def format_not_found(not_found, limit=20):
+    """未找到的 index 提示文本，过多时只列出前 limit 个"""
+    shown = ", ".join(not_found[:limit])
+    more = f" 等 {len(not_found)} 个" if len(not_found) > limit else ""
+    return f"以下 Index 未找到: {shown}{more}"
+
+
+# ===========================
+#      全文搜索
+# ===========================
+# 两种匹配方式，由查看器中的选项切换：
+#   子串 (默认)  查询串出现在任一列中即命中，"cat" 也会匹配 "category"。直接在 DataFrame 的列上
+#                str.contains，不保存文本副本 (Arrow 字符串列由 pyarrow 向量化匹配)
+#   整词         查询中的每个词都作为完整的词出现 (不要求相邻)，通过倒排索引求交集，不逐行扫描
+# 以 REGEX_PREFIX 开头的查询按正则表达式逐列匹配，与匹配方式无关。均不区分大小写。
+
+# 参与全文搜索的列 (只使用数据中实际存在的列)
+TEXT_SEARCH_COLS = ["question", "prediction", "answer", "res", "extract"]
+
+# 以该前缀开头的查询按正则表达式处理
+REGEX_PREFIX = "re:"
+
+# 匹配方式 -> 界面上的名称
+MODE_SUBSTRING = "substring"
+MODE_WORD = "word"
+SEARCH_MODES = {MODE_SUBSTRING: "子串", MODE_WORD: "整词"}
+
+# 英文/数字按单词切分，中文按单字切分
+_TOKEN_RE = re.compile(r"[0-9a-z]+|[\u4e00-\u9fff]")
+
+
+def tokenize(text):
+    """将文本切分为小写的词元列表"""
+    return _TOKEN_RE.findall(str(text).lower())
+
+
+def _search_columns(df):
+    return [c for c in TEXT_SEARCH_COLS if c in df.columns]
+
+
+def _as_text(series):
+    """字符串列直接使用；object / category / 数值列临时转为字符串 (数字答案也能被搜到)，不缓存"""
+    if isinstance(series.dtype, pd.StringDtype):
+        return series
+    return series.astype(object).fillna("").astype(str)
+
+
+def _lower_texts(series):
+    """小写文本列表 (category / Arrow 字符串列先转为 object，空值才能填充为空串)"""
+    return series.astype(object).fillna("").astype(str).str.lower().tolist()
+
+
+def build_text_index(df, columns=None):
+    """
+    构建整词搜索的倒排索引
+
+    只保存 词元 -> 行号数组，不保存文本副本 (子串与正则搜索直接扫描 DataFrame 的列)。
+
+    Args:
+        df (pd.DataFrame): 完整数据
+        columns (list, optional): 参与搜索的列，默认为 TEXT_SEARCH_COLS 中存在的列
+
+    Returns:
+        dict: {"columns": 列名, "postings": {词元: 行号数组 (int32，升序)}}
+    """
+    if columns is None:
+        columns = _search_columns(df)
+
+    postings = {}
+    for pos, texts in enumerate(zip(*(_lower_texts(df[col]) for col in columns))):
+        tokens = set()
+        for text in texts:
+            tokens.update(_TOKEN_RE.findall(text))
+        for token in tokens:
+            postings.setdefault(token, []).append(pos)
+    postings = {token: np.asarray(rows, dtype=np.int32) for token, rows in postings.items()}
+    return {"columns": columns, "postings": postings}
+
+
+def get_text_index(df, cache_key=None):
+    """获取倒排索引，按 cache_key 在进程内共享 (与 get_index_map 相同，每个加载的文件只构建一次)"""
+    return shared_store.get_derived("text_index", cache_key, lambda: build_text_index(df))
+
+
+def _match_mask(frame, query):
+    """
+    子串或正则匹配 (逐列 str.contains，任一列命中即可)
+
+    Returns:
+        tuple: (bool 数组，与 frame 的行一一对应, 错误信息)
+    """
+    mask = np.zeros(len(frame), dtype=bool)
+    if query.startswith(REGEX_PREFIX):
+        pattern = query[len(REGEX_PREFIX):].strip()
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            return mask, f"正则表达式错误: {e}"
+        for col in _search_columns(frame):
+            # 转为 object 使用 Python 的正则语法 (Arrow 字符串列默认使用 RE2)
+            mask |= _as_text(frame[col]).astype(object).str.contains(pattern, case=False, regex=True, na=False).to_numpy(dtype=bool)
+        return mask, None
+
+    for col in _search_columns(frame):
+        mask |= _as_text(frame[col]).str.contains(query, case=False, regex=False, na=False).to_numpy(dtype=bool)
+    return mask, None
+
+
+def _word_positions(df, query, cache_key=None):
+    """整词匹配：查询中的全部词元都出现的行号 (升序)"""
+    tokens = set(tokenize(query))
+    if not tokens:
+        return np.zeros(0, dtype=np.int32)
+    postings = get_text_index(df, cache_key)["postings"]
+    empty = np.zeros(0, dtype=np.int32)
+    lists = sorted((postings.get(t, empty) for t in tokens), key=len)
+    rows = lists[0]
+    for other in lists[1:]:
+        rows = np.intersect1d(rows, other, assume_unique=True)
+    return rows
+
+
+def text_search(df, query, cache_key=None, mode=MODE_SUBSTRING):
+    """
+    全文搜索
+
+    Args:
+        df (pd.DataFrame): 完整数据
+        query (str): 查询内容，以 REGEX_PREFIX 开头时按正则表达式匹配
+        cache_key (hashable, optional): 倒排索引的缓存键 (只有整词匹配使用)
+        mode (str): MODE_SUBSTRING 或 MODE_WORD，见 SEARCH_MODES
+
+    Returns:
+        tuple: (命中的行号列表 (升序), 错误信息)
+    """
+    query = str(query).strip()
+    if mode == MODE_WORD and not query.startswith(REGEX_PREFIX):
+        return _word_positions(df, query, cache_key).tolist(), None
+    mask, error_msg = _match_mask(df, query)
+    return np.flatnonzero(mask).tolist(), error_msg
+
+
+def filter_by_text(df, df_display, query, cache_key=None, mode=MODE_SUBSTRING):
+    """
+    在当前展示范围 (例如 Hit 过滤之后) 内按全文搜索进一步过滤
+
+    子串 / 正则匹配只扫描 df_display 中的行；整词匹配使用整个文件的倒排索引。
+
+    Returns:
+        tuple: (过滤后的 df_display, 错误信息)
+    """
+    query = str(query).strip()
+    if mode == MODE_WORD and not query.startswith(REGEX_PREFIX):
+        positions = _word_positions(df, query, cache_key)
+        return df_display[df_display.index.isin(df.index[positions])], None
+    mask, error_msg = _match_mask(df_display, query)
+    return df_display[mask], error_msg
+
+
+__all__ = [
+    'parse_index_query',
+    'build_index_map',
+    'get_index_map',
+    'lookup_indices',
+    'format_not_found',
+    'TEXT_SEARCH_COLS',
+    'REGEX_PREFIX',
+    'MODE_SUBSTRING',
+    'MODE_WORD',
+    'SEARCH_MODES',
+    'tokenize',
+    'build_text_index',
+    'get_text_index',
+    'text_search',
+    'filter_by_text',
+]
@@ -0,0 +1,140 @@
+import os
+import threading
+from collections import OrderedDict
+
+# ===========================
+#      进程内共享数据
+# ===========================
+# slurm_node.sh 只启动一个 Streamlit 进程，多位同事经常同时打开同一个 checkpoint。
+# st.cache_data 每次命中都会反序列化出一份新的 DataFrame (每个会话、每次重跑各一份)，
+# 这里改为整个进程只保存一份：所有会话拿到的是同一个对象，内存占用不随会话数增长。
+# index 哈希表、倒排索引等派生数据同样在进程内共享 (见 get_derived)。
+#
+# 同一个键只会加载 / 构建一次：多个会话同时打开同一文件时，后来的会话等待第一个会话加载完成。
+# 共享的 DataFrame 不能原地修改 (列赋值、inplace 操作)；过滤、切片得到的是新对象，不受影响。
+
+# 最多同时保存的数据文件数 (每个文件、每种加载方式一份)，可通过环境变量覆盖
+SHARED_FRAMES_ENV = "VLM_SHARED_FRAMES"
+DEFAULT_MAX_SHARED_FRAMES = 16
+
+# 每个数据文件通常有 index 哈希表、倒排索引、图片路径分组与缺失统计四份派生数据，这里留出余量
+DERIVED_PER_FRAME = 6
+
+
+def get_max_frames():
+    """最多保存的数据文件数：环境变量 > 默认值"""
+    try:
+        return max(1, int(os.environ.get(SHARED_FRAMES_ENV) or DEFAULT_MAX_SHARED_FRAMES))
+    except ValueError:
+        return DEFAULT_MAX_SHARED_FRAMES
+
+
+class _SharedCache:
+    """
+    线程安全的 LRU 缓存，每个 slot 只保存最新版本
+
+    同一 slot 的版本变化时 (例如文件被修改)，旧对象立即释放，不会与新对象同时占用内存。
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # {slot: {"version", "lock", "value", "ready"}}
+        self._entries = OrderedDict()
+
+    def get(self, slot, version, builder):
+        with self._lock:
+            entry = self._entries.get(slot)
+            if entry is None or entry["version"] != version:
+                entry = {"version": version, "lock": threading.Lock(), "value": None, "ready": False}
+                self._entries[slot] = entry
+            self._entries.move_to_end(slot)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        # 只锁住当前条目，不同文件的加载互不阻塞
+        with entry["lock"]:
+            if not entry["ready"]:
+                entry["value"] = builder()
+                entry["ready"] = True
+            return entry["value"]
+
+    def discard(self, slot, version):
+        """删除指定版本的条目 (已被新版本替换时不做任何事)"""
+        with self._lock:
+            entry = self._entries.get(slot)
+            if entry is not None and entry["version"] == version:
+                del self._entries[slot]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_frames = _SharedCache(get_max_frames())
+_derived = _SharedCache(get_max_frames() * DERIVED_PER_FRAME)
+
+
+def get_frame(namespace, file_path, path_rewrite, file_token, loader):
+    """
+    获取进程内共享的数据 (查看器 load_data 的返回值)
+
+    Args:
+        namespace (str): 查看器名称 (如 "AI2D")，同一文件在不同查看器中的预处理不同
+        file_path (str): 数据源文件路径
+        path_rewrite (tuple | None): 虚拟模式的路径改写规则
+        file_token (tuple | None): 数据源文件标识 (见 load_cache.file_token)，文件修改后重新加载
+        loader (callable): 无参数的加载函数，返回 (df, error_msg)
+
+    Returns:
+        tuple: (df, error_msg)，df 为所有会话共享的同一个对象
+    """
+    slot = (namespace, os.path.abspath(file_path), path_rewrite)
+    df, error_msg = _frames.get(slot, file_token, loader)
+    if error_msg:
+        # 读取失败不保留，下次重跑时重新尝试 (例如文件仍在写入)
+        _frames.discard(slot, file_token)
+    return df, error_msg
+
+
+def get_derived(name, cache_key, builder, version=None):
+    """
+    获取进程内共享的派生数据 (如 index 哈希表、倒排索引)
+
+    Args:
+        name (str): 派生数据的种类
+        cache_key (hashable | None): 缓存键，应包含文件标识；None 表示不缓存，直接构建
+        builder (callable): 无参数的构建函数
+        version (hashable, optional): 版本标识，变化时重新构建并替换旧结果 (不额外占用条目)
+
+    Returns:
+        构建结果 (所有会话共享，调用方不能修改)
+    """
+    if cache_key is None:
+        return builder()
+    return _derived.get((name, cache_key), version, builder)
+
+
+def clear():
+    """清空全部共享数据 (文件被替换后手动释放内存等场景)"""
+    _frames.clear()
+    _derived.clear()
+
+
+def stats():
+    """当前保存的数据文件数与派生数据数"""
+    return {"frames": len(_frames), "derived": len(_derived)}
+
+
+__all__ = [
+    'SHARED_FRAMES_ENV',
+    'DEFAULT_MAX_SHARED_FRAMES',
+    'get_max_frames',
+    'get_frame',
+    'get_derived',
+    'clear',
+    'stats',
+]
@@ -0,0 +1,151 @@
+import streamlit as st
+import os
+import json
+from change_evalout import case_store
+from change_evalout import path_prefix
+import image_utils  # 图片读取 (PIL 延迟导入) 与图片存在性索引
+import search_utils  # Index 哈希表查找与全文搜索
+
+# ===========================
+#      配置区域
+# ===========================
+ITEMS_PER_PAGE = 10
+
+# 选项列 (保存在 cases.extra 中)
+OPTION_COLS = ["A", "B", "C", "D", "E", "F", "G", "H", "I"]
+
+
+@st.cache_resource
+def get_connection(db_path):
+    """只读连接在所有会话间共享 (SQLite 只读连接可以跨线程使用)"""
+    return case_store.connect(db_path, readonly=True)
+
+
+def _render_row(row, images):
+    """展示一条案例"""
+    is_hit = row['hit'] == 1
+    header_color = "#198754" if is_hit else "#dc3545"
+    hit_icon = "✅" if is_hit else "❌"
+
+    with st.container(border=True):
+        col_img, col_text = st.columns([1, 2])
+
+        with col_img:
+            paths = [p for p in images if p.lower() != 'nan']
+            if not paths:
+                st.info("无关联图片")
+            for img_path in paths:
+                if image_utils.image_exists(img_path):
+                    try:
+                        st.image(image_utils.image_source(image_utils.default_display_path(img_path)), caption=os.path.basename(img_path), use_container_width=True)
+                    except Exception as e:
+                        st.error(f"Image Error: {e}")
+                else:
+                    st.warning(f"图片缺失: {img_path}")
+
+        with col_text:
+            st.markdown(f"<h4 style='color: {header_color}; margin:0;'>Index: {row['index']} &nbsp;&nbsp; {hit_icon} (Hit: {row['hit']})</h4>", unsafe_allow_html=True)
+            st.markdown(f"**Q:** {row['question']}")
+
+            # 选项保存在 cases.extra；旧版案例库中所有额外列都在 cases.extra，这里一并读取 predictions.extra
+            extra = json.loads(row['run_extra']) if row['run_extra'] else {}
+            extra.update(json.loads(row['extra']) if row['extra'] else {})
+            for opt in OPTION_COLS:
+                if extra.get(opt) is not None and str(extra[opt]).strip() not in ("", "nan"):
+                    st.markdown(f"- **{opt}**: {extra[opt]}")
+
+            c_ans, c_pred = st.columns(2)
+            with c_ans:
+                st.info(f"**Standard Answer:**\n\n{row['answer']}")
+            with c_pred:
+                short = row['res'] if row['res'] is not None else row['extract']
+                text = f"**Model Res:**\n\n{short}" if short is not None else f"**Model Prediction:**\n\n{row['prediction']}"
+                if is_hit:
+                    st.success(text)
+                else:
+                    st.error(text)
+
+            if row['res'] is not None or row['extract'] is not None:
+                with st.expander("查看完整模型输出 (Prediction / Chain of Thought)"):
+                    st.code(str(row['prediction']), language="text", wrap_lines=True)
+
+
+# ===========================
+#      模块主入口函数
+# ===========================
+def run(db_path, dataset_name):
+
+    prefix = "store"
+
+    if not os.path.exists(db_path):
+        st.title(f"📊 {dataset_name} Viewer")
+        st.error(f"⚠️ 案例库不存在: {db_path}")
+        st.caption("请先执行: python change_evalout/case_store.py <xxx_for_check 文件夹> ... --db <数据库路径>")
+        return
+
+    conn = get_connection(db_path)
+    runs = case_store.list_runs(conn)
+    if not runs:
+        st.warning("案例库中还没有导入任何 run。")
+        return
+
+    # --- 侧边栏 ---
+    st.sidebar.divider()
+    run_name = st.sidebar.selectbox("Run", options=runs, key=f"{prefix}_run")
+    if dataset_name not in case_store.list_datasets(conn, run_name):
+        st.title(f"📊 {dataset_name} Viewer")
+        st.warning(f"Run '{run_name}' 中没有导入 {dataset_name}。")
+        return
+
+    filter_hit = st.sidebar.multiselect(
+        "Hit 状态过滤",
+        options=[1, 0],
+        default=[1, 0],
+        key=f"{prefix}_filter_hit"
+    )
+
+    # --- 标题与搜索 ---
+    st.title(f"📊 {dataset_name} Viewer")
+    st.caption(f"🗄️ 案例库: `{os.path.basename(db_path)}` · Run: `{run_name}`")
+
+    col_search, col_text_search = st.columns([1, 2])
+    with col_search:
+        search_query = st.text_input("🔍 按 Index 搜索", key=f"{prefix}_search_input", placeholder="输入 Index ID，支持多个或范围，如 1, 5, 10-20")
+    with col_text_search:
+        text_query = st.text_input("📝 文本搜索", key=f"{prefix}_text_search_input", placeholder="question / answer / prediction 中包含的文本")
+
+    # 按 Index 搜索时不叠加 Hit 过滤，与各数据集查看器一致
+    indices = search_utils.parse_index_query(search_query) if search_query else None
+    hit = None if indices else filter_hit
+
+    # --- 分页 (过滤条件变化时回到第一页) ---
+    page_key = f"{prefix}_page_input"
+    filter_key = f"{prefix}_last_filter"
+    current_filter = (run_name, dataset_name, search_query, text_query, tuple(filter_hit))
+    if st.session_state.get(filter_key) != current_filter:
+        st.session_state[filter_key] = current_filter
+        st.session_state[page_key] = 1
+    current_page = st.session_state.get(page_key, 1)
+
+    # 只取当前页的行
+    df_page, total = case_store.query_cases(
+        conn, run_name, dataset_name, hit=hit, indices=indices, text=text_query or None,
+        limit=ITEMS_PER_PAGE, offset=(current_page - 1) * ITEMS_PER_PAGE
+    )
+    total_pages = max(1, (total - 1) // ITEMS_PER_PAGE + 1)
+    st.sidebar.markdown(f"**展示:** {total} 条")
+
+    c1, c2 = st.columns([1, 4])
+    with c1:
+        st.number_input("Page", min_value=1, max_value=total_pages, key=page_key, label_visibility="collapsed")
+    with c2:
+        st.markdown(f"<div style='padding-top: 8px; font-weight: bold;'>/ {total_pages} 页</div>", unsafe_allow_html=True)
+
+    if df_page.empty:
+        st.info("当前过滤条件下无数据。")
+        return
+
+    image_utils.prefetch_images(df_page['image_path'])
+    images = path_prefix.split_image_paths(df_page['image_path'])
+    for idx, row in df_page.iterrows():
+        _render_row(row, images[idx])
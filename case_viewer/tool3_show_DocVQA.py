@@ -1,20 +1,31 @@
 import streamlit as st
 import pandas as pd
 import os
-from PIL import Image
-import ast  # 保留：用于解析列表字符串
 import streamlit.components.v1 as components
+from change_evalout import change_module
+from change_evalout import table_io
+from change_evalout import hit_rules
+import image_utils
+import load_cache
+import search_utils
+import perf
+import dataset_registry
+import scoring
 
 # ===========================
 #      配置区域
 # ===========================
-REQUIRED_COLS = ["index", "question", "answer", "prediction", "image_path"]
+# 必要列与加载列登记在 dataset_registry (准确率总览页直接读取，不需要导入本模块)
+REQUIRED_COLS = dataset_registry.required_cols("DocVQA")
+LOAD_COLS = dataset_registry.load_cols("DocVQA")
 
 # 1. 加载数据函数
-@st.cache_data
-def load_data(file_path):
+def _load_data(file_path, path_rewrite=None):
     try:
-        df = pd.read_excel(file_path)
+        # 优先读取同名的 Parquet / Arrow 文件，不存在时回退到 xlsx；只读取 LOAD_COLS 中的列
+        df = table_io.read_table(file_path, columns=LOAD_COLS)
+        # 虚拟模式：直接读取原始评测结果，在内存中为 image_path 添加 LMUData 前缀
+        df = change_module.apply_path_rewrite(df, path_rewrite)
         
         # 1. 检查必要列
         missing = [c for c in REQUIRED_COLS if c not in df.columns]
@@ -29,31 +40,24 @@ def load_data(file_path):
         if 'index' in df.columns:
             df['index'] = df['index'].astype(str).str.strip()
         
-        # 3. 自动计算 hit (DocVQA 特有逻辑)
+        # 3. 打分：候选答案整列只解析一次，hit (缺失时按 DocVQA 的规则计算，与原 check_hit 一致) 与 ANLS 共用
+        answer_lists = hit_rules.answer_lists(df['answer'])
         if 'hit' not in df.columns:
-            # 处理answer是列表的情况
-            def check_hit(answer, prediction):
-                try:
-                    # 尝试解析answer为列表
-                    answer_list = ast.literal_eval(answer)
-                    if isinstance(answer_list, list):
-                        # 如果是列表，检查prediction是否在列表中
-                        return prediction.lower() in [str(x).lower() for x in answer_list]
-                except:
-                    # 如果解析失败，使用原来的字符串比较
-                    pass
-                return answer.lower() == prediction.lower()
-            
-            df['hit'] = df.apply(lambda row: check_hit(row['answer'], row['prediction']), axis=1)
+            df['hit'] = hit_rules.fallback_hit("DocVQA", df['answer'], df['prediction'], answer_lists)
+        df['anls'] = scoring.anls(scoring.parse_answer_lists(df['answer'], answer_lists), df['prediction'])
         
         return df, None
     except Exception as e:
         return None, str(e)
 
+def load_data(file_path, path_rewrite=None, file_token=None):
+    """加载数据 (进程内共享 + 磁盘快照，见 load_cache.shared_load)，返回的 df 所有会话共用，不能原地修改"""
+    return load_cache.shared_load("DocVQA", _load_data, file_path, LOAD_COLS, path_rewrite, file_token)
+
 # ===========================
 #      模块主入口函数
 # ===========================
-def run(server_file_path):
+def run(server_file_path, path_rewrite=None):
     
     # 唯一前缀
     prefix = "docvqa"
@@ -76,7 +80,9 @@ def run(server_file_path):
         st.error(f"⚠️ 文件未找到: {server_file_path}")
         return 
 
-    df, error_msg = load_data(server_file_path)
+    source_token = load_cache.file_token(server_file_path)
+    df, error_msg = load_data(server_file_path, path_rewrite, source_token)
+    perf.lap("load")
     if error_msg:
         st.error(f"❌ 读取失败: {error_msg}")
         return
@@ -94,229 +100,304 @@ def run(server_file_path):
         key=f"{prefix}_filter_hit"
     )
 
+    # ANLS 阈值过滤与排序
+    anls_range = st.sidebar.slider(
+        "ANLS 范围",
+        min_value=0.0,
+        max_value=1.0,
+        value=(0.0, 1.0),
+        step=0.05,
+        key=f"{prefix}_anls_range"
+    )
+    anls_sort = st.sidebar.selectbox(
+        "排序",
+        options=["默认顺序", "ANLS 升序", "ANLS 降序"],
+        key=f"{prefix}_anls_sort"
+    )
+
     # --- 标题与搜索区域 ---
     st.title("📊 DocVQA Viewer")
 
-    col_search, _ = st.columns([1, 2])
+    col_search, col_text_search = st.columns([1, 2])
     with col_search:
-        search_query = st.text_input("🔍 按 Index 搜索", key=f"{prefix}_search_input", placeholder="输入 Index ID")
+        search_query = st.text_input("🔍 按 Index 搜索", key=f"{prefix}_search_input", placeholder="输入 Index ID，支持多个或范围，如 1, 5, 10-20")
+    with col_text_search:
+        text_query = st.text_input("📝 文本搜索", key=f"{prefix}_text_search_input", placeholder="搜索 question / prediction / answer 等列，以 re: 开头使用正则")
+        text_mode = st.radio("匹配方式", list(search_utils.SEARCH_MODES), format_func=search_utils.SEARCH_MODES.get, key=f"{prefix}_text_search_mode", horizontal=True, label_visibility="collapsed")
 
     # --- 数据过滤逻辑 ---
     is_search_mode = False
     
     # 1. 搜索优先
     if search_query:
+        # 支持多个 index 与范围 (如 "1, 5, 10-20")，通过哈希表按 O(k) 查找
         search_str = str(search_query).strip()
-        df_display = df[df['index'] == search_str]
+        index_map = search_utils.get_index_map(df['index'], cache_key=(source_token, path_rewrite))
+        df_display, not_found = search_utils.lookup_indices(df, index_map, search_utils.parse_index_query(search_str))
         is_search_mode = True
         if df_display.empty:
             st.warning(f"未找到 Index 为 '{search_str}' 的数据。")
+        elif not_found:
+            st.warning(search_utils.format_not_found(not_found))
     # 2. 侧边栏过滤
     elif filter_hit is not None:
         df_display = df[df['hit'].isin(filter_hit)]
     else:
         df_display = df
 
+    # 3. 文本搜索：在 Hit 过滤结果内进一步过滤 (按 Index 搜索时不生效)
+    if text_query and not search_query:
+        df_display, text_error = search_utils.filter_by_text(df, df_display, text_query, cache_key=(source_token, path_rewrite), mode=text_mode)
+        is_search_mode = True
+        if text_error:
+            st.error(text_error)
+        elif df_display.empty:
+            st.warning(f"未找到包含 '{text_query.strip()}' 的数据。")
+
+    # 4. ANLS 阈值过滤与排序 (按 Index 搜索时不生效)
+    if not search_query:
+        df_display = df_display[df_display['anls'].between(anls_range[0], anls_range[1])]
+        if anls_sort != "默认顺序":
+            df_display = df_display.sort_values('anls', ascending=(anls_sort == "ANLS 升序"), kind="stable")
+
+    perf.lap("filter")
     st.sidebar.markdown(f"**展示:** {len(df_display)} / {len(df)} 条")
+    # 整个文件的图片缺失统计 (基于目录索引，不逐个访问图片文件)
+    img_summary = image_utils.missing_image_summary(df['image_path'], cache_key=(source_token, path_rewrite))
+    st.sidebar.markdown(f"**图片缺失:** {img_summary['missing']} / {img_summary['images']} 张 (涉及 {img_summary['rows_missing']} 条)")
+    # 压缩后的内存占用 (见 load_cache.compact_frame)
+    memory_text = load_cache.format_memory_report(df)
+    if memory_text:
+        st.sidebar.markdown(f"**内存:** {memory_text}")
 
     # ===========================
-    #      分页核心逻辑
+    #   结果列表 (fragment 局部重跑)
     # ===========================
-    items_per_page = 10
-    
-    page_key = f"{prefix}_page"
-    key_top = f"{prefix}_jump_top"
-    key_bottom = f"{prefix}_jump_bottom"
-
-    if page_key not in st.session_state: st.session_state[page_key] = 0
-    if key_top not in st.session_state: st.session_state[key_top] = 1
-    if key_bottom not in st.session_state: st.session_state[key_bottom] = 1
-
-    total_pages = max(1, (len(df_display) - 1) // items_per_page + 1)
-
-    def sync_input_boxes(new_page_index):
-        display_val = new_page_index + 1
-        st.session_state[key_top] = display_val
-        st.session_state[key_bottom] = display_val
-
-    # 边界检查
-    if is_search_mode: 
-        st.session_state[page_key] = 0
-        sync_input_boxes(0)
-    elif st.session_state[page_key] >= total_pages:
-        st.session_state[page_key] = 0
-        sync_input_boxes(0)
-        
-    current_page = st.session_state[page_key]
-
-    # 回调函数
-    def prev_page_callback():
-        if st.session_state[page_key] > 0:
-            st.session_state[page_key] -= 1
-            sync_input_boxes(st.session_state[page_key])
-
-    def next_page_callback():
-        if st.session_state[page_key] < total_pages - 1:
-            st.session_state[page_key] += 1
-            sync_input_boxes(st.session_state[page_key])
-
-    def jump_page_callback(source_key):
-        val = st.session_state[source_key] 
-        new_page = val - 1
-        if 0 <= new_page < total_pages: 
-            st.session_state[page_key] = new_page
-            sync_input_boxes(new_page)
-
-    # 渲染翻页组件
-    def render_pagination(location_suffix):
-        if total_pages <= 1:
-            if location_suffix == "bottom":
-                st. markdown("""<div style="text-align: center; margin-top: 10px;"><a href="#top-anchor" style="text-decoration: none;"><button style="background:linear-gradient(135deg, #667eea, #764ba2); color:white; border:none; padding:8px 16px; border-radius: 6px; cursor:pointer;">⬆️ 回到顶部</button></a></div>""", unsafe_allow_html=True)
-            return
+    # 翻页、跳页与勾选 "查看原图" 只重跑这个 fragment，
+    # main.py 的侧边栏、文件夹扫描以及上面的搜索过滤都不会重新执行。
+    # fragment 单独重跑时 main.py 不会再设置图片 URL 模式，这里沿用整页运行时的设置；
+    # 计时也不会由 main.py 开始，由 perf.fragment_run 单独记录
+    url_mode = image_utils.url_mode_enabled()
 
-        current_input_key = key_top if location_suffix == "top" else key_bottom
-        
-        # 修复1:  使用与第一份代码相同的动态列布局
-        if location_suffix == "top": 
-            c1, c2, c3, c4 = st. columns([1, 2, 1, 1])
-        else:
-            c1, c2, c3, c4, c5 = st.columns([1, 2, 1, 1, 1])
-
-        with c1:
-            st.button("◀ 上一页", disabled=(current_page == 0), use_container_width=True, on_click=prev_page_callback, key=f"{prefix}_btn_prev_{location_suffix}")
-        with c2:
-            st.number_input("Page Jump", min_value=1, max_value=total_pages, key=current_input_key, on_change=jump_page_callback, args=(current_input_key,), label_visibility="collapsed")
-        with c3:
-            st.markdown(f"<div style='text-align: center; padding-top:  10px; font-weight:  bold;'>/ {total_pages} 页</div>", unsafe_allow_html=True)
-        with c4:
-            st.button("下一页 ▶", disabled=(current_page >= total_pages - 1), use_container_width=True, on_click=next_page_callback, key=f"{prefix}_btn_next_{location_suffix}")
-        
-        # 修复2: 只在底部渲染 Top 按钮，并修复点击区域
-        if location_suffix == "bottom":
-            with c5:
-                st.markdown(
-                    """
-                    <a href="#top-anchor" style="text-decoration:none; display: block;" target="_self">
-                        <div style="
-                            display: flex; align-items: center; justify-content: center;
-                            width: 100%; min-height: 38px;
-                            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                            color: white; border-radius: 6px; font-weight: 500; font-size: 14px;
-                            box-shadow: 0 2px 5px rgba(0,0,0,0.2); cursor: pointer;">
-                            ⬆️ Top
-                        </div>
-                    </a>
-                    """,
-                    unsafe_allow_html=True
-                )
-    # --- 顶部翻页 ---
-    render_pagination("top")
+    @st.fragment
+    @perf.fragment_run({"dataset": "DocVQA", "file": server_file_path})
+    def render_results():
+        image_utils.set_url_mode(url_mode)
 
-    # ===========================
-    #      列表内容展示
-    # ===========================
-    start_idx = current_page * items_per_page
-    end_idx = start_idx + items_per_page
-    current_batch = df_display.iloc[start_idx:end_idx]
-
-    if current_batch.empty and not is_search_mode:
-        st.info("当前过滤条件下无数据。")
-
-    for idx, row in current_batch.iterrows():
-        # 动态判断颜色
-        is_correct = row['hit']
-        header_color = "#198754" if is_correct else "#dc3545" # Green / Red
-        hit_icon = "✅(Hit:1)" if is_correct else "❌(Hit:0)"
-
-        with st.container(border=True):
-            col_img, col_text = st.columns([1, 2])
-            
-            # --- 左侧：图片 ---
-            with col_img:
-                img_path = str(row['image_path'])
-                if os.path.exists(img_path):
-                    try:
-                        image = Image.open(img_path)
-                        st.image(image, caption=f"File: {os.path.basename(img_path)}", use_container_width=True)
-                    except Exception as e:
-                        st.error(f"Image Error: {e}")
-                else:
-                    # 只有当路径看起来像真实路径时才报错，避免NaN报错
-                    if img_path and img_path.lower() != 'nan':
-                        st.warning(f"图片缺失: {img_path}")
-                    else:
-                        st.info("无关联图片")
-
-            # --- 右侧：文本与答案对比 ---
-            with col_text:
-                # 标题
-                st.markdown(
-                    f"<h4 style='color: {header_color}; margin:0;'>Index: {row['index']} &nbsp;&nbsp; {hit_icon}</h4>", 
-                    unsafe_allow_html=True
-                )
-                
-                # 问题区域
-                st.markdown("##### ❓ Question")
-                st.info(row['question'])
-
-                # 答案对比区域
-                st.markdown("##### 📝 Comparison")
-                
-                cmp_c1, cmp_c2 = st.columns(2)
-                
-                with cmp_c1:
-                    st.caption("Standard Answer (GT)")
-                    # 绿色背景框展示标准答案
+        # ===========================
+        #      分页核心逻辑
+        # ===========================
+        items_per_page = 10
+
+        page_key = f"{prefix}_page"
+        key_top = f"{prefix}_jump_top"
+        key_bottom = f"{prefix}_jump_bottom"
+
+        if page_key not in st.session_state: st.session_state[page_key] = 0
+        if key_top not in st.session_state: st.session_state[key_top] = 1
+        if key_bottom not in st.session_state: st.session_state[key_bottom] = 1
+
+        total_pages = max(1, (len(df_display) - 1) // items_per_page + 1)
+
+        def sync_input_boxes(new_page_index):
+            display_val = new_page_index + 1
+            st.session_state[key_top] = display_val
+            st.session_state[key_bottom] = display_val
+
+        # 边界检查
+        # 搜索内容变化时回到第一页，搜索结果与普通结果一样分页
+        search_key = f"{prefix}_last_search"
+        current_search = (search_query, text_query, text_mode, anls_range, anls_sort)
+        if st.session_state.get(search_key) != current_search:
+            st.session_state[search_key] = current_search
+            st.session_state[page_key] = 0
+            sync_input_boxes(0)
+        elif st.session_state[page_key] >= total_pages:
+            st.session_state[page_key] = 0
+            sync_input_boxes(0)
+
+        current_page = st.session_state[page_key]
+
+        # 回调函数
+        def prev_page_callback():
+            if st.session_state[page_key] > 0:
+                st.session_state[page_key] -= 1
+                sync_input_boxes(st.session_state[page_key])
+
+        def next_page_callback():
+            if st.session_state[page_key] < total_pages - 1:
+                st.session_state[page_key] += 1
+                sync_input_boxes(st.session_state[page_key])
+
+        def jump_page_callback(source_key):
+            val = st.session_state[source_key] 
+            new_page = val - 1
+            if 0 <= new_page < total_pages: 
+                st.session_state[page_key] = new_page
+                sync_input_boxes(new_page)
+
+        # 渲染翻页组件
+        def render_pagination(location_suffix):
+            if total_pages <= 1:
+                if location_suffix == "bottom":
+                    st. markdown("""<div style="text-align: center; margin-top: 10px;"><a href="#top-anchor" style="text-decoration: none;"><button style="background:linear-gradient(135deg, #667eea, #764ba2); color:white; border:none; padding:8px 16px; border-radius: 6px; cursor:pointer;">⬆️ 回到顶部</button></a></div>""", unsafe_allow_html=True)
+                return
+
+            current_input_key = key_top if location_suffix == "top" else key_bottom
+
+            # 修复1:  使用与第一份代码相同的动态列布局
+            if location_suffix == "top": 
+                c1, c2, c3, c4 = st. columns([1, 2, 1, 1])
+            else:
+                c1, c2, c3, c4, c5 = st.columns([1, 2, 1, 1, 1])
+
+            with c1:
+                st.button("◀ 上一页", disabled=(current_page == 0), use_container_width=True, on_click=prev_page_callback, key=f"{prefix}_btn_prev_{location_suffix}")
+            with c2:
+                st.number_input("Page Jump", min_value=1, max_value=total_pages, key=current_input_key, on_change=jump_page_callback, args=(current_input_key,), label_visibility="collapsed")
+            with c3:
+                st.markdown(f"<div style='text-align: center; padding-top:  10px; font-weight:  bold;'>/ {total_pages} 页</div>", unsafe_allow_html=True)
+            with c4:
+                st.button("下一页 ▶", disabled=(current_page >= total_pages - 1), use_container_width=True, on_click=next_page_callback, key=f"{prefix}_btn_next_{location_suffix}")
+
+            # 修复2: 只在底部渲染 Top 按钮，并修复点击区域
+            if location_suffix == "bottom":
+                with c5:
                     st.markdown(
-                        f"""<div style='background-color: #d1e7dd; padding: 10px; border-radius: 5px; color: #0f5132; border: 1px solid #badbcc;'>
-                            {row['answer']}
-                        </div>""", 
+                        """
+                        <a href="#top-anchor" style="text-decoration:none; display: block;" target="_self">
+                            <div style="
+                                display: flex; align-items: center; justify-content: center;
+                                width: 100%; min-height: 38px;
+                                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                                color: white; border-radius: 6px; font-weight: 500; font-size: 14px;
+                                box-shadow: 0 2px 5px rgba(0,0,0,0.2); cursor: pointer;">
+                                ⬆️ Top
+                            </div>
+                        </a>
+                        """,
                         unsafe_allow_html=True
                     )
+        # --- 顶部翻页 ---
+        render_pagination("top")
+
+        # ===========================
+        #      列表内容展示
+        # ===========================
+        start_idx = current_page * items_per_page
+        end_idx = start_idx + items_per_page
+        current_batch = df_display.iloc[start_idx:end_idx]
+        perf.lap("pagination")
+
+        # 后台预取并解码当前页及前后相邻页的图片，翻页时直接命中内存缓存
+        image_utils.prefetch_pages(df_display['image_path'], start_idx, items_per_page)
+
+        if current_batch.empty and not is_search_mode:
+            st.info("当前过滤条件下无数据。")
 
-                with cmp_c2:
-                    st.caption("Model Prediction")
-                    # 如果正确显示绿色，错误显示红色
-                    if is_correct:
-                        bg_color = "#d1e7dd"
-                        text_color = "#0f5132"
-                        border_color = "#badbcc"
+        for idx, row in current_batch.iterrows():
+            # 动态判断颜色
+            is_correct = row['hit']
+            header_color = "#198754" if is_correct else "#dc3545" # Green / Red
+            hit_icon = "✅(Hit:1)" if is_correct else "❌(Hit:0)"
+
+            with st.container(border=True):
+                col_img, col_text = st.columns([1, 2])
+
+                # --- 左侧：图片 ---
+                with col_img:
+                    img_path = str(row['image_path'])
+                    if image_utils.image_exists(img_path):
+                        try:
+                            # 默认展示缩略图，勾选后再加载原图
+                            thumb_path = image_utils.thumbnail_path(img_path)
+                            show_full = thumb_path is None or st.checkbox("查看原图", key=f"{prefix}_full_res_{idx}")
+                            image = image_utils.image_source(img_path if show_full else thumb_path)
+                            st.image(image, caption=f"File: {os.path.basename(img_path)}", use_container_width=True)
+                        except Exception as e:
+                            st.error(f"Image Error: {e}")
                     else:
-                        bg_color = "#f8d7da"
-                        text_color = "#842029"
-                        border_color = "#f5c6cb"
-                    
+                        # 只有当路径看起来像真实路径时才报错，避免NaN报错
+                        if img_path and img_path.lower() != 'nan':
+                            st.warning(f"图片缺失: {img_path}")
+                        else:
+                            st.info("无关联图片")
+
+                # --- 右侧：文本与答案对比 ---
+                with col_text:
+                    # 标题
                     st.markdown(
-                        f"""<div style='background-color: {bg_color}; padding: 10px; border-radius: 5px; color: {text_color}; border: 1px solid {border_color};'>
-                            {row['prediction']}
-                        </div>""", 
+                        f"<h4 style='color: {header_color}; margin:0;'>Index: {row['index']} &nbsp;&nbsp; {hit_icon} &nbsp;&nbsp; ANLS: {row['anls']:.2f}</h4>", 
                         unsafe_allow_html=True
                     )
 
-    # --- 底部翻页 ---
-    st.divider()
-    render_pagination("bottom")
+                    # 问题区域
+                    st.markdown("##### ❓ Question")
+                    st.info(row['question'])
+
+                    # 答案对比区域
+                    st.markdown("##### 📝 Comparison")
+
+                    cmp_c1, cmp_c2 = st.columns(2)
+
+                    with cmp_c1:
+                        st.caption("Standard Answer (GT)")
+                        # 绿色背景框展示标准答案
+                        st.markdown(
+                            f"""<div style='background-color: #d1e7dd; padding: 10px; border-radius: 5px; color: #0f5132; border: 1px solid #badbcc;'>
+                                {row['answer']}
+                            </div>""", 
+                            unsafe_allow_html=True
+                        )
+
+                    with cmp_c2:
+                        st.caption("Model Prediction")
+                        # 如果正确显示绿色，错误显示红色
+                        if is_correct:
+                            bg_color = "#d1e7dd"
+                            text_color = "#0f5132"
+                            border_color = "#badbcc"
+                        else:
+                            bg_color = "#f8d7da"
+                            text_color = "#842029"
+                            border_color = "#f5c6cb"
+
+                        st.markdown(
+                            f"""<div style='background-color: {bg_color}; padding: 10px; border-radius: 5px; color: {text_color}; border: 1px solid {border_color};'>
+                                {row['prediction']}
+                            </div>""", 
+                            unsafe_allow_html=True
+                        )
+
+        perf.lap("render")
+        # --- 底部翻页 ---
+        st.divider()
+        render_pagination("bottom")
+
+    render_results()
 
     # ===========================
     #      JS 注入
     # ===========================
+    # 事件委托：在父文档上绑定一个点击监听，点击翻页按钮时瞬间滚动到顶部锚点。
+    # 翻页只重跑上面的 fragment，按钮会被重新创建，委托的监听不需要重新绑定；
+    # 本组件重新加载时先移除上一次注册的监听，避免重复。
     js_code = """
     <script>
-    function instantScrollToTop() {
-        var anchor = window.parent.document.getElementById('top-anchor');
-        if (anchor) { anchor.scrollIntoView({ behavior: 'auto', block: 'start' }); }
-    }
-    function bindButtons() {
-        var buttons = window.parent.document.querySelectorAll('button');
-        buttons.forEach(function(btn) {
-            if (btn.innerText.includes("上一页") || btn.innerText.includes("下一页")) {
-                btn.removeEventListener('click', instantScrollToTop);
-                btn.addEventListener('click', instantScrollToTop);
+    (function() {
+        var doc = window.parent.document;
+        if (doc.__pageScrollHandler) {
+            doc.removeEventListener('click', doc.__pageScrollHandler, true);
+        }
+        doc.__pageScrollHandler = function(event) {
+            var btn = event.target.closest && event.target.closest('button');
+            if (btn && (btn.innerText.includes("上一页") || btn.innerText.includes("下一页"))) {
+                var anchor = doc.getElementById('top-anchor');
+                if (anchor) { anchor.scrollIntoView({ behavior: 'auto', block: 'start' }); }
             }
-        });
-    }
-    bindButtons();
-    setTimeout(bindButtons, 500);
+        };
+        doc.addEventListener('click', doc.__pageScrollHandler, true);
+    })();
     </script>
     """
-    components.html(js_code, height=0)
\ No newline at end of file
+    components.html(js_code, height=0)
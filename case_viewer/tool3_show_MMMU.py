@@ -1,21 +1,31 @@
 import streamlit as st
 import pandas as pd
 import os
-from PIL import Image
-import ast  # 保留：用于解析字符串列表 "['a.jpg', 'b.jpg']"
 import streamlit.components.v1 as components
+from change_evalout import change_module
+from change_evalout import table_io
+from change_evalout import path_prefix
+import image_utils
+import load_cache
+import search_utils
+import perf
+import dataset_registry
 
 # ===========================
 #      配置区域
 # ===========================
-# 核心必须存在的列 (选项列 A-I 在展示时动态判断)
-REQUIRED_COLS = ["index", "question", "answer", "image_path", "prediction", "hit"]
+# 必要列与加载列登记在 dataset_registry (准确率总览页直接读取，不需要导入本模块)
+REQUIRED_COLS = dataset_registry.required_cols("MMMU")
+OPTION_COLS = dataset_registry.OPTION_COLS
+LOAD_COLS = dataset_registry.load_cols("MMMU")
 
 # 1. 加载数据函数
-@st.cache_data
-def load_data(file_path):
+def _load_data(file_path, path_rewrite=None):
     try:
-        df = pd.read_excel(file_path)
+        # 优先读取同名的 Parquet / Arrow 文件，不存在时回退到 xlsx；只读取 LOAD_COLS 中的列
+        df = table_io.read_table(file_path, columns=LOAD_COLS)
+        # 虚拟模式：直接读取原始评测结果，在内存中为 image_path 添加 LMUData 前缀
+        df = change_module.apply_path_rewrite(df, path_rewrite)
         
         # 1. 检查必要列
         missing = [c for c in REQUIRED_COLS if c not in df.columns]
@@ -30,10 +40,14 @@ def load_data(file_path):
     except Exception as e:
         return None, str(e)
 
+def load_data(file_path, path_rewrite=None, file_token=None):
+    """加载数据 (进程内共享 + 磁盘快照，见 load_cache.shared_load)，返回的 df 所有会话共用，不能原地修改"""
+    return load_cache.shared_load("MMMU", _load_data, file_path, LOAD_COLS, path_rewrite, file_token)
+
 # ===========================
 #      模块主入口函数
 # ===========================
-def run(server_file_path):
+def run(server_file_path, path_rewrite=None):
     
     # 唯一前缀
     prefix = "mmmu"
@@ -56,7 +70,9 @@ def run(server_file_path):
         st.error(f"⚠️ 文件未找到: {server_file_path}")
         return 
 
-    df, error_msg = load_data(server_file_path)
+    source_token = load_cache.file_token(server_file_path)
+    df, error_msg = load_data(server_file_path, path_rewrite, source_token)
+    perf.lap("load")
     if error_msg:
         st.error(f"❌ 读取失败: {error_msg}")
         return
@@ -78,248 +94,283 @@ def run(server_file_path):
     # --- 标题与搜索区域 ---
     st.title("📊 MMMU Viewer")
 
-    col_search, _ = st.columns([1, 2])
+    col_search, col_text_search = st.columns([1, 2])
     with col_search:
-        search_query = st.text_input("🔍 按 Index 搜索", key=f"{prefix}_search_input", placeholder="输入 Index ID")
+        search_query = st.text_input("🔍 按 Index 搜索", key=f"{prefix}_search_input", placeholder="输入 Index ID，支持多个或范围，如 1, 5, 10-20")
+    with col_text_search:
+        text_query = st.text_input("📝 文本搜索", key=f"{prefix}_text_search_input", placeholder="搜索 question / prediction / answer 等列，以 re: 开头使用正则")
+        text_mode = st.radio("匹配方式", list(search_utils.SEARCH_MODES), format_func=search_utils.SEARCH_MODES.get, key=f"{prefix}_text_search_mode", horizontal=True, label_visibility="collapsed")
 
     # --- 数据过滤逻辑 ---
     is_search_mode = False
     
     # 1. 搜索优先
     if search_query:
+        # 支持多个 index 与范围 (如 "1, 5, 10-20")，通过哈希表按 O(k) 查找
         search_str = str(search_query).strip()
-        df_display = df[df['index'] == search_str]
+        index_map = search_utils.get_index_map(df['index'], cache_key=(source_token, path_rewrite))
+        df_display, not_found = search_utils.lookup_indices(df, index_map, search_utils.parse_index_query(search_str))
         is_search_mode = True
         if df_display.empty:
             st.warning(f"未找到 Index 为 '{search_str}' 的数据。")
+        elif not_found:
+            st.warning(search_utils.format_not_found(not_found))
     # 2. 侧边栏过滤
     elif filter_hit is not None:
         df_display = df[df['hit'].isin(filter_hit)]
     else:
         df_display = df
 
+    # 3. 文本搜索：在 Hit 过滤结果内进一步过滤 (按 Index 搜索时不生效)
+    if text_query and not search_query:
+        df_display, text_error = search_utils.filter_by_text(df, df_display, text_query, cache_key=(source_token, path_rewrite), mode=text_mode)
+        is_search_mode = True
+        if text_error:
+            st.error(text_error)
+        elif df_display.empty:
+            st.warning(f"未找到包含 '{text_query.strip()}' 的数据。")
+
+    perf.lap("filter")
     st.sidebar.markdown(f"**展示:** {len(df_display)} / {len(df)} 条")
+    # 整个文件的图片缺失统计 (基于目录索引，不逐个访问图片文件)
+    img_summary = image_utils.missing_image_summary(df['image_path'], cache_key=(source_token, path_rewrite))
+    st.sidebar.markdown(f"**图片缺失:** {img_summary['missing']} / {img_summary['images']} 张 (涉及 {img_summary['rows_missing']} 条)")
+    # 压缩后的内存占用 (见 load_cache.compact_frame)
+    memory_text = load_cache.format_memory_report(df)
+    if memory_text:
+        st.sidebar.markdown(f"**内存:** {memory_text}")
 
     # ===========================
-    #      分页核心逻辑
+    #   结果列表 (fragment 局部重跑)
     # ===========================
-    items_per_page = 10
-    
-    page_key = f"{prefix}_page"
-    key_top = f"{prefix}_jump_top"
-    key_bottom = f"{prefix}_jump_bottom"
-
-    if page_key not in st.session_state: st.session_state[page_key] = 0
-    if key_top not in st.session_state: st.session_state[key_top] = 1
-    if key_bottom not in st.session_state: st.session_state[key_bottom] = 1
-
-    total_pages = max(1, (len(df_display) - 1) // items_per_page + 1)
-
-    def sync_input_boxes(new_page_index):
-        display_val = new_page_index + 1
-        st.session_state[key_top] = display_val
-        st.session_state[key_bottom] = display_val
-
-    # 边界检查
-    if is_search_mode: 
-        st.session_state[page_key] = 0
-        sync_input_boxes(0)
-    elif st.session_state[page_key] >= total_pages:
-        st.session_state[page_key] = 0
-        sync_input_boxes(0)
-        
-    current_page = st.session_state[page_key]
-
-    # 回调函数
-    def prev_page_callback():
-        if st.session_state[page_key] > 0:
-            st.session_state[page_key] -= 1
-            sync_input_boxes(st.session_state[page_key])
-
-    def next_page_callback():
-        if st.session_state[page_key] < total_pages - 1:
-            st.session_state[page_key] += 1
-            sync_input_boxes(st.session_state[page_key])
-
-    def jump_page_callback(source_key):
-        val = st.session_state[source_key] 
-        new_page = val - 1
-        if 0 <= new_page < total_pages: 
-            st.session_state[page_key] = new_page
-            sync_input_boxes(new_page)
-
-    # 渲染翻页组件
-    def render_pagination(location_suffix):
-        if total_pages <= 1:
+    # 翻页、跳页与勾选 "查看原图" 只重跑这个 fragment，
+    # main.py 的侧边栏、文件夹扫描以及上面的搜索过滤都不会重新执行。
+    # fragment 单独重跑时 main.py 不会再设置图片 URL 模式，这里沿用整页运行时的设置；
+    # 计时也不会由 main.py 开始，由 perf.fragment_run 单独记录
+    url_mode = image_utils.url_mode_enabled()
+
+    @st.fragment
+    @perf.fragment_run({"dataset": "MMMU", "file": server_file_path})
+    def render_results():
+        image_utils.set_url_mode(url_mode)
+
+        # ===========================
+        #      分页核心逻辑
+        # ===========================
+        items_per_page = 10
+
+        page_key = f"{prefix}_page"
+        key_top = f"{prefix}_jump_top"
+        key_bottom = f"{prefix}_jump_bottom"
+
+        if page_key not in st.session_state: st.session_state[page_key] = 0
+        if key_top not in st.session_state: st.session_state[key_top] = 1
+        if key_bottom not in st.session_state: st.session_state[key_bottom] = 1
+
+        total_pages = max(1, (len(df_display) - 1) // items_per_page + 1)
+
+        def sync_input_boxes(new_page_index):
+            display_val = new_page_index + 1
+            st.session_state[key_top] = display_val
+            st.session_state[key_bottom] = display_val
+
+        # 边界检查
+        # 搜索内容变化时回到第一页，搜索结果与普通结果一样分页
+        search_key = f"{prefix}_last_search"
+        current_search = (search_query, text_query, text_mode)
+        if st.session_state.get(search_key) != current_search:
+            st.session_state[search_key] = current_search
+            st.session_state[page_key] = 0
+            sync_input_boxes(0)
+        elif st.session_state[page_key] >= total_pages:
+            st.session_state[page_key] = 0
+            sync_input_boxes(0)
+
+        current_page = st.session_state[page_key]
+
+        # 回调函数
+        def prev_page_callback():
+            if st.session_state[page_key] > 0:
+                st.session_state[page_key] -= 1
+                sync_input_boxes(st.session_state[page_key])
+
+        def next_page_callback():
+            if st.session_state[page_key] < total_pages - 1:
+                st.session_state[page_key] += 1
+                sync_input_boxes(st.session_state[page_key])
+
+        def jump_page_callback(source_key):
+            val = st.session_state[source_key] 
+            new_page = val - 1
+            if 0 <= new_page < total_pages: 
+                st.session_state[page_key] = new_page
+                sync_input_boxes(new_page)
+
+        # 渲染翻页组件
+        def render_pagination(location_suffix):
+            if total_pages <= 1:
+                if location_suffix == "bottom":
+                    st. markdown("""<div style="text-align: center; margin-top: 10px;"><a href="#top-anchor" style="text-decoration: none;"><button style="background:linear-gradient(135deg, #667eea, #764ba2); color:white; border:none; padding:8px 16px; border-radius: 6px; cursor:pointer;">⬆️ 回到顶部</button></a></div>""", unsafe_allow_html=True)
+                return
+
+            current_input_key = key_top if location_suffix == "top" else key_bottom
+
+            # 修复1:  使用与第一份代码相同的动态列布局
+            if location_suffix == "top": 
+                c1, c2, c3, c4 = st. columns([1, 2, 1, 1])
+            else:
+                c1, c2, c3, c4, c5 = st.columns([1, 2, 1, 1, 1])
+
+            with c1:
+                st.button("◀ 上一页", disabled=(current_page == 0), use_container_width=True, on_click=prev_page_callback, key=f"{prefix}_btn_prev_{location_suffix}")
+            with c2:
+                st.number_input("Page Jump", min_value=1, max_value=total_pages, key=current_input_key, on_change=jump_page_callback, args=(current_input_key,), label_visibility="collapsed")
+            with c3:
+                st.markdown(f"<div style='text-align: center; padding-top:  10px; font-weight:  bold;'>/ {total_pages} 页</div>", unsafe_allow_html=True)
+            with c4:
+                st.button("下一页 ▶", disabled=(current_page >= total_pages - 1), use_container_width=True, on_click=next_page_callback, key=f"{prefix}_btn_next_{location_suffix}")
+
+            # 修复2: 只在底部渲染 Top 按钮，并修复点击区域
             if location_suffix == "bottom":
-                st. markdown("""<div style="text-align: center; margin-top: 10px;"><a href="#top-anchor" style="text-decoration: none;"><button style="background:linear-gradient(135deg, #667eea, #764ba2); color:white; border:none; padding:8px 16px; border-radius: 6px; cursor:pointer;">⬆️ 回到顶部</button></a></div>""", unsafe_allow_html=True)
-            return
+                with c5:
+                    st.markdown(
+                        """
+                        <a href="#top-anchor" style="text-decoration:none; display: block;" target="_self">
+                            <div style="
+                                display: flex; align-items: center; justify-content: center;
+                                width: 100%; min-height: 38px;
+                                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                                color: white; border-radius: 6px; font-weight: 500; font-size: 14px;
+                                box-shadow: 0 2px 5px rgba(0,0,0,0.2); cursor: pointer;">
+                                ⬆️ Top
+                            </div>
+                        </a>
+                        """,
+                        unsafe_allow_html=True
+                    )
 
-        current_input_key = key_top if location_suffix == "top" else key_bottom
-        
-        # 修复1:  使用与第一份代码相同的动态列布局
-        if location_suffix == "top": 
-            c1, c2, c3, c4 = st. columns([1, 2, 1, 1])
-        else:
-            c1, c2, c3, c4, c5 = st.columns([1, 2, 1, 1, 1])
-
-        with c1:
-            st.button("◀ 上一页", disabled=(current_page == 0), use_container_width=True, on_click=prev_page_callback, key=f"{prefix}_btn_prev_{location_suffix}")
-        with c2:
-            st.number_input("Page Jump", min_value=1, max_value=total_pages, key=current_input_key, on_change=jump_page_callback, args=(current_input_key,), label_visibility="collapsed")
-        with c3:
-            st.markdown(f"<div style='text-align: center; padding-top:  10px; font-weight:  bold;'>/ {total_pages} 页</div>", unsafe_allow_html=True)
-        with c4:
-            st.button("下一页 ▶", disabled=(current_page >= total_pages - 1), use_container_width=True, on_click=next_page_callback, key=f"{prefix}_btn_next_{location_suffix}")
-        
-        # 修复2: 只在底部渲染 Top 按钮，并修复点击区域
-        if location_suffix == "bottom":
-            with c5:
-                st.markdown(
-                    """
-                    <a href="#top-anchor" style="text-decoration:none; display: block;" target="_self">
-                        <div style="
-                            display: flex; align-items: center; justify-content: center;
-                            width: 100%; min-height: 38px;
-                            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                            color: white; border-radius: 6px; font-weight: 500; font-size: 14px;
-                            box-shadow: 0 2px 5px rgba(0,0,0,0.2); cursor: pointer;">
-                            ⬆️ Top
-                        </div>
-                    </a>
-                    """,
-                    unsafe_allow_html=True
-                )
-
-    # --- 顶部翻页 ---
-    render_pagination("top")
+        # --- 顶部翻页 ---
+        render_pagination("top")
 
-    # ===========================
-    #      列表内容展示
-    # ===========================
-    start_idx = current_page * items_per_page
-    end_idx = start_idx + items_per_page
-    current_batch = df_display.iloc[start_idx:end_idx]
+        # ===========================
+        #      列表内容展示
+        # ===========================
+        start_idx = current_page * items_per_page
+        end_idx = start_idx + items_per_page
+        current_batch = df_display.iloc[start_idx:end_idx]
+        perf.lap("pagination")
 
-    if current_batch.empty and not is_search_mode:
-        st.info("当前过滤条件下无数据。")
+        # 后台预取并解码当前页及前后相邻页的图片，翻页时直接命中内存缓存
+        image_utils.prefetch_pages(df_display['image_path'], start_idx, items_per_page)
 
-    # MMMU 特有的选项列定义
-    OPTION_COLS = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I']
+        if current_batch.empty and not is_search_mode:
+            st.info("当前过滤条件下无数据。")
 
-    for idx, row in current_batch.iterrows():
-        with st.container(border=True):
-            col_img, col_text = st.columns([1, 2])
-            
-            # --- 图片列处理 (MMMU 特有：支持单图或列表) ---
-            with col_img:
-                raw_path = row.get('image_path', '')
-                image_list = []
-                
-                # 1. 尝试解析列表字符串 "['a.jpg', 'b.jpg']"
-                try:
-                    # 如果本身就是list对象
-                    if isinstance(raw_path, list):
-                        image_list = raw_path
-                    # 如果是字符串，尝试 eval 解析
-                    elif isinstance(raw_path, str):
-                        clean_str = raw_path.strip()
-                        if clean_str.startswith("[") and clean_str.endswith("]"):
-                            image_list = ast.literal_eval(clean_str)
-                        else:
-                            image_list = [clean_str]
+        # 整页批量拆分图片路径 (单图或列表字符串)
+        batch_images = path_prefix.split_image_paths(current_batch['image_path'])
+        for idx, row in current_batch.iterrows():
+            with st.container(border=True):
+                col_img, col_text = st.columns([1, 2])
+
+                # --- 图片列处理 (MMMU 特有：支持单图或列表) ---
+                with col_img:
+                    # 1. 单图或列表字符串 "['a.jpg', 'b.jpg']"，已在循环前整页批量拆分
+                    image_list = batch_images[idx]
+
+                    # 2. 循环展示图片
+                    if not image_list:
+                        st.warning("无图片路径")
                     else:
-                        image_list = [] # 空或NaN
-                except:
-                    # 解析失败，当作普通字符串路径处理
-                    image_list = [str(raw_path)]
-
-                # 2. 循环展示图片
-                if not image_list:
-                    st.warning("无图片路径")
-                else:
-                    for i, img_p in enumerate(image_list):
-                        img_p_str = str(img_p).strip()
-                        if os.path.exists(img_p_str):
-                            try:
-                                image = Image.open(img_p_str)
-                                # 如果有多张图，显示 Image 1, Image 2...
-                                caption_prefix = f"[{i+1}/{len(image_list)}] " if len(image_list) > 1 else ""
-                                st.image(image, caption=f"{caption_prefix}{os.path.basename(img_p_str)}", use_container_width=True)
-                            except Exception as e:
-                                st.error(f"Error loading {os.path.basename(img_p_str)}")
-                        else:
-                            # 避免空字符串报错
-                            if img_p_str and img_p_str.lower() != 'nan':
-                                st.warning(f"⚠️ 图片缺失: {img_p_str}")
-
-            # --- 文本列处理 ---
-            with col_text:
-                header_color = "#198754" if row['hit'] else "#dc3545" 
-                hit_icon = "✅" if row['hit'] else "❌"
-                
-                st.markdown(f"<h3 style='color: {header_color}; margin-top:0;'>Index: {row['index']} ({hit_icon} Hit: {row['hit']})</h3>", unsafe_allow_html=True)
-                st.markdown(f"**Q:** {row['question']}")
-                
-                st.divider()
-                
-                # --- 动态渲染选项 (A - I) ---
-                for opt in OPTION_COLS:
-                    # 检查列是否存在且内容不为空
-                    if opt in df.columns and pd.notna(row[opt]):
-                        text = row[opt]
-                        
-                        # 答案/预测判定逻辑
-                        is_answer = (str(opt) == str(row['answer']))
-                        is_pred = (str(opt) == str(row['prediction']))
-                        
-                        # 样式逻辑
-                        base_style = "padding: 8px 12px; border-radius: 6px; margin-bottom: 6px; border: 1px solid;"
-                        
-                        if is_answer:
-                            css = f"{base_style} background-color: #d1e7dd; color: #0f5132; border-color: #badbcc;"
-                            prefix_icon = "✅"
-                        elif is_pred and not is_answer:
-                            css = f"{base_style} background-color: #f8d7da; color: #842029; border-color: #f5c6cb;"
-                            prefix_icon = "❌ <b>(Pred)</b> "
-                        elif is_pred and is_answer: 
-                            css = f"{base_style} background-color: #d1e7dd; color: #0f5132; border-color: #badbcc;"
-                            prefix_icon = "🎯 "
-                        else:
-                            css = f"{base_style} background-color: #f8f9fa; color: #333333; border-color: #dee2e6;"
-                            prefix_icon = ""
-                        
-                        st.markdown(f"<div style='{css}'><b>{opt}:</b> {text} {prefix_icon}</div>", unsafe_allow_html=True)
-                
-                # --- 模型输出 (折叠) ---
-                st.write("") # Spacer
-                with st.expander(f"👁️ 查看完整模型输出 (Prediction)", expanded=False):
-                    st.info(row['prediction'])
-
-    # --- 底部翻页 ---
-    st.divider()
-    render_pagination("bottom")
+                        for i, img_p in enumerate(image_list):
+                            img_p_str = str(img_p).strip()
+                            if image_utils.image_exists(img_p_str):
+                                try:
+                                    # 默认展示缩略图，勾选后再加载原图
+                                    thumb_path = image_utils.thumbnail_path(img_p_str)
+                                    show_full = thumb_path is None or st.checkbox("查看原图", key=f"{prefix}_full_res_{idx}_{i}")
+                                    image = image_utils.image_source(img_p_str if show_full else thumb_path)
+                                    # 如果有多张图，显示 Image 1, Image 2...
+                                    caption_prefix = f"[{i+1}/{len(image_list)}] " if len(image_list) > 1 else ""
+                                    st.image(image, caption=f"{caption_prefix}{os.path.basename(img_p_str)}", use_container_width=True)
+                                except Exception as e:
+                                    st.error(f"Error loading {os.path.basename(img_p_str)}")
+                            else:
+                                # 避免空字符串报错
+                                if img_p_str and img_p_str.lower() != 'nan':
+                                    st.warning(f"⚠️ 图片缺失: {img_p_str}")
+
+                # --- 文本列处理 ---
+                with col_text:
+                    header_color = "#198754" if row['hit'] else "#dc3545" 
+                    hit_icon = "✅" if row['hit'] else "❌"
+
+                    st.markdown(f"<h3 style='color: {header_color}; margin-top:0;'>Index: {row['index']} ({hit_icon} Hit: {row['hit']})</h3>", unsafe_allow_html=True)
+                    st.markdown(f"**Q:** {row['question']}")
+
+                    st.divider()
+
+                    # --- 动态渲染选项 (A - I) ---
+                    for opt in OPTION_COLS:
+                        # 检查列是否存在且内容不为空
+                        if opt in df.columns and pd.notna(row[opt]):
+                            text = row[opt]
+
+                            # 答案/预测判定逻辑
+                            is_answer = (str(opt) == str(row['answer']))
+                            is_pred = (str(opt) == str(row['prediction']))
+
+                            # 样式逻辑
+                            base_style = "padding: 8px 12px; border-radius: 6px; margin-bottom: 6px; border: 1px solid;"
+
+                            if is_answer:
+                                css = f"{base_style} background-color: #d1e7dd; color: #0f5132; border-color: #badbcc;"
+                                prefix_icon = "✅"
+                            elif is_pred and not is_answer:
+                                css = f"{base_style} background-color: #f8d7da; color: #842029; border-color: #f5c6cb;"
+                                prefix_icon = "❌ <b>(Pred)</b> "
+                            elif is_pred and is_answer: 
+                                css = f"{base_style} background-color: #d1e7dd; color: #0f5132; border-color: #badbcc;"
+                                prefix_icon = "🎯 "
+                            else:
+                                css = f"{base_style} background-color: #f8f9fa; color: #333333; border-color: #dee2e6;"
+                                prefix_icon = ""
+
+                            st.markdown(f"<div style='{css}'><b>{opt}:</b> {text} {prefix_icon}</div>", unsafe_allow_html=True)
+
+                    # --- 模型输出 (折叠) ---
+                    st.write("") # Spacer
+                    with st.expander(f"👁️ 查看完整模型输出 (Prediction)", expanded=False):
+                        st.info(row['prediction'])
+
+        perf.lap("render")
+        # --- 底部翻页 ---
+        st.divider()
+        render_pagination("bottom")
+
+    render_results()
 
     # ===========================
     #      JS 注入
     # ===========================
+    # 事件委托：在父文档上绑定一个点击监听，点击翻页按钮时瞬间滚动到顶部锚点。
+    # 翻页只重跑上面的 fragment，按钮会被重新创建，委托的监听不需要重新绑定；
+    # 本组件重新加载时先移除上一次注册的监听，避免重复。
     js_code = """
     <script>
-    function instantScrollToTop() {
-        var anchor = window.parent.document.getElementById('top-anchor');
-        if (anchor) { anchor.scrollIntoView({ behavior: 'auto', block: 'start' }); }
-    }
-    function bindButtons() {
-        var buttons = window.parent.document.querySelectorAll('button');
-        buttons.forEach(function(btn) {
-            if (btn.innerText.includes("上一页") || btn.innerText.includes("下一页")) {
-                btn.removeEventListener('click', instantScrollToTop);
-                btn.addEventListener('click', instantScrollToTop);
+    (function() {
+        var doc = window.parent.document;
+        if (doc.__pageScrollHandler) {
+            doc.removeEventListener('click', doc.__pageScrollHandler, true);
+        }
+        doc.__pageScrollHandler = function(event) {
+            var btn = event.target.closest && event.target.closest('button');
+            if (btn && (btn.innerText.includes("上一页") || btn.innerText.includes("下一页"))) {
+                var anchor = doc.getElementById('top-anchor');
+                if (anchor) { anchor.scrollIntoView({ behavior: 'auto', block: 'start' }); }
             }
-        });
-    }
-    bindButtons();
-    setTimeout(bindButtons, 500);
+        };
+        doc.addEventListener('click', doc.__pageScrollHandler, true);
+    })();
     </script>
     """
-    components.html(js_code, height=0)
\ No newline at end of file
+    components.html(js_code, height=0)
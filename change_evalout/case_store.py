@@ -0,0 +1,366 @@
+import os
+import json
+import time
+import sqlite3
+import argparse
+import pandas as pd
+import table_io
+import hit_rules
+from change_module import create_file_config, tool_module_name
+
+# ===========================
+#      案例库配置
+# ===========================
+# 所有 run 的转换结果导入同一个 SQLite 文件，查看器按需用 SQL 分页查询，只取当前页的行。
+# 数据库路径可通过环境变量覆盖
+CASE_STORE_ENV = "VLM_CASE_STORE"
+DEFAULT_CASE_STORE = '/mnt/lustre/houbingxi/1212_moe_eval_badcase/case_store.sqlite'
+
+# 转换结果文件夹的后缀 (去掉后即为 run 名称，也是 create_file_config 使用的模型前缀)
+FOR_CHECK_SUFFIX = "_for_check"
+
+# 工具模块名前缀，去掉后即为数据集名称
+TOOL_MODULE_PREFIX = "tool2_change_evalout_image_"
+
+# cases / predictions 表中单独存放的列
+CASE_COLS = ["question", "answer", "image_path"]
+PREDICTION_COLS = ["prediction", "hit", "res", "extract"]
+
+# 与 run 无关的数据集字段 (选项、题目分类等)，以 JSON 存入 cases.extra；
+# 其余列 (如各 run 的打分中间结果) 以 JSON 存入 predictions.extra，不同 run 之间互不覆盖
+CASE_EXTRA_COLS = ["A", "B", "C", "D", "E", "F", "G", "H", "I", "hint", "category", "l2-category", "split"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      INTEGER PRIMARY KEY,
+    name        TEXT NOT NULL UNIQUE,
+    folder      TEXT,
+    ingested_at REAL
+);
+CREATE TABLE IF NOT EXISTS datasets (
+    dataset_id  INTEGER PRIMARY KEY,
+    name        TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS cases (
+    case_id     INTEGER PRIMARY KEY,
+    dataset_id  INTEGER NOT NULL REFERENCES datasets(dataset_id),
+    case_index  TEXT NOT NULL,
+    question    TEXT,
+    answer      TEXT,
+    image_path  TEXT,
+    extra       TEXT,
+    UNIQUE (dataset_id, case_index)
+);
+CREATE TABLE IF NOT EXISTS predictions (
+    run_id      INTEGER NOT NULL REFERENCES runs(run_id),
+    case_id     INTEGER NOT NULL REFERENCES cases(case_id),
+    prediction  TEXT,
+    hit         INTEGER,
+    res         TEXT,
+    extract     TEXT,
+    extra       TEXT,
+    PRIMARY KEY (run_id, case_id)
+);
+CREATE TABLE IF NOT EXISTS ingested_files (
+    run_id      INTEGER NOT NULL,
+    dataset_id  INTEGER NOT NULL,
+    path        TEXT,
+    size        INTEGER,
+    mtime       REAL,
+    PRIMARY KEY (run_id, dataset_id)
+);
+CREATE INDEX IF NOT EXISTS idx_cases_dataset_index ON cases (dataset_id, case_index);
+CREATE INDEX IF NOT EXISTS idx_predictions_run_hit ON predictions (run_id, hit);
+"""
+
+
+def get_store_path(db_path=None):
+    """获取案例库路径：参数 > 环境变量 > 默认路径"""
+    return db_path or os.environ.get(CASE_STORE_ENV) or DEFAULT_CASE_STORE
+
+
+def connect(db_path=None, readonly=False):
+    """
+    打开案例库
+
+    Args:
+        db_path (str, optional): 数据库路径，见 get_store_path
+        readonly (bool): 只读打开 (查看器使用)，不会创建文件或修改表结构
+
+    Returns:
+        sqlite3.Connection: 数据库连接
+    """
+    db_path = get_store_path(db_path)
+    if readonly:
+        return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    # 旧版案例库的 predictions 表没有 extra 列
+    if not _has_column(conn, "predictions", "extra"):
+        conn.execute("ALTER TABLE predictions ADD COLUMN extra TEXT")
+        conn.commit()
+    return conn
+
+
+def _has_column(conn, table, column):
+    """表中是否有指定列"""
+    return any(row[1] == column for row in conn.execute(f"PRAGMA table_info({table})"))
+
+
+# ===========================
+#      导入
+# ===========================
+def _text_values(series):
+    """转为 SQLite 可以保存的文本列表，空值为 None"""
+    return [None if pd.isna(v) else str(v) for v in series.tolist()]
+
+
+def _extra_records(df, cols):
+    """把指定列逐行转为 JSON 文本，没有这些列时为 None (导入时不覆盖已有的 cases.extra)"""
+    if not cols:
+        return [None] * len(df)
+    records = df[cols].astype(object).where(df[cols].notna(), None).to_dict('records')
+    return [json.dumps(r, ensure_ascii=False, default=str) for r in records]
+
+
+def _get_id(conn, table, key_col, name, **values):
+    """按名称获取 (不存在时创建) runs / datasets 中的记录 id"""
+    id_col = "run_id" if table == "runs" else "dataset_id"
+    row = conn.execute(f"SELECT {id_col} FROM {table} WHERE {key_col} = ?", (name,)).fetchone()
+    if row:
+        if values:
+            sets = ", ".join(f"{k} = ?" for k in values)
+            conn.execute(f"UPDATE {table} SET {sets} WHERE {id_col} = ?", (*values.values(), row[0]))
+        return row[0]
+    cols = ", ".join([key_col, *values])
+    marks = ", ".join("?" * (len(values) + 1))
+    return conn.execute(f"INSERT INTO {table} ({cols}) VALUES ({marks})", (name, *values.values())).lastrowid
+
+
+def ingest_file(conn, run_id, dataset_id, dataset_name, file_path):
+    """
+    导入单个结果文件
+
+    Args:
+        conn (sqlite3.Connection): 数据库连接
+        run_id (int): runs 表中的 id
+        dataset_id (int): datasets 表中的 id
+        dataset_name (str): 数据集名称 (如 "DocVQA")，没有 hit 列时按该数据集的规则计算 (见 hit_rules)
+        file_path (str): 结果文件路径
+
+    Returns:
+        int: 导入的行数
+    """
+    df = table_io.read_table(file_path)
+    if 'index' not in df.columns:
+        raise ValueError("缺少 index 列")
+    df['index'] = df['index'].astype(str).str.strip()
+    df = df.drop_duplicates('index')
+
+    case_extras = _extra_records(df, [c for c in df.columns if c in CASE_EXTRA_COLS])
+    run_extras = _extra_records(df, [c for c in df.columns if c not in ['index'] + CASE_COLS + PREDICTION_COLS + CASE_EXTRA_COLS])
+    case_values = {c: _text_values(df[c]) if c in df.columns else [None] * len(df) for c in CASE_COLS}
+    conn.executemany(
+        """
+        INSERT INTO cases (dataset_id, case_index, question, answer, image_path, extra)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (dataset_id, case_index) DO UPDATE SET
+            question = excluded.question, answer = excluded.answer,
+            image_path = excluded.image_path,
+            extra = CASE WHEN excluded.extra IS NULL THEN cases.extra ELSE excluded.extra END
+        """,
+        [
+            (dataset_id, idx, q, a, img, extra)
+            for idx, q, a, img, extra in zip(df['index'], case_values['question'], case_values['answer'],
+                                             case_values['image_path'], case_extras)
+        ],
+    )
+
+    case_ids = dict(conn.execute("SELECT case_index, case_id FROM cases WHERE dataset_id = ?", (dataset_id,)).fetchall())
+    if 'hit' in df.columns:
+        hits = [None if pd.isna(v) else int(bool(v)) for v in pd.to_numeric(df['hit'], errors='coerce').tolist()]
+    elif 'answer' in df.columns and 'prediction' in df.columns:
+        hits = hit_rules.fallback_hit(dataset_name, df['answer'], df['prediction']).astype(int).tolist()
+    else:
+        hits = [None] * len(df)
+    pred_values = {c: _text_values(df[c]) if c in df.columns else [None] * len(df) for c in ["prediction", "res", "extract"]}
+
+    conn.execute(
+        "DELETE FROM predictions WHERE run_id = ? AND case_id IN (SELECT case_id FROM cases WHERE dataset_id = ?)",
+        (run_id, dataset_id),
+    )
+    conn.executemany(
+        "INSERT INTO predictions (run_id, case_id, prediction, hit, res, extract, extra) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            (run_id, case_ids[idx], p, h, r, e, x)
+            for idx, p, h, r, e, x in zip(df['index'], pred_values['prediction'], hits, pred_values['res'],
+                                          pred_values['extract'], run_extras)
+        ],
+    )
+    return len(df)
+
+
+def ingest_run(conn, folder_path, run_name=None, force=False):
+    """
+    导入一个模型的转换结果文件夹
+
+    Args:
+        conn (sqlite3.Connection): 数据库连接
+        folder_path (str): 转换结果文件夹 (如 xxx_for_check)
+        run_name (str, optional): run 名称，默认为文件夹名去掉 FOR_CHECK_SUFFIX
+        force (bool): 为 True 时忽略导入记录，全部重新导入
+
+    Returns:
+        dict: 每个文件的处理结果 {filename: {"status": "success" / "up_to_date" / "skipped" / "failed", "error", "rows"}}
+    """
+    folder_name = os.path.basename(folder_path.rstrip(os.sep))
+    if run_name is None:
+        run_name = folder_name[:-len(FOR_CHECK_SUFFIX)] if folder_name.endswith(FOR_CHECK_SUFFIX) else folder_name
+
+    with conn:
+        run_id = _get_id(conn, "runs", "name", run_name, folder=folder_path, ingested_at=time.time())
+
+    results = {}
+    for filename, config in create_file_config(run_name).items():
+        dataset_name = tool_module_name(config['module'])[len(TOOL_MODULE_PREFIX):]
+        file_path = os.path.join(folder_path, filename)
+        found = table_io.find_columnar(file_path)
+        source = found[0] if found is not None else file_path
+        if not os.path.exists(source):
+            results[filename] = {"status": "skipped", "error": "找不到文件", "rows": 0}
+            continue
+
+        stat = os.stat(source)
+        try:
+            with conn:
+                dataset_id = _get_id(conn, "datasets", "name", dataset_name)
+                recorded = conn.execute(
+                    "SELECT path, size, mtime FROM ingested_files WHERE run_id = ? AND dataset_id = ?",
+                    (run_id, dataset_id),
+                ).fetchone()
+                if not force and recorded == (source, stat.st_size, stat.st_mtime):
+                    print(f"[跳过] 未变化: {filename}")
+                    results[filename] = {"status": "up_to_date", "error": None, "rows": 0}
+                    continue
+
+                print(f"正在导入: {filename} -> {run_name} / {dataset_name}")
+                rows = ingest_file(conn, run_id, dataset_id, dataset_name, source)
+                conn.execute(
+                    "INSERT OR REPLACE INTO ingested_files (run_id, dataset_id, path, size, mtime) VALUES (?, ?, ?, ?, ?)",
+                    (run_id, dataset_id, source, stat.st_size, stat.st_mtime),
+                )
+            results[filename] = {"status": "success", "error": None, "rows": rows}
+        except Exception as e:
+            print(f"  - [失败] 导入出错: {e}")
+            results[filename] = {"status": "failed", "error": str(e), "rows": 0}
+    return results
+
+
+# ===========================
+#      查询
+# ===========================
+def list_runs(conn):
+    """全部 run 名称 (按导入时间倒序)"""
+    return [r[0] for r in conn.execute("SELECT name FROM runs ORDER BY ingested_at DESC")]
+
+
+def list_datasets(conn, run_name=None):
+    """全部数据集名称；指定 run 时只返回该 run 导入过的数据集"""
+    if run_name is None:
+        return [r[0] for r in conn.execute("SELECT name FROM datasets ORDER BY name")]
+    return [r[0] for r in conn.execute(
+        """
+        SELECT d.name FROM datasets d
+        JOIN ingested_files f ON f.dataset_id = d.dataset_id
+        JOIN runs r ON r.run_id = f.run_id
+        WHERE r.name = ? ORDER BY d.name
+        """,
+        (run_name,),
+    )]
+
+
+def query_cases(conn, run_name, dataset_name, hit=None, indices=None, text=None, limit=10, offset=0):
+    """
+    分页查询案例
+
+    Args:
+        conn (sqlite3.Connection): 数据库连接
+        run_name (str): run 名称
+        dataset_name (str): 数据集名称
+        hit (list, optional): 只返回 hit 在该列表中的行 (如 [0] 只看错例)
+        indices (list, optional): 只返回这些 index
+        text (str, optional): question / answer / prediction 中包含该文本 (不区分大小写)
+        limit (int): 每页条数
+        offset (int): 偏移量
+
+    Returns:
+        tuple: (当前页 DataFrame, 满足条件的总行数)；extra / run_extra 列分别为 cases.extra 与 predictions.extra 的 JSON 文本
+    """
+    where = ["r.name = ?", "d.name = ?"]
+    params = [run_name, dataset_name]
+    if hit is not None:
+        where.append(f"p.hit IN ({', '.join('?' * len(hit))})")
+        params.extend(int(h) for h in hit)
+    if indices:
+        where.append(f"c.case_index IN ({', '.join('?' * len(indices))})")
+        params.extend(indices)
+    if text:
+        where.append("(c.question LIKE ? OR c.answer LIKE ? OR p.prediction LIKE ?)")
+        params.extend([f"%{text}%"] * 3)
+
+    base = f"""
+        FROM predictions p
+        JOIN runs r ON r.run_id = p.run_id
+        JOIN cases c ON c.case_id = p.case_id
+        JOIN datasets d ON d.dataset_id = c.dataset_id
+        WHERE {' AND '.join(where)}
+    """
+    total = conn.execute(f"SELECT COUNT(*) {base}", params).fetchone()[0]
+    # 只读连接不会迁移表结构，旧版案例库没有 predictions.extra
+    run_extra = "p.extra" if _has_column(conn, "predictions", "extra") else "NULL"
+    df = pd.read_sql_query(
+        f"""
+        SELECT c.case_index AS "index", c.question, c.answer, c.image_path, c.extra,
+               p.prediction, p.hit, p.res, p.extract, {run_extra} AS run_extra
+        {base}
+        ORDER BY c.case_id
+        LIMIT ? OFFSET ?
+        """,
+        conn,
+        params=params + [limit, offset],
+    )
+    return df, total
+
+
+__all__ = [
+    'CASE_STORE_ENV',
+    'DEFAULT_CASE_STORE',
+    'CASE_EXTRA_COLS',
+    'get_store_path',
+    'connect',
+    'ingest_file',
+    'ingest_run',
+    'list_runs',
+    'list_datasets',
+    'query_cases',
+]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="将一个或多个模型的转换结果 (_for_check 文件夹) 导入 SQLite 案例库")
+    parser.add_argument("folders", nargs="+", help="转换结果文件夹，run 名称为文件夹名去掉 _for_check")
+    parser.add_argument("--db", default=None, help=f"数据库路径，默认读取 {CASE_STORE_ENV} 或 {DEFAULT_CASE_STORE}")
+    parser.add_argument("--force", action="store_true", help="忽略导入记录，全部重新导入")
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    try:
+        for folder in args.folders:
+            print(f"\n开始导入: {folder}")
+            results = ingest_run(conn, folder, force=args.force)
+            imported = sum(r["rows"] for r in results.values())
+            failed = sum(1 for r in results.values() if r["status"] == "failed")
+            print(f"完成: 导入 {imported} 行，失败 {failed} 个文件")
+    finally:
+        conn.close()
+    print("所有 run 导入完毕！")
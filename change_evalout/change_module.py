@@ -1,19 +1,31 @@
 import os
+import json
+import time
+import hashlib
+import zipfile
+import importlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pandas as pd
+import table_io
 
-# 1. 导入所有工具模块
-import tool2_change_evalout_image_AI2D
-import tool2_change_evalout_image_ChartQA
-import tool2_change_evalout_image_DocVQA
-import tool2_change_evalout_image_LogicVista
-import tool2_change_evalout_image_MathVerse
-import tool2_change_evalout_image_MathVision
-import tool2_change_evalout_image_MathVista
-import tool2_change_evalout_image_MMMU
-import tool2_change_evalout_image_MMStar
-import tool2_change_evalout_image_OCRBench
-import tool2_change_evalout_image_RealWorldQA
-import tool2_change_evalout_image_WeMath
+# 1. 工具模块按模块名登记，真正执行转换或改写时才导入 (避免查看器启动时加载全部 12 个模块)
+def load_tool_module(module):
+    """
+    获取工具模块对象
+    
+    Args:
+        module (str | module): 模块名 (如 "tool2_change_evalout_image_AI2D") 或已导入的模块对象
+    
+    Returns:
+        module: 模块对象
+    """
+    if isinstance(module, str):
+        return importlib.import_module(module)
+    return module
+
+def tool_module_name(module):
+    """获取工具模块名，兼容模块名字符串与模块对象两种配置写法"""
+    return module if isinstance(module, str) else module.__name__
 
 def create_file_config(model_prefix="taichu_vl_moe"):
     """
@@ -27,51 +39,51 @@ def create_file_config(model_prefix="taichu_vl_moe"):
     """
     return {
         f"{model_prefix}_AI2D_TEST_openai_result.xlsx": {
-            "module": tool2_change_evalout_image_AI2D, 
+            "module": "tool2_change_evalout_image_AI2D",
             "folder": None  # 使用None表示不需要folder
         },
         f"{model_prefix}_ChartQA_TEST_result.xlsx": {
-            "module": tool2_change_evalout_image_ChartQA, 
+            "module": "tool2_change_evalout_image_ChartQA",
             "folder": "ChartQA"
         },
         f"{model_prefix}_DocVQA_VAL_result.xlsx": {
-            "module": tool2_change_evalout_image_DocVQA, 
+            "module": "tool2_change_evalout_image_DocVQA",
             "folder": "DocVQA"
         },
         f"{model_prefix}_LogicVista_gpt4o-mini.xlsx": {
-            "module": tool2_change_evalout_image_LogicVista, 
+            "module": "tool2_change_evalout_image_LogicVista",
             "folder": "LogicVista"
         },
         f"{model_prefix}_MathVerse_MINI_Vision_Only_gpt-4o-mini_score.xlsx": {
-            "module": tool2_change_evalout_image_MathVerse, 
+            "module": "tool2_change_evalout_image_MathVerse",
             "folder": "MathVerse_MINI_Vision_Only"
         },
         f"{model_prefix}_MathVision_gpt-4o-mini.xlsx": {
-            "module": tool2_change_evalout_image_MathVision, 
+            "module": "tool2_change_evalout_image_MathVision",
             "folder": "MathVision"
         },
         f"{model_prefix}_MathVista_MINI_gpt-4o-mini.xlsx": {
-            "module": tool2_change_evalout_image_MathVista, 
+            "module": "tool2_change_evalout_image_MathVista",
             "folder": "MathVista_MINI"
         },
         f"{model_prefix}_MMMU_DEV_VAL_openai_result.xlsx": {
-            "module": tool2_change_evalout_image_MMMU, 
+            "module": "tool2_change_evalout_image_MMMU",
             "folder": "MMMU_DEV_VAL"
         },
         f"{model_prefix}_MMStar_openai_result.xlsx": {
-            "module": tool2_change_evalout_image_MMStar, 
+            "module": "tool2_change_evalout_image_MMStar",
             "folder": "MMStar"
         },
         f"{model_prefix}_OCRBench_result.xlsx": {
-            "module": tool2_change_evalout_image_OCRBench, 
+            "module": "tool2_change_evalout_image_OCRBench",
             "folder": "OCRBench"
         },
         f"{model_prefix}_RealWorldQA_openai_result.xlsx": {
-            "module": tool2_change_evalout_image_RealWorldQA, 
+            "module": "tool2_change_evalout_image_RealWorldQA",
             "folder": "RealWorldQA"
         },
         f"{model_prefix}_WeMath_gpt4o-mini.xlsx": {
-            "module": tool2_change_evalout_image_WeMath, 
+            "module": "tool2_change_evalout_image_WeMath",
             "folder": "WeMath"
         }
     }
@@ -85,7 +97,148 @@ def ensure_dir(directory):
         os.makedirs(directory)
         print(f"创建输出目录: {directory}")
 
-def process_xlsx_files(input_root_dir, output_root_dir, base_data_path, file_config=None):
+def build_prefix_path(base_data_path, folder):
+    """
+    构建某个数据集特有的图片前缀路径
+    
+    Args:
+        base_data_path (str): 基础数据路径 (图片文件夹的父目录)
+        folder (str | None): 数据集图片子目录，None 表示直接使用基础路径
+    
+    Returns:
+        str: 图片前缀路径
+    """
+    if folder is None:
+        # 对于不需要folder的数据集(如AI2D)，直接使用BASE_DATA_PATH
+        return base_data_path
+    # 对于需要folder的数据集，拼接路径，并确保以/结尾
+    return os.path.join(base_data_path, folder) + '/'
+
+def get_path_rewrite(file_config, keyword, base_data_path):
+    """
+    查找某个数据集在虚拟模式下使用的路径改写规则
+    
+    虚拟模式不生成 _for_check 副本，而是在查看器加载原始评测结果时，
+    用与格式转换完全相同的模块和前缀规则在内存中改写 image_path。
+    
+    Args:
+        file_config (dict): 文件配置字典 (见 create_file_config)
+        keyword (str): 数据集关键字，与 tool2 模块名后缀一致 (如 "MMMU")
+        base_data_path (str): 基础数据路径 (图片文件夹的父目录)
+    
+    Returns:
+        tuple | None: (模块名, 前缀路径)，可直接作为缓存函数的参数；找不到时返回 None
+    """
+    for config in file_config.values():
+        module_name = tool_module_name(config['module'])
+        if module_name.endswith(f"_{keyword}"):
+            return (module_name, build_prefix_path(base_data_path, config['folder']))
+    return None
+
+def apply_path_rewrite(df, path_rewrite):
+    """
+    在内存中应用路径改写规则
+    
+    Args:
+        df (pd.DataFrame): 原始评测结果
+        path_rewrite (tuple | None): get_path_rewrite 的返回值，None 表示不改写
+    
+    Returns:
+        pd.DataFrame: 改写后的数据
+    """
+    if not path_rewrite:
+        return df
+    module_name, prefix_path = path_rewrite
+    return load_tool_module(module_name).add_prefix_to_df(df, prefix_path)
+
+# ===========================
+#      增量转换清单 (manifest)
+# ===========================
+# 清单文件保存在输出目录中，记录每个文件转换时的源文件信息与转换配置
+MANIFEST_FILENAME = ".convert_manifest.json"
+
+# 转换规则版本号：修改 tool2 模块的改写逻辑后需要递增，使已有的转换结果全部失效
+CONVERTER_VERSION = 1
+
+def file_sha256(path, chunk_size=1 << 20):
+    """分块计算文件内容的 sha256，避免一次性读入大文件"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest(output_root_dir):
+    """
+    读取输出目录中的转换清单
+    
+    Returns:
+        dict: {filename: 清单条目}，清单不存在或损坏时返回空字典
+    """
+    manifest_path = os.path.join(output_root_dir, MANIFEST_FILENAME)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        return manifest.get("files", {})
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(output_root_dir, entries):
+    """原子地写入转换清单 (先写临时文件再替换，避免中断时留下半个文件)"""
+    manifest_path = os.path.join(output_root_dir, MANIFEST_FILENAME)
+    tmp_path = f"{manifest_path}.tmp.{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"version": CONVERTER_VERSION, "files": entries}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+def _is_up_to_date(entry, source, convert_config, outputs, input_path):
+    """
+    判断已有的转换结果是否仍然有效
+    
+    大小、修改时间与 ctime (inode 变更时间) 都没变时直接认为有效；否则 (例如文件被重新拷贝，
+    或被改写后又恢复了修改时间) 再用内容哈希确认。ctime 无法由用户设置，任何写入都会改变它。
+    哈希一致时会就地更新 entry 中记录的时间。
+    
+    Returns:
+        tuple: (是否有效, 本次计算出的 sha256 或 None)
+    """
+    if not entry or entry.get("config") != convert_config:
+        return False, None
+    if not all(os.path.exists(p) for p in outputs):
+        return False, None
+
+    recorded = entry.get("source", {})
+    if recorded.get("size") != source["size"]:
+        return False, None
+    if recorded.get("mtime") == source["mtime"] and recorded.get("ctime") == source["ctime"]:
+        return True, None
+
+    sha256 = file_sha256(input_path)
+    if sha256 == recorded.get("sha256"):
+        recorded["mtime"] = source["mtime"]
+        recorded["ctime"] = source["ctime"]
+        return True, sha256
+    return False, sha256
+
+def _convert_one(module_name, input_path, output_path, prefix_path, output_formats=None):
+    """
+    单个文件的转换任务 (在子进程中执行)
+    
+    模块对象无法跨进程传递，因此这里按模块名重新导入。
+    
+    Returns:
+        dict: 任务结果 {"status": "success" / "failed", "error": 错误信息}
+    """
+    try:
+        module = load_tool_module(module_name)
+        ok = module.add_prefix_to_xlsx(input_path, output_path, prefix_path, output_formats)
+        if ok is False:
+            return {"status": "failed", "error": "模块处理失败，详见日志输出"}
+        return {"status": "success", "error": None}
+    except Exception as e:
+        return {"status": "failed", "error": str(e)}
+
+def process_xlsx_files(input_root_dir, output_root_dir, base_data_path, file_config=None, max_workers=1, output_formats=None, force=False):
     """
     处理Excel文件，为图片路径添加前缀
     
@@ -94,56 +247,222 @@ def process_xlsx_files(input_root_dir, output_root_dir, base_data_path, file_con
         output_root_dir (str): 输出文件夹路径
         base_data_path (str): 基础数据路径 (图片文件夹的父目录)
         file_config (dict, optional): 文件配置字典，如果为None则使用默认配置
+        max_workers (int, optional): 并行进程数，<=1 时按顺序执行，None 表示使用全部 CPU
+        output_formats (str | list, optional): 输出格式，可选 xlsx / parquet / arrow，
+                                              列式文件与 xlsx 同名保存在输出目录中；None 表示只输出 xlsx
+        force (bool, optional): 为 True 时忽略转换清单，全部重新转换
+    
+    说明：
+        输出目录中的转换清单 (MANIFEST_FILENAME) 记录了每个文件的源文件大小、修改时间、ctime、
+        内容哈希以及转换配置。源文件和配置都没有变化且输出文件齐全时直接跳过，
+        因此重复执行只会重新生成缺失或过期的文件。
     
     Returns:
-        None
+        dict: 每个文件的处理结果 {filename: {"status": ..., "error": ..., "output": ...}}，
+              status 取值为 "success" / "failed" / "skipped" / "up_to_date"
     """
     # 如果没有提供配置，则使用默认配置
     if file_config is None:
         file_config = DEFAULT_FILE_CONFIG
 
+    # 提前校验输出格式，避免每个子任务各自报错
+    output_formats = table_io.normalize_output_formats(output_formats)
+
     ensure_dir(output_root_dir)
     
     print(f"开始处理，共 {len(file_config)} 个任务...\n")
 
+    manifest = load_manifest(output_root_dir)
+
+    results = {}
+    tasks = {}
+    pending_entries = {}
+
     for filename, config in file_config.items():
         # 1. 构建完整路径
         input_path = os.path.join(input_root_dir, filename)
         output_path = os.path.join(output_root_dir, filename)
         
         # 2. 构建该数据集特有的 prefix 路径
-        if config['folder'] is None:
-            # 对于不需要folder的数据集(如AI2D)，直接使用BASE_DATA_PATH
-            specific_prefix_path = base_data_path
-        else:
-            # 对于需要folder的数据集，拼接路径，并确保以/结尾
-            specific_prefix_path = os.path.join(base_data_path, config['folder']) + '/'
+        specific_prefix_path = build_prefix_path(base_data_path, config['folder'])
 
         # 3. 检查输入文件是否存在
         if not os.path.exists(input_path):
             print(f"[跳过] 找不到文件: {filename}")
+            results[filename] = {"status": "skipped", "error": "找不到文件", "output": None}
             continue
 
-        # 4. 调用对应的模块进行处理
-        module = config['module']
-        
+        # 4. 对照转换清单，跳过未变化的文件
+        module_name = tool_module_name(config['module'])
+        convert_config = {
+            "module": module_name,
+            "prefix": specific_prefix_path,
+            "output_formats": list(output_formats),
+            "version": CONVERTER_VERSION,
+        }
+        outputs = table_io.output_paths(output_path, output_formats)
+        stat = os.stat(input_path)
+        source = {"size": stat.st_size, "mtime": stat.st_mtime, "ctime": stat.st_ctime}
+
+        sha256 = None
+        if not force:
+            up_to_date, sha256 = _is_up_to_date(manifest.get(filename), source, convert_config, outputs, input_path)
+            if up_to_date:
+                print(f"[跳过] 未变化: {filename}")
+                results[filename] = {"status": "up_to_date", "error": None, "output": output_path}
+                continue
+
+        source["sha256"] = sha256 or file_sha256(input_path)
+        pending_entries[filename] = {"source": source, "config": convert_config, "outputs": outputs}
+
+        # 5. 调用对应的模块进行处理
         print(f"正在处理: {filename}")
-        print(f"  - 对应模块: {module.__name__}")
+        print(f"  - 对应模块: {module_name}")
         print(f"  - 图片前缀: {specific_prefix_path}")
 
-        try:
-            # 调用模块中的 add_prefix_to_xlsx 函数
-            module.add_prefix_to_xlsx(input_path, output_path, specific_prefix_path)
-            print(f"  - [成功] 已保存至: {output_path}\n")
-        except Exception as e:
-            print(f"  - [失败] 处理出错: {e}\n")
+        tasks[filename] = (module_name, input_path, output_path, specific_prefix_path, output_formats)
+
+    if max_workers is None or max_workers > 1:
+        # 并行模式：每个数据集的转换都是独立的 CPU 密集任务，交给进程池执行
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(_convert_one, *args): filename for filename, args in tasks.items()}
+            for future in as_completed(futures):
+                filename = futures[future]
+                try:
+                    results[filename] = future.result()
+                except Exception as e:
+                    # 子进程异常退出等情况
+                    results[filename] = {"status": "failed", "error": str(e)}
+                results[filename]["output"] = tasks[filename][2]
+    else:
+        for filename, args in tasks.items():
+            results[filename] = _convert_one(*args)
+            results[filename]["output"] = args[2]
+
+    for filename in tasks:
+        result = results[filename]
+        if result["status"] == "success":
+            print(f"  - [成功] {filename} 已保存至: {result['output']}")
+            manifest[filename] = dict(pending_entries[filename], converted_at=time.time())
+        else:
+            print(f"  - [失败] {filename} 处理出错: {result['error']}")
+            # 失败的文件从清单中移除，下次一定会重新转换
+            manifest.pop(filename, None)
+
+    # 清单中也记录了哈希确认后更新的修改时间，因此即使没有新转换也写回
+    save_manifest(output_root_dir, manifest)
+
+    print("\n所有任务处理完毕！")
+    return results
+
+# ===========================
+#      监视模式 (watch)
+# ===========================
+# 评测任务会在数小时内陆续把结果写入输入目录。监视模式定期轮询输入目录，
+# 文件写完 (大小与修改时间在 settle 秒内不再变化，且 xlsx 的 zip 结构完整) 后立即转换，
+# 查看器按文件修改时间失效缓存，因此无需手动点击转换即可看到最新结果。
+# 输入目录通常在 Lustre / NFS 上，inotify 收不到其它节点写入的事件，这里统一使用轮询。
+DEFAULT_POLL_INTERVAL = 10
+DEFAULT_SETTLE_SECONDS = 30
+
+def _is_complete_xlsx(path):
+    """xlsx 是 zip 文件，中央目录写在文件末尾，写到一半的文件无法通过检查"""
+    try:
+        return zipfile.is_zipfile(path)
+    except OSError:
+        return False
+
+def watch_xlsx_files(input_root_dir, output_root_dir, base_data_path, file_config=None, poll_interval=DEFAULT_POLL_INTERVAL,
+                     settle_seconds=DEFAULT_SETTLE_SECONDS, max_workers=1, output_formats=None, max_polls=None):
+    """
+    监视输入目录，文件写完后立即转换 (轮询 + 去抖)
+    
+    Args:
+        input_root_dir (str): 输入文件夹路径 (存放原始 xlsx 的目录)
+        output_root_dir (str): 输出文件夹路径
+        base_data_path (str): 基础数据路径 (图片文件夹的父目录)
+        file_config (dict, optional): 文件配置字典，如果为None则使用默认配置
+        poll_interval (float, optional): 轮询间隔 (秒)
+        settle_seconds (float, optional): 文件大小与修改时间保持不变多久后才认为已经写完 (秒)
+        max_workers (int, optional): 同一轮中有多个文件就绪时的并行进程数，见 process_xlsx_files
+        output_formats (str | list, optional): 输出格式，见 process_xlsx_files
+        max_polls (int, optional): 最多轮询次数，None 表示一直运行直到被中断
+    
+    说明：
+        实际转换仍由 process_xlsx_files 完成，转换清单照常生效：
+        启动时已经转换过且未变化的文件会直接跳过，转换后被覆盖的文件会重新转换。
+        转换失败的文件在源文件再次变化前不会重试。
+    
+    Returns:
+        dict: 运行期间每个文件最近一次的处理结果，格式同 process_xlsx_files
+    """
+    if file_config is None:
+        file_config = DEFAULT_FILE_CONFIG
+    output_formats = table_io.normalize_output_formats(output_formats)
+
+    seen = {}       # filename -> (签名, 开始保持该签名的时间)
+    handled = {}    # filename -> 已处理过的签名
+    warned = set()  # 已提示过 zip 结构不完整的 (filename, 签名)
+    results = {}
+    polls = 0
+
+    print(f"开始监视: {input_root_dir} (每 {poll_interval} 秒轮询，文件 {settle_seconds} 秒内不再变化后转换)")
+    while True:
+        now = time.time()
+        ready = {}
+        for filename, config in file_config.items():
+            input_path = os.path.join(input_root_dir, filename)
+            try:
+                stat = os.stat(input_path)
+            except OSError:
+                seen.pop(filename, None)
+                continue
+            signature = (stat.st_size, stat.st_mtime)
+            if handled.get(filename) == signature:
+                continue
+
+            previous = seen.get(filename)
+            if previous is None:
+                # 第一次看到：修改时间已经足够久的文件 (如启动前就写完的) 不需要再等待
+                seen[filename] = (signature, min(now, stat.st_mtime))
+            elif previous[0] != signature:
+                # 仍在写入，重新计时
+                seen[filename] = (signature, now)
+
+            if stat.st_size == 0 or now - seen[filename][1] < settle_seconds:
+                continue
+            if not _is_complete_xlsx(input_path):
+                if (filename, signature) not in warned:
+                    print(f"[等待] 文件结构不完整，可能仍在写入: {filename}")
+                    warned.add((filename, signature))
+                continue
+            ready[filename] = config
+
+        if ready:
+            print(f"\n[{time.strftime('%H:%M:%S')}] 检测到 {len(ready)} 个新文件或已更新的文件")
+            results.update(process_xlsx_files(input_root_dir, output_root_dir, base_data_path, ready,
+                                              max_workers=max_workers, output_formats=output_formats))
+            for filename in ready:
+                handled[filename] = seen.pop(filename)[0]
 
-    print("所有任务处理完毕！")
+        polls += 1
+        if max_polls is not None and polls >= max_polls:
+            return results
+        time.sleep(poll_interval)
 
 # 导出接口
 __all__ = [
     'process_xlsx_files',
+    'watch_xlsx_files',
+    'DEFAULT_POLL_INTERVAL',
+    'DEFAULT_SETTLE_SECONDS',
     'create_file_config',  # 导出创建配置的函数
+    'build_prefix_path',
+    'load_tool_module',
+    'get_path_rewrite',
+    'apply_path_rewrite',
     'DEFAULT_FILE_CONFIG',
+    'MANIFEST_FILENAME',
+    'load_manifest',
     'ensure_dir'
 ]
@@ -0,0 +1,131 @@
+import ast
+import numpy as np
+import pandas as pd
+
+# ===========================
+#      hit 计算规则
+# ===========================
+# ChartQA / DocVQA 的原始评测结果没有 hit 列，需要按答案匹配计算。
+# 查看器、准确率总览 (dashboard) 与案例库 (case_store) 都使用这里的规则，
+# 保证同一个文件在各处显示的 hit / 准确率一致。
+#
+# 规则与各查看器原有的逐行实现保持一致：只去掉首尾空白并转小写，不合并中间的空白。
+# (合并空白等规范化只用于 ANLS 打分，见 case_viewer/scoring.py)
+
+
+def _clean(series):
+    """转字符串并去掉首尾空白 (与查看器加载时对 answer / prediction 的预处理一致)"""
+    return series.astype(str).str.strip()
+
+
+def string_hit(answers, predictions, lists=None):
+    """
+    ChartQA 规则：去掉首尾空白后不区分大小写完全相同
+
+    Args:
+        answers (pd.Series): answer 列
+        predictions (pd.Series): prediction 列
+        lists (pd.Series, optional): 不使用，参数与 list_hit 一致
+
+    Returns:
+        pd.Series: bool
+    """
+    matched = _clean(answers).str.lower() == _clean(predictions).str.lower()
+    return pd.Series(matched.to_numpy(dtype=bool), index=answers.index)
+
+
+def _literal_list(text):
+    """与原 check_hit 相同，用 ast.literal_eval 解析，结果不是列表时返回 None"""
+    try:
+        value = ast.literal_eval(text)
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+        return None
+    return value if isinstance(value, list) else None
+
+
+def answer_lists(answers):
+    """
+    解析 answer 列中的候选答案列表 (整列只解析一次，list_hit 与 ANLS 打分共用)
+
+    与原 check_hit 相同，用 ast.literal_eval 解析；只有以 "[" 或 "(" 开头的字符串可能解析出列表，
+    其余行不做解析。
+
+    Args:
+        answers (pd.Series): answer 列
+
+    Returns:
+        pd.Series: object，能解析为列表的行为列表 (元素保持原样)，其余行为 None；索引与 answers 一致
+    """
+    answers = _clean(answers)
+    values = np.full(len(answers), None, dtype=object)
+    answer_values = answers.to_numpy(dtype=object)
+    maybe_list = answers.str.match(r"[\[(]").fillna(False).to_numpy(dtype=bool)
+    for pos in np.flatnonzero(maybe_list):
+        values[pos] = _literal_list(answer_values[pos])
+    return pd.Series(values, index=answers.index, dtype=object)
+
+
+def list_hit(answers, predictions, lists=None):
+    """
+    DocVQA 规则 (原查看器中的 check_hit)，即不区分大小写的精确匹配 (exact match)
+
+    answer 能解析为列表时，prediction 转小写后等于任一候选答案 (转小写，不去空白) 即为命中；
+    否则与 string_hit 相同。
+
+    Args:
+        answers (pd.Series): answer 列
+        predictions (pd.Series): prediction 列
+        lists (pd.Series, optional): answer_lists(answers) 的结果，已经解析过时传入以免重复解析
+
+    Returns:
+        pd.Series: bool
+    """
+    if lists is None:
+        lists = answer_lists(answers)
+    preds = _clean(predictions).str.lower().to_numpy(dtype=object)
+    hit = (_clean(answers).str.lower().to_numpy(dtype=object) == preds)
+
+    # 按行号展开为 (候选, 预测) 对后整列比较 (空列表没有候选，不会命中)
+    values = lists.to_numpy(dtype=object)
+    is_list = np.fromiter((isinstance(v, list) for v in values), dtype=bool, count=len(values))
+    hit[is_list] = False
+    rows = np.flatnonzero(is_list)
+    counts = np.fromiter((len(values[pos]) for pos in rows), dtype=np.int64, count=len(rows))
+    positions = np.repeat(rows, counts)
+    candidates = np.array([str(x).lower() for pos in rows for x in values[pos]], dtype=object)
+    if len(candidates):
+        matched = candidates == preds[positions]
+        hit[positions[matched]] = True
+    return pd.Series(hit.astype(bool), index=answers.index)
+
+
+# 各数据集没有 hit 列时使用的规则；未登记的数据集使用 list_hit (非列表答案时等同于 string_hit)
+HIT_RULES = {
+    "ChartQA": string_hit,
+    "DocVQA": list_hit,
+}
+
+
+def fallback_hit(dataset, answers, predictions, lists=None):
+    """
+    按数据集的规则计算 hit
+
+    Args:
+        dataset (str): 数据集名称 (如 "DocVQA")
+        answers (pd.Series): answer 列
+        predictions (pd.Series): prediction 列
+        lists (pd.Series, optional): answer_lists(answers) 的结果 (同时需要 ANLS 打分时传入，只解析一次)
+
+    Returns:
+        pd.Series: bool
+    """
+    return HIT_RULES.get(dataset, list_hit)(answers, predictions, lists)
+
+
+__all__ = [
+    'answer_lists',
+    'string_hit',
+    'list_hit',
+    'HIT_RULES',
+    'fallback_hit',
+]
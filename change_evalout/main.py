@@ -1,114 +1,9 @@
 import os
-import pandas as pd
+import argparse
+import change_module
 
-# 1. 导入所有工具模块
-import tool2_change_evalout_image_AI2D
-import tool2_change_evalout_image_ChartQA
-import tool2_change_evalout_image_DocVQA
-import tool2_change_evalout_image_LogicVista
-import tool2_change_evalout_image_MathVerse
-import tool2_change_evalout_image_MathVision
-import tool2_change_evalout_image_MathVista
-import tool2_change_evalout_image_MMMU
-import tool2_change_evalout_image_MMStar
-import tool2_change_evalout_image_OCRBench
-import tool2_change_evalout_image_RealWorldQA
-import tool2_change_evalout_image_WeMath
-
-
-# ================= 核心映射配置 =================
-FILE_CONFIG = {
-    "taichu_vl_moe_AI2D_TEST_openai_result.xlsx": {
-        "module": tool2_change_evalout_image_AI2D, 
-        "folder": None  # 使用None表示不需要folder
-    },
-    "taichu_vl_moe_ChartQA_TEST.xlsx": {
-        "module": tool2_change_evalout_image_ChartQA, 
-        "folder": "ChartQA"
-    },
-    "taichu_vl_moe_DocVQA_VAL.xlsx": {
-        "module": tool2_change_evalout_image_DocVQA, 
-        "folder": "DocVQA"
-    },
-    "taichu_vl_moe_LogicVista_gpt4o-mini.xlsx": {
-        "module": tool2_change_evalout_image_LogicVista, 
-        "folder": "LogicVista"
-    },
-    "taichu_vl_moe_MathVerse_MINI_Vision_Only_gpt-4o-mini_score.xlsx": {
-        "module": tool2_change_evalout_image_MathVerse, 
-        "folder": "MathVerse_MINI_Vision_Only"
-    },
-    "taichu_vl_moe_MathVision_gpt-4o-mini.xlsx": {
-        "module": tool2_change_evalout_image_MathVision, 
-        "folder": "MathVision"
-    },
-    "taichu_vl_moe_MathVista_MINI_gpt-4o-mini.xlsx": {
-        "module": tool2_change_evalout_image_MathVista, 
-        "folder": "MathVista_MINI"
-    },
-    "taichu_vl_moe_MMMU_DEV_VAL_openai_result.xlsx": {
-        "module": tool2_change_evalout_image_MMMU, 
-        "folder": "MMMU_DEV_VAL"
-    },
-    "taichu_vl_moe_MMStar_openai_result.xlsx": {
-        "module": tool2_change_evalout_image_MMStar, 
-        "folder": "MMStar"
-    },
-    "taichu_vl_moe_OCRBench.xlsx": {
-        "module": tool2_change_evalout_image_OCRBench, 
-        "folder": "OCRBench"
-    },
-    "taichu_vl_moe_RealWorldQA_openai_result.xlsx": {
-        "module": tool2_change_evalout_image_RealWorldQA, 
-        "folder": "RealWorldQA"
-    },
-    "taichu_vl_moe_WeMath_gpt4o-mini.xlsx": {
-        "module": tool2_change_evalout_image_WeMath, 
-        "folder": "WeMath"
-    }
-}
-
-def ensure_dir(directory):
-    if not os.path.exists(directory):
-        os.makedirs(directory)
-        print(f"创建输出目录: {directory}")
-
-def run_processing(INPUT_ROOT_DIR, OUTPUT_ROOT_DIR, BASE_DATA_PATH):
-    ensure_dir(OUTPUT_ROOT_DIR)
-    
-    print(f"开始处理，共 {len(FILE_CONFIG)} 个任务...\n")
-
-    for filename, config in FILE_CONFIG.items():
-        # 1. 构建完整路径
-        input_path = os.path.join(INPUT_ROOT_DIR, filename)
-        output_path = os.path.join(OUTPUT_ROOT_DIR, filename)
-        
-        # 2. 构建该数据集特有的 prefix 路径
-        if config['folder'] is None:
-            # 对于不需要folder的数据集(如AI2D)，直接使用BASE_DATA_PATH
-            specific_prefix_path = BASE_DATA_PATH
-        else:
-            # 对于需要folder的数据集，拼接路径，并确保以/结尾
-            specific_prefix_path = os.path.join(BASE_DATA_PATH, config['folder']) + '/'
-
-        # 3. 检查输入文件是否存在
-        if not os.path.exists(input_path):
-            print(f"[跳过] 找不到文件: {filename}")
-            continue
-
-        # 4. 调用对应的模块进行处理
-        module = config['module']
-        
-        print(f"正在处理: {filename}")
-        print(f"  - 对应模块: {module.__name__}")
-        print(f"  - 图片前缀: {specific_prefix_path}")
-
-        try:
-            # 调用模块中的 add_prefix_to_xlsx 函数
-            module.add_prefix_to_xlsx(input_path, output_path, specific_prefix_path)
-            print(f"  - [成功] 已保存至: {output_path}\n")
-        except Exception as e:
-            print(f"  - [失败] 处理出错: {e}\n")
+# 文件名与数据集模块的对应关系由 change_module.create_file_config 统一维护 (查看器使用同一份配置)，
+# 转换流程 (增量清单、并行进程池、输出格式) 由 change_module.process_xlsx_files 完成。
 
 if __name__ == "__main__":
     # ================= 配置区域 =================
@@ -122,5 +17,29 @@ if __name__ == "__main__":
     # 基础数据路径 (图片文件夹的父目录)
     BASE_DATA_PATH = '/mnt/lustre/houbingxi/1212_moe_eval_badcase/LMUData'
 
-    run_processing(INPUT_ROOT_DIR, OUTPUT_ROOT_DIR, BASE_DATA_PATH)
-    print("所有任务处理完毕！")
+    parser = argparse.ArgumentParser(description="为评测结果中的图片路径添加前缀")
+    parser.add_argument("--model-prefix", default=None, help="结果文件名的模型前缀，默认为输入文件夹名 (与查看器一致)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="并行进程数，为 1 时按顺序转换，默认使用全部 CPU")
+    parser.add_argument("--formats", default=None, help="输出格式，如 parquet 或 xlsx+parquet，默认只输出 xlsx")
+    parser.add_argument("--force", action="store_true", help="忽略转换清单，全部重新转换")
+    parser.add_argument("--watch", action="store_true", help="监视输入目录，新的评测结果写完后立即转换 (Ctrl+C 退出)")
+    parser.add_argument("--interval", type=float, default=change_module.DEFAULT_POLL_INTERVAL, help="监视模式的轮询间隔 (秒)")
+    parser.add_argument("--settle", type=float, default=change_module.DEFAULT_SETTLE_SECONDS, help="文件多久不再变化后认为已经写完 (秒)")
+    args = parser.parse_args()
+
+    model_prefix = args.model_prefix or os.path.basename(INPUT_ROOT_DIR.rstrip(os.sep))
+    file_config = change_module.create_file_config(model_prefix)
+
+    if args.watch:
+        try:
+            change_module.watch_xlsx_files(INPUT_ROOT_DIR, OUTPUT_ROOT_DIR, BASE_DATA_PATH, file_config,
+                                           poll_interval=args.interval, settle_seconds=args.settle,
+                                           max_workers=args.workers, output_formats=args.formats)
+        except KeyboardInterrupt:
+            print("\n已停止监视")
+    else:
+        results = change_module.process_xlsx_files(INPUT_ROOT_DIR, OUTPUT_ROOT_DIR, BASE_DATA_PATH, file_config,
+                                                   max_workers=args.workers, output_formats=args.formats, force=args.force)
+        failed = [filename for filename, result in results.items() if result["status"] == "failed"]
+        if failed:
+            print(f"转换失败的文件: {failed}")
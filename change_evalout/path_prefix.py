@@ -0,0 +1,166 @@
+import re
+import ast
+import pandas as pd
+
+# ===========================
+#      图片路径前缀引擎
+# ===========================
+# 评测结果中的 image_path 有三种形态：
+#   1. 单个路径字符串      "images/1.jpg"
+#   2. 列表形式的字符串    "['images/1.jpg', 'images/2.jpg']"  (多图数据集，Excel 中保存为文本)
+#   3. 已经是 list 对象    ['images/1.jpg', 'images/2.jpg']     (内存中直接构造的数据)
+# 这里用字符串操作一次性区分整列的形态，只对可能是字面量的行 (主要是列表行) 做解析，
+# 单路径行则整列向量化拼接，避免逐行 ast.literal_eval 和异常回退的开销。
+# 结果与原转换逻辑逐行 literal_eval 完全一致 (见 tests/test_baseline_equivalence.py)。
+
+# 只包含简单引号字符串 (无转义、无嵌套引号) 的列表，可以直接用正则拆分
+_SIMPLE_LIST_RE = re.compile(r"""\[\s*(?:(['"])[^'"\\]*\1\s*(?:,\s*(['"])[^'"\\]*\2\s*)*,?\s*)?\]""")
+_QUOTED_ITEM_RE = re.compile(r"""(['"])([^'"\\]*)\1""")
+
+# ast.literal_eval 可能成功的字符串 (数字、带引号的字符串、元组 / 列表 / 集合 / 字典、True / False / None)。
+# 原转换逻辑对每个字符串都先 literal_eval，成功时按解析结果拼接 (如 "'q.jpg'" -> q.jpg)；
+# 以字母、'/' 开头的普通路径不可能解析成功，只有匹配该正则的行需要逐行解析
+_LITERAL_START_RE = re.compile(r"""\s*(?:[-+.\d'"(\[{]|[bBrRuUfF]{1,2}['"]|True|False|None)""")
+
+
+def _literal_value(text):
+    """
+    与原转换逻辑相同的 ast.literal_eval 解析 (简单列表走正则快速拆分)
+
+    Returns:
+        tuple: (是否解析成功, 解析结果)
+    """
+    if _SIMPLE_LIST_RE.fullmatch(text.strip()):
+        return True, [m.group(2) for m in _QUOTED_ITEM_RE.finditer(text)]
+    try:
+        return True, ast.literal_eval(text)
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+        return False, None
+
+
+def parse_path_list(text):
+    """
+    解析列表形式的路径字符串
+
+    与 prefix_image_paths 使用同一个解析 (_literal_value)，两者对同一字符串的判断一致：
+    只有 ast.literal_eval 能解析为列表的字符串才按列表处理 (JSON 独有的 true / null 等写法不算)。
+
+    Args:
+        text (str): 形如 "['a.jpg', 'b.jpg']" 的字符串
+
+    Returns:
+        list | None: 解析出的路径列表，无法解析为列表时返回 None
+    """
+    ok, value = _literal_value(text)
+    return value if ok and isinstance(value, list) else None
+
+
+def list_literal_mask(series):
+    """
+    判断每一行是否是列表形式的字符串 (向量化)
+
+    Returns:
+        pd.Series: bool 序列，只有以 '[' 开头、']' 结尾的字符串为 True
+    """
+    # pandas 3 的 str 列上 map(type) 的结果仍是 str 类型，无法与 str 比较，这里直接返回 bool
+    is_str = series.map(lambda v: isinstance(v, str)).astype(bool)
+    stripped = series.where(is_str, "").astype(str).str.strip()
+    return is_str & stripped.str.startswith("[") & stripped.str.endswith("]")
+
+
+def _join(prefix_path, path):
+    """前缀 + '/' + 原有路径 (去掉原路径开头的 '/')，与各转换模块的拼接规则一致"""
+    return f"{prefix_path}/{str(path).lstrip('/')}"
+
+
+def prefix_image_paths(series, prefix_path):
+    """
+    为整列 image_path 添加前缀
+
+    Args:
+        series (pd.Series): image_path 列
+        prefix_path (str): 图片前缀路径
+
+    Returns:
+        pd.Series: 处理后的列。空值保持不变；列表 (或列表形式的字符串) 返回 list；
+                   其余按单个路径处理，返回字符串
+    """
+    result = series.astype(object).copy()
+    notna = series.notna()
+    is_list_obj = series.map(lambda x: isinstance(x, list))
+    is_str = series.map(lambda v: isinstance(v, str)).astype(bool)
+    literal = is_str & series.where(is_str, "").astype(str).str.match(_LITERAL_START_RE)
+
+    # 1. 单路径行：整列字符串拼接
+    scalar = notna & ~is_list_obj & ~literal
+    if scalar.any():
+        paths = series[scalar].astype(str).str.lstrip("/")
+        result[scalar] = prefix_path + "/" + paths
+
+    # 2. 可能是字面量的字符串 (主要是列表形式的字符串)：逐行解析，与原逻辑一致：
+    #    列表逐项拼接；其它字面量按解析结果拼接；解析失败的按普通字符串处理
+    for idx, text in series[literal].items():
+        ok, value = _literal_value(text)
+        if not ok:
+            result.at[idx] = _join(prefix_path, text)
+        elif isinstance(value, list):
+            result.at[idx] = [_join(prefix_path, item) for item in value]
+        else:
+            result.at[idx] = _join(prefix_path, value)
+
+    # 3. 已经是 list 对象的行
+    for idx, items in series[is_list_obj].items():
+        result.at[idx] = [_join(prefix_path, item) for item in items]
+
+    return result
+
+
+def build_index_paths(index_series, prefix_path, ext=".png"):
+    """
+    根据 index 列生成图片路径 (prefix + index + 扩展名)，用于图片按 index 命名的数据集
+
+    Args:
+        index_series (pd.Series): index 列
+        prefix_path (str): 图片前缀路径 (以 '/' 结尾)
+        ext (str): 图片扩展名
+
+    Returns:
+        pd.Series: 图片路径列
+    """
+    return prefix_path + index_series.astype(str) + ext
+
+
+def split_image_paths(series):
+    """
+    将 image_path 列统一拆分为路径列表 (查看器展示多图时使用)
+
+    Returns:
+        pd.Series: 每行为路径列表；空值对应空列表
+    """
+    result = pd.Series([[] for _ in range(len(series))], index=series.index, dtype=object)
+    notna = series.notna()
+    is_list_obj = series.map(lambda x: isinstance(x, list))
+    list_str = list_literal_mask(series)
+
+    scalar = notna & ~is_list_obj & ~list_str
+    stripped = series[scalar].astype(str).str.strip()
+    for idx, path in stripped[stripped != ""].items():
+        result.at[idx] = [path]
+
+    for idx, text in series[list_str].items():
+        items = parse_path_list(text)
+        result.at[idx] = [str(p).strip() for p in items] if items is not None else [text.strip()]
+
+    for idx, items in series[is_list_obj].items():
+        result.at[idx] = [str(p).strip() for p in items]
+
+    return result
+
+
+__all__ = [
+    'parse_path_list',
+    'list_literal_mask',
+    'prefix_image_paths',
+    'build_index_paths',
+    'split_image_paths',
+]
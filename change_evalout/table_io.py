@@ -0,0 +1,385 @@
+import os
+import importlib.util
+import numpy as np
+import pandas as pd
+
+# ===========================
+#      输出格式配置
+# ===========================
+# 列式格式 -> 文件扩展名 (arrow 即 Arrow IPC / Feather V2 文件)
+COLUMNAR_FORMATS = {
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+}
+
+# 所有支持的输出格式
+OUTPUT_FORMATS = ("xlsx",) + tuple(COLUMNAR_FORMATS)
+
+# 默认只输出 xlsx，与原有行为保持一致
+DEFAULT_OUTPUT_FORMATS = ("xlsx",)
+
+
+def normalize_output_formats(output_formats=None):
+    """
+    规范化输出格式参数
+
+    Args:
+        output_formats (str | list | None): 单个格式、格式列表，或 "xlsx+parquet" 形式的组合字符串；
+                                            None 表示使用默认格式
+
+    Returns:
+        tuple: 去重后的格式元组
+    """
+    if output_formats is None:
+        return DEFAULT_OUTPUT_FORMATS
+    if isinstance(output_formats, str):
+        output_formats = output_formats.split("+")
+
+    formats = []
+    for fmt in output_formats:
+        fmt = fmt.strip().lower()
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"不支持的输出格式: {fmt}，可选: {list(OUTPUT_FORMATS)}")
+        if fmt not in formats:
+            formats.append(fmt)
+    if not formats:
+        raise ValueError("至少需要指定一种输出格式")
+    return tuple(formats)
+
+
+def columnar_path(file_path, fmt):
+    """根据 xlsx 路径得到同名的列式文件路径"""
+    return os.path.splitext(file_path)[0] + COLUMNAR_FORMATS[fmt]
+
+
+def output_paths(output_file, output_formats=None):
+    """
+    列出按指定格式保存时会生成的全部文件路径
+
+    Args:
+        output_file (str): xlsx 输出路径
+        output_formats (str | list | None): 输出格式，见 normalize_output_formats
+
+    Returns:
+        list: 输出文件路径 (顺序与格式顺序一致)
+    """
+    return [
+        output_file if fmt == "xlsx" else columnar_path(output_file, fmt)
+        for fmt in normalize_output_formats(output_formats)
+    ]
+
+
+def to_columnar_frame(df):
+    """
+    将 DataFrame 整理为可以写入 Parquet / Arrow 的形式
+
+    Excel 会把列表、混合类型的单元格统一保存为文本，而 Arrow 要求每列类型一致。
+    这里对包含列表或混合类型的 object 列做同样的字符串化处理 (空值保持不变)，
+    保证列式文件读回后与 xlsx 读回的内容一致。
+    """
+    frame = df.copy()
+    for col in frame.columns:
+        series = frame[col]
+        if isinstance(series.dtype, pd.CategoricalDtype) and len(set(map(type, series.cat.categories))) > 1:
+            # 类别值类型不一致 (如数字与文本混合的 answer) 时按 object 列处理
+            series = series.astype(object)
+        elif series.dtype != object:
+            continue
+        notna = series.notna()
+        value_types = set(map(type, series[notna]))
+        has_container = any(issubclass(t, (list, tuple, dict, set)) for t in value_types)
+        if has_container or len(value_types) > 1:
+            frame[col] = series.where(~notna, series.astype(str))
+    # 列名也必须是字符串
+    frame.columns = [str(c) for c in frame.columns]
+    return frame
+
+
+def write_table(df, output_file, output_formats=None):
+    """
+    按指定格式保存 DataFrame
+
+    Args:
+        df (pd.DataFrame): 要保存的数据
+        output_file (str): xlsx 输出路径，列式文件保存在同目录下的同名文件中
+        output_formats (str | list | None): 输出格式，见 normalize_output_formats
+
+    Returns:
+        list: 实际写出的文件路径
+    """
+    written = []
+    columnar_frame = None
+    for fmt in normalize_output_formats(output_formats):
+        path = output_file if fmt == "xlsx" else columnar_path(output_file, fmt)
+        # 先写临时文件再替换：查看器 (或监视模式下的下一次转换) 不会读到写了一半的文件。
+        # 临时文件的扩展名不是数据格式，不会被查看器的文件匹配选中
+        tmp_path = f"{path}.tmp.{os.getpid()}"
+        try:
+            if fmt == "xlsx":
+                # 临时文件名不以 .xlsx 结尾，通过文件对象写入以跳过 pandas 的扩展名检查
+                with open(tmp_path, 'wb') as f:
+                    df.to_excel(f, index=False, engine="openpyxl")
+            else:
+                if columnar_frame is None:
+                    columnar_frame = to_columnar_frame(df)
+                if fmt == "parquet":
+                    columnar_frame.to_parquet(tmp_path, index=False)
+                else:
+                    columnar_frame.to_feather(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        written.append(path)
+    return written
+
+
+def find_columnar(file_path):
+    """
+    查找可用的列式文件
+
+    如果 file_path 本身就是列式文件则直接返回；否则查找同名的 .parquet / .arrow 文件，
+    并且只有在它不比 xlsx 旧时才使用 (避免 xlsx 被单独更新后读到过期数据)。
+
+    Returns:
+        tuple | None: (列式文件路径, 格式)，找不到时返回 None
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    for fmt, fmt_ext in COLUMNAR_FORMATS.items():
+        if ext == fmt_ext:
+            return file_path, fmt
+
+    try:
+        source_mtime = os.path.getmtime(file_path)
+    except OSError:
+        source_mtime = None
+
+    for fmt in COLUMNAR_FORMATS:
+        path = columnar_path(file_path, fmt)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            continue
+        if source_mtime is None or mtime >= source_mtime:
+            return path, fmt
+    return None
+
+
+# ===========================
+#      xlsx 读取引擎
+# ===========================
+# 可通过环境变量指定引擎: auto / calamine / openpyxl / openpyxl_stream
+EXCEL_ENGINE_ENV = "VLM_EXCEL_ENGINE"
+
+# auto 模式下的优先顺序：
+#   calamine        Rust 实现的解析器 (需要 python-calamine 与 pandas>=2.2)，比 openpyxl 快一个数量级
+#   openpyxl_stream openpyxl read_only 流式逐行读取，只保留需要的列 (指定 columns 时使用)
+#   openpyxl        pandas 默认引擎
+EXCEL_ENGINES = ("auto", "calamine", "openpyxl", "openpyxl_stream")
+
+
+def _has_module(name):
+    return importlib.util.find_spec(name) is not None
+
+
+def resolve_excel_engine(engine=None, columns=None):
+    """
+    确定实际使用的 xlsx 读取引擎
+
+    Args:
+        engine (str | None): 指定引擎，None 时读取环境变量 EXCEL_ENGINE_ENV (默认 auto)
+        columns (list | None): 需要读取的列，auto 模式下只读部分列时优先使用流式读取
+
+    Returns:
+        str: calamine / openpyxl / openpyxl_stream
+    """
+    engine = (engine or os.environ.get(EXCEL_ENGINE_ENV) or "auto").lower()
+    if engine not in EXCEL_ENGINES:
+        raise ValueError(f"不支持的 xlsx 读取引擎: {engine}，可选: {list(EXCEL_ENGINES)}")
+    if engine != "auto":
+        return engine
+    if _has_module("python_calamine"):
+        return "calamine"
+    return "openpyxl_stream" if columns is not None else "openpyxl"
+
+
+def _convert_value(value, error_codes):
+    """
+    与 pandas 的 openpyxl 读取器相同的单元格转换
+
+    空单元格为 ""；错误值 (如 #DIV/0!，values_only 模式下以字符串返回) 为 NaN；整数值的浮点数转为 int。
+    空值字符串 (如 "NA"、"None") 交给 TextParser 按 pandas 的默认规则转换。
+    """
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return np.nan if value in error_codes else value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _trim_row(values):
+    """去掉行末的空单元格 (与 pandas 相同)"""
+    while values and isinstance(values[-1], str) and values[-1] == "":
+        values.pop()
+    return values
+
+
+def _read_openpyxl_stream(file_path, columns=None):
+    """
+    使用 openpyxl 的 read_only 模式逐行流式读取第一个工作表
+
+    不构建完整的工作簿对象，且只保留需要的列，
+    对包含超长 prediction (思维链) 单元格的大文件内存占用明显更低。
+    列名、空值与类型推断交给 pd.read_excel 内部使用的 TextParser，两条读取路径得到相同的数据。
+    """
+    from openpyxl import load_workbook
+    from openpyxl.cell.cell import ERROR_CODES
+    from pandas.io.parsers import TextParser
+
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame(columns=columns or [])
+        header = _trim_row([_convert_value(v, ERROR_CODES) for v in header])
+
+        # 空白表头 ("Unnamed: i")、重复列名 (name.1 ...) 与 pandas 的命名规则一致
+        names = list(TextParser([header], header=0).read().columns) if header else []
+        wanted = set(columns) if columns is not None else None
+        keep = [i for i, name in enumerate(names) if wanted is None or name in wanted]
+
+        data = []
+        # pandas 会去掉末尾的空行 (按整行判断，不只看需要的列)
+        rows_with_data = 0
+        for row in rows:
+            if wanted is None:
+                data.append(_trim_row([_convert_value(v, ERROR_CODES) for v in row]))
+            else:
+                data.append([_convert_value(row[i], ERROR_CODES) if i < len(row) else "" for i in keep])
+            if any(v is not None and v != "" for v in row):
+                rows_with_data = len(data)
+    finally:
+        wb.close()
+
+    data = data[:rows_with_data]
+    if wanted is not None:
+        return TextParser(data, header=None, names=[names[i] for i in keep]).read()
+
+    # 与 pandas 相同，各行补齐到最宽的一行 (表头之外的列命名为 "Unnamed: i")
+    table = [header] + data
+    width = max(len(r) for r in table)
+    return TextParser([r + [""] * (width - len(r)) for r in table], header=0).read()
+
+
+def read_excel(file_path, columns=None, engine=None, **kwargs):
+    """
+    读取 xlsx 文件 (可插拔的读取引擎)
+
+    Args:
+        file_path (str): xlsx 路径
+        columns (list | None): 只读取这些列，文件中不存在的列会被忽略；None 表示读取全部列
+        engine (str | None): 读取引擎，见 resolve_excel_engine
+        **kwargs: 透传给 pd.read_excel 的其它参数 (例如 dtype)
+
+    Returns:
+        pd.DataFrame: 读取结果
+    """
+    engine = resolve_excel_engine(engine, columns)
+
+    if engine == "openpyxl_stream":
+        df = _read_openpyxl_stream(file_path, columns)
+        dtype = kwargs.get("dtype")
+        if isinstance(dtype, dict):
+            dtype = {c: t for c, t in dtype.items() if c in df.columns}
+        return df.astype(dtype) if dtype else df
+
+    if columns is not None:
+        wanted = set(columns)
+        kwargs["usecols"] = lambda c: c in wanted
+    try:
+        return pd.read_excel(file_path, engine=engine, **kwargs)
+    except ValueError as e:
+        # pandas < 2.2 不支持 calamine 引擎，回退到 openpyxl
+        if engine != "calamine" or "Unknown engine" not in str(e):
+            raise
+        return pd.read_excel(file_path, engine="openpyxl", **kwargs)
+
+
+def _columnar_names(path, fmt):
+    """只读取列式文件的 schema，获得列名 (不读取数据)"""
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_schema(path).names
+    import pyarrow.ipc as ipc
+    with ipc.open_file(path) as reader:
+        return reader.schema.names
+
+
+def read_columns(file_path):
+    """
+    只读取表头，获得列名 (列式文件读取 schema，xlsx 只解析第一行)
+
+    Args:
+        file_path (str): xlsx 路径 (或直接给出列式文件路径)
+
+    Returns:
+        list: 列名列表
+    """
+    found = find_columnar(file_path)
+    if found is not None:
+        return list(_columnar_names(*found))
+
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        header = next(wb.worksheets[0].iter_rows(max_row=1, values_only=True), ())
+    finally:
+        wb.close()
+    return [name for name in header if name is not None]
+
+
+def read_table(file_path, columns=None, engine=None, **kwargs):
+    """
+    读取评测结果表，优先使用列式文件
+
+    Args:
+        file_path (str): xlsx 路径 (或直接给出列式文件路径)
+        columns (list | None): 只读取这些列，不存在的列会被忽略；None 表示读取全部列
+        engine (str | None): 读取 xlsx 时使用的引擎，见 resolve_excel_engine
+        **kwargs: 读取 xlsx 时透传给 pd.read_excel 的参数
+
+    Returns:
+        pd.DataFrame: 读取结果
+    """
+    found = find_columnar(file_path)
+    if found is not None:
+        path, fmt = found
+        if columns is not None:
+            names = _columnar_names(path, fmt)
+            columns = [c for c in names if c in set(columns)]
+        if fmt == "parquet":
+            return pd.read_parquet(path, columns=columns)
+        return pd.read_feather(path, columns=columns)
+    return read_excel(file_path, columns=columns, engine=engine, **kwargs)
+
+
+__all__ = [
+    'COLUMNAR_FORMATS',
+    'OUTPUT_FORMATS',
+    'DEFAULT_OUTPUT_FORMATS',
+    'normalize_output_formats',
+    'columnar_path',
+    'output_paths',
+    'to_columnar_frame',
+    'write_table',
+    'find_columnar',
+    'EXCEL_ENGINE_ENV',
+    'resolve_excel_engine',
+    'read_excel',
+    'read_columns',
+    'read_table',
+]
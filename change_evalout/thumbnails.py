@@ -0,0 +1,244 @@
+import os
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import table_io
+import path_prefix
+from change_module import file_sha256
+
+# ===========================
+#      缩略图缓存配置
+# ===========================
+# 缓存目录可通过环境变量覆盖
+THUMB_CACHE_ENV = "VLM_THUMB_CACHE_DIR"
+DEFAULT_THUMB_CACHE_DIR = '/mnt/lustre/houbingxi/1212_moe_eval_badcase/thumb_cache'
+
+# 清单文件: {原图路径: {"size", "mtime", "sha256", "thumb", "max_size", "format"}}
+THUMB_MANIFEST_FILENAME = "manifest.json"
+
+# 缩略图长边像素上限与格式
+DEFAULT_MAX_SIZE = 768
+DEFAULT_FORMAT = "webp"
+DEFAULT_QUALITY = 80
+
+# 格式 -> (PIL 保存格式, 扩展名)
+THUMB_FORMATS = {
+    "webp": ("WEBP", ".webp"),
+    "jpeg": ("JPEG", ".jpg"),
+}
+
+
+def get_cache_dir(cache_dir=None):
+    """获取缩略图缓存目录：参数 > 环境变量 > 默认目录"""
+    return cache_dir or os.environ.get(THUMB_CACHE_ENV) or DEFAULT_THUMB_CACHE_DIR
+
+
+def thumb_relpath(sha256, max_size, fmt):
+    """
+    缩略图在缓存目录中的相对路径 (按内容寻址)
+
+    相同内容的图片 (例如不同数据集中重复的图片) 只会生成一份缩略图。
+    """
+    return os.path.join(sha256[:2], f"{sha256}_{max_size}{THUMB_FORMATS[fmt][1]}")
+
+
+def load_thumb_manifest(cache_dir=None):
+    """
+    读取缩略图清单
+
+    Returns:
+        dict: {原图路径: 清单条目}，清单不存在或损坏时返回空字典
+    """
+    manifest_path = os.path.join(get_cache_dir(cache_dir), THUMB_MANIFEST_FILENAME)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f).get("images", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_thumb_manifest(cache_dir, entries):
+    """原子地写入缩略图清单"""
+    manifest_path = os.path.join(cache_dir, THUMB_MANIFEST_FILENAME)
+    tmp_path = f"{manifest_path}.tmp.{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"images": entries}, f, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+
+
+# ===========================
+#      缩略图生成
+# ===========================
+def collect_image_paths(file_path):
+    """
+    收集转换后的结果文件中引用的全部图片路径 (去重，保持出现顺序)
+
+    Args:
+        file_path (str): 转换后的 xlsx / parquet / arrow 文件
+
+    Returns:
+        list: 图片路径列表
+    """
+    df = table_io.read_table(file_path, columns=["image_path"])
+    if "image_path" not in df.columns:
+        return []
+    paths = {}
+    for items in path_prefix.split_image_paths(df["image_path"]):
+        for p in items:
+            if p and p.lower() != 'nan':
+                paths[p] = None
+    return list(paths)
+
+
+def _make_thumbnail(src, cache_dir, max_size, fmt, quality):
+    """
+    生成单张缩略图 (在子进程中执行)
+
+    Returns:
+        tuple: (原图路径, 清单条目或 None, 错误信息或 None)
+    """
+    try:
+        stat = os.stat(src)
+        sha256 = file_sha256(src)
+        rel = thumb_relpath(sha256, max_size, fmt)
+        dst = os.path.join(cache_dir, rel)
+
+        if not os.path.exists(dst):
+            from PIL import Image
+
+            with Image.open(src) as img:
+                # JPEG 解码时直接按目标尺寸降采样，大图省去大部分解码开销
+                img.draft("RGB", (max_size, max_size))
+                img.thumbnail((max_size, max_size))
+                has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+                mode = "RGBA" if has_alpha and fmt == "webp" else "RGB"
+                if img.mode != mode:
+                    img = img.convert(mode)
+
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                tmp_path = f"{dst}.tmp.{os.getpid()}"
+                img.save(tmp_path, format=THUMB_FORMATS[fmt][0], quality=quality)
+            os.replace(tmp_path, dst)
+
+        entry = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "sha256": sha256,
+            "thumb": rel,
+            "max_size": max_size,
+            "format": fmt,
+        }
+        return src, entry, None
+    except Exception as e:
+        return src, None, str(e)
+
+
+def _is_thumb_valid(entry, src, cache_dir, max_size, fmt):
+    """原图大小、修改时间、缩略图参数都没变且缩略图文件存在时视为有效"""
+    if not entry or entry.get("max_size") != max_size or entry.get("format") != fmt:
+        return False
+    try:
+        stat = os.stat(src)
+    except OSError:
+        return False
+    if entry.get("size") != stat.st_size or entry.get("mtime") != stat.st_mtime:
+        return False
+    return os.path.exists(os.path.join(cache_dir, entry["thumb"]))
+
+
+def build_thumbnails(file_paths, cache_dir=None, max_size=DEFAULT_MAX_SIZE, fmt=DEFAULT_FORMAT,
+                     quality=DEFAULT_QUALITY, max_workers=None, force=False):
+    """
+    为结果文件中引用的图片批量生成缩略图
+
+    Args:
+        file_paths (list): 转换后的结果文件路径
+        cache_dir (str, optional): 缓存目录，见 get_cache_dir
+        max_size (int): 缩略图长边像素上限
+        fmt (str): 缩略图格式，webp / jpeg
+        quality (int): 压缩质量
+        max_workers (int, optional): 并行进程数，None 表示使用全部 CPU
+        force (bool): 为 True 时忽略清单，全部重新检查生成
+
+    Returns:
+        dict: 统计结果 {"total", "up_to_date", "built", "failed", "errors": {路径: 错误信息}}
+    """
+    if fmt not in THUMB_FORMATS:
+        raise ValueError(f"不支持的缩略图格式: {fmt}，可选: {list(THUMB_FORMATS)}")
+    cache_dir = get_cache_dir(cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    images = {}
+    for file_path in file_paths:
+        for p in collect_image_paths(file_path):
+            images[p] = None
+    print(f"共找到 {len(images)} 张图片")
+
+    manifest = load_thumb_manifest(cache_dir)
+    pending = [
+        src for src in images
+        if force or not _is_thumb_valid(manifest.get(src), src, cache_dir, max_size, fmt)
+    ]
+    stats = {"total": len(images), "up_to_date": len(images) - len(pending), "built": 0, "failed": 0, "errors": {}}
+    print(f"需要生成 {len(pending)} 张，已是最新 {stats['up_to_date']} 张")
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_make_thumbnail, src, cache_dir, max_size, fmt, quality) for src in pending]
+        for done, future in enumerate(as_completed(futures), 1):
+            src, entry, error = future.result()
+            if entry is None:
+                manifest.pop(src, None)
+                stats["failed"] += 1
+                stats["errors"][src] = error
+            else:
+                manifest[src] = entry
+                stats["built"] += 1
+            if done % 1000 == 0:
+                print(f"  - 已处理 {done} / {len(pending)}")
+
+    save_thumb_manifest(cache_dir, manifest)
+    print(f"完成: 生成 {stats['built']} 张，失败 {stats['failed']} 张")
+    return stats
+
+
+def list_result_files(folder):
+    """列出目录中的结果文件：xlsx，以及没有同名 xlsx 的列式文件"""
+    names = sorted(os.listdir(folder))
+    stems = {os.path.splitext(n)[0] for n in names if n.endswith('.xlsx')}
+    files = []
+    for name in names:
+        stem, ext = os.path.splitext(name)
+        if ext == '.xlsx' or (ext in table_io.COLUMNAR_FORMATS.values() and stem not in stems):
+            files.append(os.path.join(folder, name))
+    return files
+
+
+__all__ = [
+    'THUMB_CACHE_ENV',
+    'DEFAULT_THUMB_CACHE_DIR',
+    'THUMB_MANIFEST_FILENAME',
+    'get_cache_dir',
+    'load_thumb_manifest',
+    'collect_image_paths',
+    'build_thumbnails',
+    'list_result_files',
+]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="为转换后的评测结果文件离线生成图片缩略图")
+    parser.add_argument("paths", nargs="+", help="转换后的结果文件，或包含结果文件的目录 (如 *_for_check)")
+    parser.add_argument("--cache-dir", default=None, help=f"缩略图缓存目录，默认读取 {THUMB_CACHE_ENV} 或 {DEFAULT_THUMB_CACHE_DIR}")
+    parser.add_argument("--max-size", type=int, default=DEFAULT_MAX_SIZE, help="缩略图长边像素上限")
+    parser.add_argument("--format", dest="fmt", choices=list(THUMB_FORMATS), default=DEFAULT_FORMAT, help="缩略图格式")
+    parser.add_argument("--quality", type=int, default=DEFAULT_QUALITY, help="压缩质量")
+    parser.add_argument("--workers", type=int, default=None, help="并行进程数，默认使用全部 CPU")
+    parser.add_argument("--force", action="store_true", help="忽略清单，全部重新检查生成")
+    args = parser.parse_args()
+
+    result_files = []
+    for path in args.paths:
+        result_files.extend(list_result_files(path) if os.path.isdir(path) else [path])
+
+    build_thumbnails(result_files, args.cache_dir, args.max_size, args.fmt, args.quality, args.workers, args.force)
+    print("所有缩略图处理完毕！")
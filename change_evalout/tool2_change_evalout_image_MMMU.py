@@ -1,47 +1,37 @@
 import pandas as pd
 import os
-import ast  # 用于安全地评估字符串形式的列表
+import table_io
+import path_prefix  # 向量化的图片路径前缀引擎 (支持列表形式的多图路径)
 
-def add_prefix_to_xlsx(input_file, output_file, prefix_path):
+def add_prefix_to_df(df, prefix_path):
+    """在内存中为 image_path 添加前缀 (add_prefix_to_xlsx 与查看器的虚拟模式共用)"""
+    # 整列向量化处理：字符串操作区分列表/单路径，只解析真正的列表行
+    df['image_path'] = path_prefix.prefix_image_paths(df['image_path'], prefix_path)
+    return df
+
+def add_prefix_to_xlsx(input_file, output_file, prefix_path, output_formats=None):
     try:
         # 读取 Excel 文件，指定dtype为object以保持原始数据类型
         print(f"正在读取文件: {input_file}")
-        df = pd.read_excel(input_file, dtype={'image_path': object})
+        df = table_io.read_excel(input_file, dtype={'image_path': object})
 
         # 检查是否存在 image_path 列
         if 'image_path' not in df.columns:
             print("错误: 文件中没找到 'image_path' 这一列。")
-            return
+            return False
 
         # 处理路径拼接
-        def process_path(x):
-            if pd.isna(x):
-                return x
-            
-            # 如果是字符串形式的列表，先转换为列表
-            if isinstance(x, str):
-                try:
-                    x = ast.literal_eval(x)
-                except:
-                    # 如果转换失败，说明是普通字符串
-                    return f"{prefix_path}/{str(x).lstrip('/')}"
-            
-            # 如果是列表类型
-            if isinstance(x, list):
-                return [f"{prefix_path}/{str(item).lstrip('/')}" for item in x]
-            
-            # 如果是单个路径
-            return f"{prefix_path}/{str(x).lstrip('/')}"
-
-        df['image_path'] = df['image_path'].apply(process_path)
+        df = add_prefix_to_df(df, prefix_path)
 
-        # 保存为新文件，不包含索引
+        # 保存为新文件 (xlsx / parquet / arrow)，不包含索引
         print(f"正在保存文件到: {output_file}")
-        df.to_excel(output_file, index=False)
+        table_io.write_table(df, output_file, output_formats)
         print("处理完成！")
+        return True
 
     except Exception as e:
         print(f"发生错误: {e}")
+        return False
 
 if __name__ == "__main__":
     input_xlsx = '/mnt/lustre/houbingxi/1212_moe_eval_badcase/taichu_vl_moe_lora_251210_s2400/taichu_vl_moe/taichu_vl_moe_MMMU_DEV_VAL_openai_result.xlsx'
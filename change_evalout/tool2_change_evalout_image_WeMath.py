@@ -1,22 +1,32 @@
 import pandas as pd
 import os
+import table_io
+import path_prefix
 
-def add_prefix_to_xlsx(input_file, output_file,prefix_path):
+def add_prefix_to_df(df, prefix_path):
+    """在内存中为 image_path 添加前缀 (add_prefix_to_xlsx 与查看器的虚拟模式共用)"""
+    # 图片按 index 命名，使用路径引擎整列生成
+    df['image_path'] = path_prefix.build_index_paths(df['index'], prefix_path)
+    return df
+
+def add_prefix_to_xlsx(input_file, output_file, prefix_path, output_formats=None):
     # 定义要添加的前缀路径
 
     try:
         # 读取 Excel 文件
         print(f"正在读取文件: {input_file}")
-        df = pd.read_excel(input_file)
-        df['image_path'] = prefix_path + df['index'].astype(str) + '.png'
+        df = table_io.read_excel(input_file)
+        df = add_prefix_to_df(df, prefix_path)
 
-        # 保存为新文件，不包含索引
+        # 保存为新文件 (xlsx / parquet / arrow)，不包含索引
         print(f"正在保存文件到: {output_file}")
-        df.to_excel(output_file, index=False)
+        table_io.write_table(df, output_file, output_formats)
         print("处理完成！")
+        return True
 
     except Exception as e:
         print(f"发生错误: {e}")
+        return False
 
 if __name__ == "__main__":
     input_xlsx = '/mnt/lustre/houbingxi/1212_moe_eval_badcase/taichu_vl_moe_lora_251210_s2400/taichu_vl_moe/taichu_vl_moe_WeMath_gpt4o-mini.xlsx'       # 你的输入文件名
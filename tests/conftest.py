@@ -0,0 +1,12 @@
+import os
+import sys
+
+# ===========================
+#      测试路径配置
+# ===========================
+# 与 case_viewer/main.py、benchmarks 相同，把项目根目录、change_evalout 与 case_viewer 加入 sys.path，
+# 使模块内部的 sibling import 可以正常工作。用法 (在仓库根目录执行): python -m pytest -q tests
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _path in (project_root, os.path.join(project_root, "change_evalout"), os.path.join(project_root, "case_viewer")):
+    if os.path.exists(_path) and _path not in sys.path:
+        sys.path.append(_path)
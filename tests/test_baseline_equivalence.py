@@ -0,0 +1,255 @@
+import ast
+import random
+import pandas as pd
+import pytest
+from change_evalout import hit_rules
+from change_evalout import path_prefix
+from change_evalout import table_io
+import scoring
+import search_utils
+
+# ===========================
+#      与原实现的等价性
+# ===========================
+# 向量化 / 批量实现替换了原先逐行的 ast.literal_eval、DataFrame.apply 与 pd.read_excel，
+# 这里用原实现 (从原始版本中原样保留) 对随机生成的数据逐行对照，保证结果完全一致。
+
+PREFIX = "/data/LMUData/MMMU_DEV_VAL/"
+
+
+def baseline_process_path(x, prefix_path=PREFIX):
+    """原 tool2_change_evalout_image_MMMU.add_prefix_to_xlsx 中的 process_path"""
+    if pd.isna(x):
+        return x
+    if isinstance(x, str):
+        try:
+            x = ast.literal_eval(x)
+        except:
+            return f"{prefix_path}/{str(x).lstrip('/')}"
+    if isinstance(x, list):
+        return [f"{prefix_path}/{str(item).lstrip('/')}" for item in x]
+    return f"{prefix_path}/{str(x).lstrip('/')}"
+
+
+def baseline_check_hit(answer, prediction):
+    """原 tool3_show_DocVQA.load_data 中的 check_hit"""
+    try:
+        answer_list = ast.literal_eval(answer)
+        if isinstance(answer_list, list):
+            return prediction.lower() in [str(x).lower() for x in answer_list]
+    except:
+        pass
+    return answer.lower() == prediction.lower()
+
+
+def _random_path(rng):
+    name = rng.choice(["1.jpg", "a b.png", "img_03.jpeg", "0001.jpg", "x(1).png", "中文.jpg", "True", "None1.jpg"])
+    return rng.choice(["", "/", "//", "images/", "./", "a/b/"]) + name
+
+
+def _random_image_path(rng):
+    """覆盖原逻辑的各个分支：普通路径、列表字符串、带引号的标量、元组、数字、空值等"""
+    p = _random_path(rng)
+    q = rng.choice(["'", '"'])
+    items = [_random_path(rng) for _ in range(rng.randint(0, 3))]
+    return rng.choice([
+        p,
+        f"{q}{p}{q}",
+        "[" + ", ".join(f"{q}{i}{q}" for i in items) + "]",
+        "[" + ",".join(f"'{i}'" for i in items) + ",]",
+        "(" + ", ".join(f"'{i}'" for i in items) + ",)",
+        f"  ['{p}']  ",
+        f"\t'{p}'",
+        f"['{p}'] # note",
+        f"['{p}'",
+        f"[\"{p}\\\\x\"]",
+        "[true]",
+        "[null, 1]",
+        "[1.50, -2]",
+        "1.50",
+        "-7",
+        "1e3",
+        "...",
+        f"b'{p}'",
+        f"r'{p}'",
+        "True",
+        "None",
+        "{'a': 1}",
+        float("nan"),
+        None,
+        rng.randint(0, 1000),
+        rng.random(),
+    ])
+
+
+def _assert_same_paths(actual, expected):
+    assert len(actual) == len(expected)
+    for a, e in zip(actual, expected):
+        if not isinstance(e, list) and pd.isna(e):
+            assert not isinstance(a, list) and pd.isna(a)
+        else:
+            assert a == e
+
+
+def test_prefix_image_paths_matches_baseline():
+    rng = random.Random(0)
+    values = [_random_image_path(rng) for _ in range(5000)]
+    series = pd.Series(values, dtype=object)
+
+    actual = path_prefix.prefix_image_paths(series, PREFIX).tolist()
+    expected = [baseline_process_path(v) for v in values]
+    _assert_same_paths(actual, expected)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("'q.jpg'", PREFIX + "/q.jpg"),
+    ("('a.jpg', 'b.jpg')", PREFIX + "/('a.jpg', 'b.jpg')"),
+    ("['/a.jpg', 'b.jpg']", [PREFIX + "/a.jpg", PREFIX + "/b.jpg"]),
+    ("[true]", PREFIX + "/[true]"),
+    ("images/1.jpg", PREFIX + "/images/1.jpg"),
+])
+def test_prefix_image_paths_literal_forms(text, expected):
+    assert path_prefix.prefix_image_paths(pd.Series([text], dtype=object), PREFIX).iloc[0] == expected
+
+
+def test_split_image_paths_agrees_with_prefix():
+    """查看器拆分多图与转换加前缀对列表形式字符串的判断一致 (如 "[true]" 两边都按普通路径处理)"""
+    rng = random.Random(1)
+    values = [_random_image_path(rng) for _ in range(5000)] + ["[true]", '["a.jpg", null]', '["a.jpg"]']
+    series = pd.Series(values, dtype=object)
+    series = series[path_prefix.list_literal_mask(series)]
+
+    prefixed = path_prefix.prefix_image_paths(series, PREFIX)
+    split = path_prefix.split_image_paths(series)
+    for text, prefixed_value, items in zip(series, prefixed, split):
+        if isinstance(prefixed_value, list):
+            assert prefixed_value == [f"{PREFIX}/{p.lstrip('/')}" for p in items], text
+        else:
+            assert items == [text.strip()], text
+
+
+def test_parse_index_query_single_index_matches_baseline():
+    """单个 index 的查询结果与原来的 df[df['index'] == search_str] 相同"""
+    rng = random.Random(1)
+    index = [rng.choice(["", "a", "MMMU_", "q-"]) + str(rng.randint(0, 300)) for _ in range(2000)]
+    df = pd.DataFrame({"index": index, "row": range(len(index))})
+    index_map = search_utils.build_index_map(df["index"])
+
+    for query in ["12", " 12 ", "a7", "MMMU_250", "q-3", "missing"]:
+        search_str = str(query).strip()
+        expected = df[df["index"] == search_str]
+        actual, not_found = search_utils.lookup_indices(df, index_map, search_utils.parse_index_query(query))
+        pd.testing.assert_frame_equal(actual, expected)
+        assert not_found == ([] if len(expected) else [search_str])
+
+
+def _random_answer_prediction(rng):
+    words = ["Yes", "yes ", "no", "Hello  World", "hello world", "42", " 42", "3.0"]
+    answer = rng.choice([
+        rng.choice(words),
+        str([rng.choice(words) for _ in range(rng.randint(0, 3))]),
+        "[" + rng.choice(words),
+        "(" + repr(rng.choice(words)) + ",)",
+        "[1, 2.0]",
+        "nan",
+        "[]",
+        "[None]",
+    ])
+    return answer, rng.choice(words + ["nan", "1", "2.0", "None"])
+
+
+def test_list_hit_matches_baseline_check_hit():
+    rng = random.Random(2)
+    rows = [_random_answer_prediction(rng) for _ in range(3000)]
+    answers = pd.Series([a for a, _ in rows]).astype(str).str.strip()
+    predictions = pd.Series([p for _, p in rows]).astype(str).str.strip()
+
+    expected = [baseline_check_hit(a, p) for a, p in zip(answers, predictions)]
+    assert hit_rules.fallback_hit("DocVQA", answers, predictions).tolist() == expected
+
+
+def test_string_hit_matches_baseline_chartqa():
+    rng = random.Random(3)
+    rows = [_random_answer_prediction(rng) for _ in range(3000)]
+    answers = pd.Series([a for a, _ in rows]).astype(str).str.strip()
+    predictions = pd.Series([p for _, p in rows]).astype(str).str.strip()
+
+    expected = (answers.str.lower() == predictions.str.lower()).tolist()
+    assert hit_rules.fallback_hit("ChartQA", answers, predictions).tolist() == expected
+
+
+def _reference_anls(answer, prediction, threshold=scoring.ANLS_THRESHOLD):
+    """逐行的 ANLS 参考实现 (标准定义)"""
+    def norm(text):
+        return " ".join(str(text).lower().split())
+
+    def levenshtein(a, b):
+        prev = list(range(len(b) + 1))
+        for i, ca in enumerate(a, 1):
+            cur = [i]
+            for j, cb in enumerate(b, 1):
+                cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+            prev = cur
+        return prev[-1]
+
+    candidates = [norm(answer)]
+    text = answer.strip()
+    if text.startswith("[") and text.endswith("]"):
+        try:
+            items = ast.literal_eval(text)
+        except (ValueError, SyntaxError):
+            items = None
+        if isinstance(items, list) and items:
+            candidates = [norm(x) for x in items]
+
+    pred = norm(prediction)
+    best = 0.0
+    for cand in candidates:
+        longest = max(len(cand), len(pred))
+        dist = levenshtein(cand, pred) / longest if longest else 0.0
+        if dist < threshold:
+            best = max(best, 1.0 - dist)
+    return round(best, 4)
+
+
+def test_anls_matches_reference():
+    rng = random.Random(4)
+    rows = [_random_answer_prediction(rng) for _ in range(2000)]
+    answers = pd.Series([a for a, _ in rows])
+    predictions = pd.Series([p for _, p in rows])
+
+    actual = scoring.anls(scoring.parse_answer_lists(answers), predictions).tolist()
+    expected = [_reference_anls(a, p) for a, p in zip(answers, predictions)]
+    assert actual == pytest.approx(expected, abs=1e-4)
+
+
+@pytest.fixture
+def na_workbook(tmp_path):
+    """包含 pandas 默认空值字符串、Excel 错误值、重复 / 空白表头、整数浮点数与末尾空行的 xlsx"""
+    from openpyxl import Workbook
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["index", "answer", "answer", None, "prediction", "hit", None])
+    rows = [
+        [1, "NA", "ok", "x", "#N/A", 1.0],
+        [2, "null", "", None, "nan", 0],
+        [3, "N/A", "None", "y", "n/a", 1],
+        [4, "#DIV/0!", "-NaN", 5.0, "text", None],
+        [5, "", "NULL", "z", "<NA>", 2.5],
+        # 只有表头之外的列有数据：整行读取时多出 "Unnamed: 6" 列，按列读取时保留为空行
+        [None, None, None, None, None, None, "tail"],
+    ]
+    for row in rows:
+        ws.append(row)
+    ws.append([])
+    ws["A9"].number_format = "0.00"
+    path = tmp_path / "na.xlsx"
+    wb.save(path)
+    return str(path)
+
+
+@pytest.mark.parametrize("columns", [None, ["index", "answer", "prediction", "hit"]])
+def test_stream_reader_matches_read_excel(na_workbook, columns):
+    expected = pd.read_excel(na_workbook, engine="openpyxl", usecols=columns)
+    actual = table_io.read_excel(na_workbook, columns=columns, engine="openpyxl_stream")
+    pd.testing.assert_frame_equal(actual, expected)
@@ -0,0 +1,160 @@
+import os
+import json
+import sqlite3
+import pandas as pd
+import pytest
+from change_evalout import case_store
+
+# ===========================
+#      SQLite 案例库
+# ===========================
+# 在临时 SQLite 文件上检查导入 (upsert)、导入记录、分页查询与旧版表结构的迁移。
+
+RUN = "m1"
+MMMU_FILE = f"{RUN}_MMMU_DEV_VAL_openai_result.xlsx"
+DOCVQA_FILE = f"{RUN}_DocVQA_VAL_result.xlsx"
+
+
+def _mmmu_frame(predictions=None):
+    n = 25
+    return pd.DataFrame({
+        "index": range(n),
+        "question": [f"Question {i} about a cat" if i % 5 == 0 else f"Question {i}" for i in range(n)],
+        "answer": ["A"] * n,
+        "image_path": [f"/img/{i}.jpg" for i in range(n)],
+        "prediction": predictions or [("A" if i % 2 == 0 else "B") for i in range(n)],
+        "hit": [int(i % 2 == 0) for i in range(n)],
+        "A": ["opt a"] * n,
+        "category": ["math"] * n,
+        "log": [f"log {i}" for i in range(n)],
+    })
+
+
+@pytest.fixture
+def folder(tmp_path):
+    path = tmp_path / f"{RUN}_for_check"
+    path.mkdir()
+    _mmmu_frame().to_excel(path / MMMU_FILE, index=False)
+    pd.DataFrame({
+        "index": [1, 2, 3],
+        "question": ["q1", "q2", "q3"],
+        "answer": ["['Paris', 'paris city']", "42", "no"],
+        "image_path": ["a.jpg", "b.jpg", "c.jpg"],
+        "prediction": ["PARIS", "41", "No"],
+    }).to_excel(path / DOCVQA_FILE, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = case_store.connect(str(tmp_path / "store.sqlite"))
+    yield conn
+    conn.close()
+
+
+def test_ingest_run_and_query(conn, folder):
+    results = case_store.ingest_run(conn, folder)
+    assert results[MMMU_FILE] == {"status": "success", "error": None, "rows": 25}
+    assert results[DOCVQA_FILE]["rows"] == 3
+    assert all(r["status"] == "skipped" for name, r in results.items() if name not in (MMMU_FILE, DOCVQA_FILE))
+
+    assert case_store.list_runs(conn) == [RUN]
+    assert case_store.list_datasets(conn, RUN) == ["DocVQA", "MMMU"]
+
+    df, total = case_store.query_cases(conn, RUN, "MMMU", limit=100)
+    assert total == 25
+    row = df.iloc[0]
+    assert (row["index"], row["question"], row["prediction"], row["hit"]) == ("0", "Question 0 about a cat", "A", 1)
+    assert json.loads(row["extra"]) == {"A": "opt a", "category": "math"}
+    assert json.loads(row["run_extra"]) == {"log": "log 0"}
+
+    # DocVQA 没有 hit 列，按 hit_rules 的规则计算
+    df, _ = case_store.query_cases(conn, RUN, "DocVQA")
+    assert df["hit"].tolist() == [1, 0, 1]
+
+
+def test_reingest_upserts(conn, folder):
+    case_store.ingest_run(conn, folder)
+    changed = _mmmu_frame(predictions=["B"] * 25)
+    changed["question"] = "new question"
+    changed.drop(columns=["A", "category"]).to_excel(os.path.join(folder, MMMU_FILE), index=False)
+    os.utime(os.path.join(folder, MMMU_FILE), (1, 1))
+
+    assert case_store.ingest_run(conn, folder)[MMMU_FILE]["status"] == "success"
+    df, total = case_store.query_cases(conn, RUN, "MMMU", limit=100)
+    assert total == 25
+    assert set(df["question"]) == {"new question"}
+    assert set(df["prediction"]) == {"B"}
+    # 新文件没有 cases.extra 中的列时保留已有的值
+    assert json.loads(df["extra"].iloc[0]) == {"A": "opt a", "category": "math"}
+    assert conn.execute("SELECT COUNT(*) FROM cases").fetchone()[0] == 28
+    assert conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0] == 28
+
+
+def test_second_run_shares_cases(conn, folder, tmp_path):
+    case_store.ingest_run(conn, folder)
+    other = tmp_path / "m2_for_check"
+    other.mkdir()
+    _mmmu_frame(predictions=["C"] * 25).to_excel(other / "m2_MMMU_DEV_VAL_openai_result.xlsx", index=False)
+    case_store.ingest_run(conn, str(other))
+
+    assert conn.execute("SELECT COUNT(*) FROM cases").fetchone()[0] == 28
+    assert set(case_store.query_cases(conn, "m2", "MMMU", limit=100)[0]["prediction"]) == {"C"}
+    assert set(case_store.query_cases(conn, RUN, "MMMU", limit=100)[0]["prediction"]) == {"A", "B"}
+
+
+def test_unchanged_files_are_skipped_unless_forced(conn, folder):
+    case_store.ingest_run(conn, folder)
+    results = case_store.ingest_run(conn, folder)
+    assert results[MMMU_FILE]["status"] == "up_to_date"
+    assert results[DOCVQA_FILE]["status"] == "up_to_date"
+
+    results = case_store.ingest_run(conn, folder, force=True)
+    assert results[MMMU_FILE] == {"status": "success", "error": None, "rows": 25}
+
+
+def test_query_pagination(conn, folder):
+    case_store.ingest_run(conn, folder)
+    pages = [case_store.query_cases(conn, RUN, "MMMU", limit=10, offset=offset) for offset in (0, 10, 20)]
+    assert [total for _, total in pages] == [25, 25, 25]
+    assert [len(df) for df, _ in pages] == [10, 10, 5]
+    assert sum((df["index"].tolist() for df, _ in pages), []) == [str(i) for i in range(25)]
+
+
+def test_query_filters(conn, folder):
+    case_store.ingest_run(conn, folder)
+
+    df, total = case_store.query_cases(conn, RUN, "MMMU", hit=[0], limit=100)
+    assert total == 12 and set(df["hit"]) == {0}
+
+    df, total = case_store.query_cases(conn, RUN, "MMMU", indices=["3", "7", "99"])
+    assert total == 2 and df["index"].tolist() == ["3", "7"]
+
+    df, total = case_store.query_cases(conn, RUN, "MMMU", text="CAT", limit=100)
+    assert df["index"].tolist() == ["0", "5", "10", "15", "20"] and total == 5
+
+    df, total = case_store.query_cases(conn, RUN, "MMMU", hit=[1], text="cat", limit=100)
+    assert df["index"].tolist() == ["0", "10", "20"] and total == 3
+
+
+def test_old_schema_is_migrated(tmp_path, folder):
+    db_path = str(tmp_path / "old.sqlite")
+    old = sqlite3.connect(db_path)
+    old.executescript(case_store.SCHEMA.replace("    extract     TEXT,\n    extra       TEXT,\n", "    extract     TEXT,\n"))
+    assert not case_store._has_column(old, "predictions", "extra")
+    old.close()
+
+    # 只读连接不修改表结构，查询时 run_extra 为空
+    readonly = case_store.connect(db_path, readonly=True)
+    df, total = case_store.query_cases(readonly, RUN, "MMMU")
+    assert total == 0 and "run_extra" in df.columns
+    readonly.close()
+
+    conn = case_store.connect(db_path)
+    try:
+        assert case_store._has_column(conn, "predictions", "extra")
+        case_store.ingest_run(conn, folder)
+        df, _ = case_store.query_cases(conn, RUN, "MMMU")
+        assert json.loads(df["run_extra"].iloc[0]) == {"log": "log 0"}
+    finally:
+        conn.close()
@@ -0,0 +1,128 @@
+import os
+import json
+import time
+import pandas as pd
+import pytest
+from change_evalout import change_module
+
+# ===========================
+#      增量转换清单 (manifest)
+# ===========================
+# process_xlsx_files 对照输出目录中的清单，只重新转换缺失或过期的文件。
+
+FILENAME = "m_MMMU_DEV_VAL_openai_result.xlsx"
+FILE_CONFIG = {FILENAME: {"module": "tool2_change_evalout_image_MMMU", "folder": "MMMU_DEV_VAL"}}
+
+
+def _write_source(path, image_paths, column="image_path"):
+    pd.DataFrame({"index": range(len(image_paths)), column: image_paths}).to_excel(path, index=False)
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    input_dir = tmp_path / "raw"
+    output_dir = tmp_path / "for_check"
+    input_dir.mkdir()
+    _write_source(input_dir / FILENAME, ["a.jpg", "b.jpg"])
+    return str(input_dir), str(output_dir)
+
+
+def _run(dirs, **kwargs):
+    input_dir, output_dir = dirs
+    results = change_module.process_xlsx_files(input_dir, output_dir, "/data", FILE_CONFIG, max_workers=1, **kwargs)
+    return results[FILENAME]["status"]
+
+
+def _rewrite_keeping_mtime(path, transform):
+    """改写文件内容但保持大小与修改时间不变"""
+    stat = os.stat(path)
+    with open(path, "rb") as f:
+        data = f.read()
+    new_data = transform(data)
+    assert len(new_data) == len(data) and new_data != data
+    time.sleep(0.05)  # 保证 ctime 前进 (部分文件系统的时间戳精度较粗)
+    with open(path, "wb") as f:
+        f.write(new_data)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+def test_manifest_records_source_and_config(dirs):
+    assert _run(dirs) == "success"
+    input_dir, output_dir = dirs
+    with open(os.path.join(output_dir, change_module.MANIFEST_FILENAME), encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert manifest["version"] == change_module.CONVERTER_VERSION
+
+    entry = change_module.load_manifest(output_dir)[FILENAME]
+    stat = os.stat(os.path.join(input_dir, FILENAME))
+    assert entry["source"]["size"] == stat.st_size
+    assert entry["source"]["mtime"] == stat.st_mtime
+    assert entry["source"]["sha256"] == change_module.file_sha256(os.path.join(input_dir, FILENAME))
+    assert entry["config"] == {
+        "module": "tool2_change_evalout_image_MMMU",
+        "prefix": "/data/MMMU_DEV_VAL/",
+        "output_formats": ["xlsx"],
+        "version": change_module.CONVERTER_VERSION,
+    }
+    df = pd.read_excel(os.path.join(output_dir, FILENAME))
+    assert df["image_path"].tolist() == ["/data/MMMU_DEV_VAL//a.jpg", "/data/MMMU_DEV_VAL//b.jpg"]
+
+
+def test_unchanged_input_is_skipped(dirs):
+    assert _run(dirs) == "success"
+    assert _run(dirs) == "up_to_date"
+
+
+def test_touched_input_with_same_content_is_skipped(dirs):
+    assert _run(dirs) == "success"
+    path = os.path.join(dirs[0], FILENAME)
+    os.utime(path, (time.time() + 10, time.time() + 10))
+    assert _run(dirs) == "up_to_date"
+    # 哈希确认后记录新的修改时间，下次不再计算哈希
+    assert change_module.load_manifest(dirs[1])[FILENAME]["source"]["mtime"] == os.stat(path).st_mtime
+
+
+def test_content_change_with_same_size_and_mtime_reruns(dirs):
+    assert _run(dirs) == "success"
+    # 模拟被改写后恢复了修改时间的文件：内容变化、大小与修改时间不变
+    _rewrite_keeping_mtime(os.path.join(dirs[0], FILENAME), lambda data: data[:-1] + bytes([data[-1] ^ 1]))
+    assert _run(dirs) == "success"
+    assert _run(dirs) == "up_to_date"
+
+
+def test_missing_output_reruns(dirs):
+    assert _run(dirs) == "success"
+    os.remove(os.path.join(dirs[1], FILENAME))
+    assert _run(dirs) == "success"
+
+
+def test_converter_version_bump_reruns(dirs, monkeypatch):
+    assert _run(dirs) == "success"
+    monkeypatch.setattr(change_module, "CONVERTER_VERSION", change_module.CONVERTER_VERSION + 1)
+    assert _run(dirs) == "success"
+    assert _run(dirs) == "up_to_date"
+
+
+def test_config_change_reruns(dirs):
+    assert _run(dirs) == "success"
+    input_dir, output_dir = dirs
+    results = change_module.process_xlsx_files(input_dir, output_dir, "/other", FILE_CONFIG, max_workers=1)
+    assert results[FILENAME]["status"] == "success"
+
+
+def test_force_reruns(dirs):
+    assert _run(dirs) == "success"
+    assert _run(dirs, force=True) == "success"
+
+
+def test_failed_file_is_retried(dirs):
+    input_dir, output_dir = dirs
+    # 没有 image_path 列时模块返回 False，转换失败
+    _write_source(os.path.join(input_dir, FILENAME), ["a.jpg"], column="path")
+    assert _run(dirs) == "failed"
+    assert FILENAME not in change_module.load_manifest(output_dir)
+    assert _run(dirs) == "failed"
+
+    _write_source(os.path.join(input_dir, FILENAME), ["a.jpg"])
+    assert _run(dirs) == "success"
+    assert _run(dirs) == "up_to_date"
@@ -0,0 +1,57 @@
+import sys
+import types
+import pandas as pd
+import compare_view
+
+# ===========================
+#      checkpoint 对比的连接
+# ===========================
+# 用一个假的查看器模块提供两侧数据，检查按 index 连接后的状态与统计。
+
+RUNS = {
+    "a.xlsx": pd.DataFrame({
+        "index": [1, 2, 3, 4, 5, 5],
+        "question": ["q1", "q2", "q3", "q4", "q5", "q5 dup"],
+        "answer": ["x"] * 6,
+        "image_path": [f"{i}.jpg" for i in range(6)],
+        "prediction": ["p"] * 6,
+        "hit": [1, 1, 0, 0, 1, 0],
+        "res": ["r"] * 6,
+    }),
+    "b.xlsx": pd.DataFrame({
+        "index": [1, 2, 3, 4, 6, 1],
+        "prediction": ["q"] * 6,
+        "hit": ["1", "0", "1", "0", "1", "0"],
+    }),
+}
+
+
+def _viewer(monkeypatch):
+    module = types.ModuleType("fake_compare_viewer")
+    module.load_data = lambda path, path_rewrite, token: (RUNS[path], None) if path in RUNS else (None, "不存在")
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+    return module.__name__
+
+
+def test_join_statuses(monkeypatch):
+    joined, stats, error = compare_view._join_runs(_viewer(monkeypatch), "a.xlsx", "b.xlsx", None, None, None)
+    assert error is None
+    assert joined["index"].tolist() == [1, 2, 3, 4]
+    assert joined["status"].tolist() == [
+        compare_view.STATUS_STABLE_HIT,
+        compare_view.STATUS_IMPROVED,
+        compare_view.STATUS_REGRESSED,
+        compare_view.STATUS_STABLE_MISS,
+    ]
+    assert joined["hit_a"].dtype == bool and joined["hit_b"].dtype == bool
+    # 两侧都没有的列 (res) 不参与连接；重复的 index 只保留第一条
+    assert "res_a" not in joined.columns and joined["prediction_b"].tolist() == ["q"] * 4
+    assert stats["only_a"] == 1 and stats["only_b"] == 1
+    assert stats["counts"] == dict.fromkeys(compare_view.STATUS_OPTIONS, 1)
+    assert (stats["acc_a"], stats["acc_b"]) == (0.5, 0.5)
+
+
+def test_join_reports_load_errors(monkeypatch):
+    viewer = _viewer(monkeypatch)
+    assert compare_view._join_runs(viewer, "missing.xlsx", "b.xlsx", None, None, None)[2].startswith("当前文件")
+    assert compare_view._join_runs(viewer, "a.xlsx", "missing.xlsx", None, None, None)[2].startswith("基线文件")
@@ -0,0 +1,71 @@
+import os
+import json
+import pandas as pd
+import pytest
+import dashboard
+
+# ===========================
+#      准确率总览的统计结果文件
+# ===========================
+# 检查统计结果文件 (sidecar) 的复用，以及 SUMMARY_VERSION 或文件变化时的失效。
+
+FILENAME = "m1_MMMU_DEV_VAL_openai_result.xlsx"
+TASKS = {FILENAME: {"dataset": "MMMU", "required": ["index", "hit"], "path_rewrite": None}}
+
+
+@pytest.fixture
+def folder(tmp_path):
+    pd.DataFrame({"index": [1, 2, 3, 4], "hit": [1, 0, 1, 1]}).to_excel(tmp_path / FILENAME, index=False)
+    return str(tmp_path)
+
+
+def _mark_sidecar(folder):
+    """把统计结果文件中的结果改成一个标记值，用来判断下一次统计是否复用了它"""
+    path = os.path.join(folder, dashboard.SUMMARY_FILENAME)
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    data["files"][FILENAME]["summary"]["rows"] = -1
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def test_summary_is_computed_and_saved(folder):
+    summary = dashboard.summarize_folder(folder, TASKS, max_workers=1)[FILENAME]
+    assert (summary["rows"], summary["hit_rate"], summary["hit_source"]) == (4, 0.75, "hit")
+    assert dashboard.load_sidecar(folder)[FILENAME]["summary"] == summary
+
+
+def test_sidecar_is_reused(folder):
+    dashboard.summarize_folder(folder, TASKS, max_workers=1)
+    _mark_sidecar(folder)
+    assert dashboard.summarize_folder(folder, TASKS, max_workers=1)[FILENAME]["rows"] == -1
+    assert dashboard.summarize_folder(folder, TASKS, max_workers=1, force=True)[FILENAME]["rows"] == 4
+
+
+def test_version_bump_invalidates_sidecar(folder, monkeypatch):
+    dashboard.summarize_folder(folder, TASKS, max_workers=1)
+    _mark_sidecar(folder)
+    monkeypatch.setattr(dashboard, "SUMMARY_VERSION", dashboard.SUMMARY_VERSION + 1)
+    assert dashboard.load_sidecar(folder) == {}
+    assert dashboard.summarize_folder(folder, TASKS, max_workers=1)[FILENAME]["rows"] == 4
+
+
+def test_changed_file_or_params_invalidate_entry(folder):
+    dashboard.summarize_folder(folder, TASKS, max_workers=1)
+    _mark_sidecar(folder)
+    tasks = {FILENAME: dict(TASKS[FILENAME], required=["index", "hit", "question"])}
+    summary = dashboard.summarize_folder(folder, tasks, max_workers=1)[FILENAME]
+    assert summary["rows"] == 4 and summary["missing_cols"] == ["question"]
+
+    _mark_sidecar(folder)
+    pd.DataFrame({"index": [1, 2], "hit": [0, 0]}).to_excel(os.path.join(folder, FILENAME), index=False)
+    os.utime(os.path.join(folder, FILENAME), ns=(1, 1))
+    assert dashboard.summarize_folder(folder, tasks, max_workers=1)[FILENAME]["rows"] == 2
+
+
+def test_missing_file_and_virtual_mode(folder):
+    results = dashboard.summarize_folder(folder, dict(TASKS, **{"absent.xlsx": TASKS[FILENAME]}),
+                                         max_workers=1, use_sidecar=False)
+    assert results["absent.xlsx"] == {"error": "文件不存在"}
+    assert results[FILENAME]["rows"] == 4
+    assert not os.path.exists(os.path.join(folder, dashboard.SUMMARY_FILENAME))
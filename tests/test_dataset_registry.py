@@ -0,0 +1,38 @@
+import os
+import sys
+import subprocess
+from change_evalout import change_module
+import dataset_registry
+
+# ===========================
+#      数据集登记表
+# ===========================
+
+
+def test_every_converted_file_maps_to_a_dataset():
+    found = [
+        dataset_registry.find_dataset(change_module.tool_module_name(config["module"]))
+        for config in change_module.create_file_config().values()
+    ]
+    assert sorted(found) == sorted(dataset_registry.DATASETS)
+
+
+def test_load_cols_cover_required_cols():
+    for name in dataset_registry.DATASETS:
+        assert set(dataset_registry.required_cols(name)) <= set(dataset_registry.load_cols(name))
+
+
+def test_registry_does_not_import_viewers():
+    """总览页读取必要列时不导入查看器模块 (在新进程中检查，不受其它测试已导入的模块影响)"""
+    code = (
+        "import sys, dataset_registry\n"
+        "[dataset_registry.required_cols(name) for name in dataset_registry.DATASETS]\n"
+        "assert not [m for m in sys.modules if m.startswith('tool3_show_') or m == 'streamlit'], sorted(sys.modules)\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=os.path.dirname(dataset_registry.__file__))
+
+
+def test_viewers_read_the_registry():
+    viewer = dataset_registry.get_viewer_module("MMMU")
+    assert viewer.REQUIRED_COLS is dataset_registry.required_cols("MMMU")
+    assert viewer.LOAD_COLS is dataset_registry.load_cols("MMMU")
@@ -0,0 +1,34 @@
+import pandas as pd
+from change_evalout import hit_rules
+import scoring
+
+# ===========================
+#      候选答案只解析一次
+# ===========================
+
+
+def test_answer_lists_parses_only_list_rows():
+    answers = pd.Series(["['a', 'B']", " [1, 2] ", "(1, 2)", "[bad", "plain", "[]"], index=[3, 3, 5, 6, 7, 8])
+    lists = hit_rules.answer_lists(answers)
+    assert lists.index.equals(answers.index)
+    assert lists.tolist() == [["a", "B"], [1, 2], None, None, None, []]
+
+
+def test_list_hit_is_case_insensitive_exact_match():
+    answers = pd.Series(["['Paris', 'paris city']", "42", "[]", "['x ']"])
+    predictions = pd.Series(["PARIS", "42", "[]", "x"])
+    assert hit_rules.list_hit(answers, predictions).tolist() == [True, True, False, False]
+
+
+def test_hit_and_anls_share_one_parse(monkeypatch):
+    answers = pd.Series(["['a', 'b']", "c", "['d']"])
+    predictions = pd.Series(["b", "c", "e"])
+    lists = hit_rules.answer_lists(answers)
+
+    def fail(text):
+        raise AssertionError(f"重复解析: {text}")
+
+    monkeypatch.setattr(hit_rules, "_literal_list", fail)
+    assert hit_rules.fallback_hit("DocVQA", answers, predictions, lists).tolist() == [True, True, False]
+    assert scoring.parse_answer_lists(answers, lists).tolist() == [["a", "b"], ["c"], ["d"]]
+    assert scoring.anls(scoring.parse_answer_lists(answers, lists), predictions).tolist() == [1.0, 1.0, 0.0]
@@ -0,0 +1,43 @@
+import os
+import image_server
+import image_utils
+
+# ===========================
+#      图片 URL 的内容标识
+# ===========================
+
+
+def test_default_host_is_loopback(monkeypatch):
+    monkeypatch.delenv(image_server.IMAGE_SERVER_HOST_ENV, raising=False)
+    monkeypatch.delenv(image_server.IMAGE_BASE_URL_ENV, raising=False)
+    assert image_server.get_host() == "127.0.0.1"
+    assert image_server.get_base_url().startswith("http://127.0.0.1:")
+
+    monkeypatch.setenv(image_server.IMAGE_SERVER_HOST_ENV, "0.0.0.0")
+    assert image_server.get_base_url().startswith(f"http://{image_server.socket.gethostname()}:")
+
+
+def test_url_token_is_cached_per_directory(tmp_path, monkeypatch):
+    img = tmp_path / "a.jpg"
+    img.write_bytes(b"jpeg")
+    calls = []
+    content_token = image_server.content_token
+    monkeypatch.setattr(image_server, "content_token", lambda path: calls.append(path) or content_token(path))
+
+    token = image_utils.url_token(str(img))
+    assert token is not None
+    assert image_utils.url_token(str(img)) == token
+    assert calls == [os.path.abspath(img)]
+    assert image_utils.url_token(str(tmp_path / "missing.jpg")) is None
+
+
+def test_url_token_uses_thumbnail_manifest_sha(tmp_path, monkeypatch):
+    img = str(tmp_path / "b.jpg")
+    sha = "ab" * 32
+    monkeypatch.setattr(image_utils, "_get_thumb_entries", lambda: {img: {"sha256": sha, "thumb": "x"}})
+    monkeypatch.setattr(image_server, "content_token", lambda path: _unexpected_stat(path))
+    assert image_utils.url_token(img) == sha[:32]
+
+
+def _unexpected_stat(path):
+    raise AssertionError(f"不应访问文件: {path}")
@@ -0,0 +1,134 @@
+import os
+import pandas as pd
+import pytest
+import load_cache
+
+# ===========================
+#      磁盘加载缓存
+# ===========================
+# 在临时缓存目录中检查 cached_load 的快照读写、失效与旧快照清理。
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    path = tmp_path / "load_cache"
+    monkeypatch.setenv(load_cache.LOAD_CACHE_ENV, str(path))
+    return path
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / "m1_DocVQA_VAL_result.xlsx"
+    path.write_bytes(b"placeholder")
+    return str(path)
+
+
+class Loader:
+    """记录调用次数的加载函数"""
+
+    def __init__(self, error_msg=None):
+        self.df = None if error_msg else pd.DataFrame({
+            "index": ["1", "2", "3"],
+            "question": ["q1", "q2", "q3"],
+            "prediction": ["a", "b", "c"],
+        })
+        self.error_msg = error_msg
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return (None if self.df is None else self.df.copy()), self.error_msg
+
+
+def test_snapshot_round_trip(cache_dir, data_file):
+    loader = Loader()
+    df, error = load_cache.cached_load(loader, data_file, "DocVQA", {"columns": ["index"]})
+    assert error is None and loader.calls == 1
+    assert len(os.listdir(cache_dir)) == 1
+
+    cached, error = load_cache.cached_load(loader, data_file, "DocVQA", {"columns": ["index"]})
+    assert error is None and loader.calls == 1
+    pd.testing.assert_frame_equal(cached, df)
+
+    # 不同查看器的快照互不共用
+    load_cache.cached_load(loader, data_file, "ChartQA", {"columns": ["index"]})
+    assert loader.calls == 2 and len(os.listdir(cache_dir)) == 2
+
+
+def test_changes_invalidate_and_remove_stale(cache_dir, data_file, monkeypatch):
+    loader = Loader()
+    load_cache.cached_load(loader, data_file, "DocVQA")
+    first = set(os.listdir(cache_dir))
+
+    os.utime(data_file, ns=(1, 1))
+    load_cache.cached_load(loader, data_file, "DocVQA")
+    assert loader.calls == 2
+    second = set(os.listdir(cache_dir))
+    assert len(second) == 1 and second != first
+
+    load_cache.cached_load(loader, data_file, "DocVQA", {"path_rewrite": ["a", "b"]})
+    monkeypatch.setattr(load_cache, "LOADER_VERSION", load_cache.LOADER_VERSION + 1)
+    load_cache.cached_load(loader, data_file, "DocVQA", {"path_rewrite": ["a", "b"]})
+    assert loader.calls == 4 and len(os.listdir(cache_dir)) == 1
+
+
+def test_corrupt_snapshot_is_rebuilt(cache_dir, data_file):
+    loader = Loader()
+    load_cache.cached_load(loader, data_file, "DocVQA")
+    (snapshot,) = os.listdir(cache_dir)
+    (cache_dir / snapshot).write_bytes(b"not parquet")
+
+    df, error = load_cache.cached_load(loader, data_file, "DocVQA")
+    assert error is None and loader.calls == 2 and len(df) == 3
+    assert load_cache.cached_load(loader, data_file, "DocVQA")[0] is not None and loader.calls == 2
+
+
+def test_errors_and_missing_files_are_not_cached(cache_dir, data_file, tmp_path):
+    loader = Loader(error_msg="读取失败")
+    assert load_cache.cached_load(loader, data_file, "DocVQA") == (None, "读取失败")
+    assert not cache_dir.exists()
+
+    loader = Loader()
+    df, error = load_cache.cached_load(loader, str(tmp_path / "absent.xlsx"), "DocVQA")
+    assert error is None and len(df) == 3
+    assert not cache_dir.exists()
+
+
+def test_compact_frame_dtypes():
+    n = 10
+    df = pd.DataFrame({
+        "index": [str(i) for i in range(n)],
+        "image_path": [[f"{i}.jpg"] for i in range(n)],
+        "question": [f"question {i}" for i in range(n)],
+        "prediction": ["same"] * n,
+        "answer": [str(i) for i in range(n)],
+        "hit": [i % 2 for i in range(n)],
+        "category": ["math", "ocr"] * (n // 2),
+        "res": [f"res {i}" for i in range(n)],
+        "options": [["A", "B"]] * n,
+    })
+    before = df.dtypes.to_dict()
+    df = load_cache.compact_frame(df)
+
+    assert df["index"].dtype == before["index"] and df["image_path"].dtype == before["image_path"]
+    assert df["question"].dtype == pd.StringDtype("pyarrow") and df["prediction"].dtype == pd.StringDtype("pyarrow")
+    for col in ("answer", "hit", "category"):
+        assert isinstance(df[col].dtype, pd.CategoricalDtype), col
+    # 不同取值过多的文本列与不可哈希的列保持原样
+    assert df["res"].dtype == before["res"] and df["options"].dtype == before["options"]
+
+    report = df.attrs[load_cache.MEMORY_REPORT_ATTR]
+    assert set(report["columns"]) == set(df.columns) and report["columns"]["hit"]["dtype"] == "category"
+    assert load_cache.format_memory_report(df).endswith("%)")
+
+
+def test_compacted_snapshot_round_trip(cache_dir, data_file):
+    loader = Loader()
+    loader.df["hit"] = [1, 0, 1]
+    df, _ = load_cache.cached_load(loader, data_file, "DocVQA")
+    cached, _ = load_cache.cached_load(loader, data_file, "DocVQA")
+    assert loader.calls == 1
+    assert cached.dtypes.to_dict() == df.dtypes.to_dict()
+    assert cached["hit"].tolist() == [1, 0, 1]
+    # 快照读回后保留首次加载时的压缩前大小
+    assert cached.attrs[load_cache.MEMORY_REPORT_ATTR]["before_bytes"] == df.attrs[load_cache.MEMORY_REPORT_ATTR]["before_bytes"]
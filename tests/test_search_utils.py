@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+import search_utils
+
+# ===========================
+#      全文搜索
+# ===========================
+# 子串 / 整词 / 正则三种匹配方式，以及与 Hit 过滤叠加后的 filter_by_text。
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        "index": ["1", "2", "3", "4", "5"],
+        "question": ["Is the CAT black?", "Which category?", "concatenate strings", None, "猫在哪里"],
+        "prediction": ["yes", "B", "ab", "The cat", "在桌上"],
+        "answer": ["Yes", "A", "ab", 42, "桌上"],
+        "hit": [1, 0, 1, 0, 0],
+        "image_path": ["a.jpg"] * 5,
+    })
+
+
+def test_tokenize_lowercases_and_splits_chinese_by_char():
+    assert search_utils.tokenize("Hello, World-42!") == ["hello", "world", "42"]
+    assert search_utils.tokenize("猫在 cat") == ["猫", "在", "cat"]
+    assert search_utils.tokenize(None) == ["none"]
+
+
+def test_build_text_index_postings(df):
+    index = search_utils.build_text_index(df)
+    assert index["columns"] == ["question", "prediction", "answer"]
+    assert set(index) == {"columns", "postings"}
+
+    postings = index["postings"]
+    assert postings["cat"].dtype == np.int32
+    assert postings["cat"].tolist() == [0, 3]
+    assert postings["yes"].tolist() == [0]
+    assert postings["42"].tolist() == [3]
+    assert postings["猫"].tolist() == [4]
+    assert "category" in postings and "concatenate" in postings
+
+
+def test_substring_matches_partial_words(df):
+    matched, error_msg = search_utils.text_search(df, "cat")
+    assert error_msg is None
+    assert matched == [0, 1, 2, 3]
+
+
+def test_word_mode_matches_whole_tokens_only(df):
+    matched, error_msg = search_utils.text_search(df, "CAT", mode=search_utils.MODE_WORD)
+    assert error_msg is None
+    assert matched == [0, 3]
+    # 所有词元都要出现，但不要求相邻
+    assert search_utils.text_search(df, "black yes", mode=search_utils.MODE_WORD)[0] == [0]
+    assert search_utils.text_search(df, "cat missing", mode=search_utils.MODE_WORD)[0] == []
+    assert search_utils.text_search(df, "!!", mode=search_utils.MODE_WORD)[0] == []
+
+
+def test_word_mode_index_is_cached(df):
+    cache_key = ("test_search_utils", id(df))
+    first = search_utils.get_text_index(df, cache_key)
+    assert search_utils.get_text_index(df, cache_key) is first
+    assert search_utils.text_search(df, "cat", cache_key, mode=search_utils.MODE_WORD)[0] == [0, 3]
+
+
+def test_substring_searches_non_string_columns(df):
+    assert search_utils.text_search(df, "42")[0] == [3]
+    assert search_utils.text_search(df.astype({"question": "category"}), "categ")[0] == [1]
+
+
+def test_regex_query(df):
+    matched, error_msg = search_utils.text_search(df, r"re:^c\w+ate\b")
+    assert error_msg is None
+    assert matched == [2]
+    # 正则不受匹配方式影响，且使用 Python 的正则语法
+    assert search_utils.text_search(df, r"re:(?<=the )cat", mode=search_utils.MODE_WORD)[0] == [0, 3]
+
+
+def test_invalid_regex_returns_error(df):
+    matched, error_msg = search_utils.text_search(df, "re:(")
+    assert matched == []
+    assert error_msg.startswith("正则表达式错误")
+
+
+@pytest.mark.parametrize("mode, expected", [
+    (search_utils.MODE_SUBSTRING, ["2", "4"]),
+    (search_utils.MODE_WORD, ["4"]),
+])
+def test_filter_by_text_within_hit_filter(df, mode, expected):
+    df_display = df[df["hit"].isin([0])]
+    filtered, error_msg = search_utils.filter_by_text(df, df_display, "cat", mode=mode)
+    assert error_msg is None
+    assert filtered["index"].tolist() == expected
+    pd.testing.assert_frame_equal(filtered, df.loc[filtered.index])
+
+
+def test_filter_by_text_invalid_regex_keeps_nothing(df):
+    filtered, error_msg = search_utils.filter_by_text(df, df, "re:[")
+    assert filtered.empty
+    assert error_msg is not None
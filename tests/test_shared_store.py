@@ -0,0 +1,102 @@
+import threading
+import pytest
+import shared_store
+
+# ===========================
+#      进程内共享数据
+# ===========================
+# 检查 LRU 淘汰、版本替换、读取失败不缓存，以及并发时只构建一次。
+
+
+@pytest.fixture(autouse=True)
+def empty_store():
+    shared_store.clear()
+    yield
+    shared_store.clear()
+
+
+def _counting(value):
+    calls = []
+    return calls, lambda: calls.append(value) or value
+
+
+def test_lru_eviction():
+    cache = shared_store._SharedCache(2)
+    built = []
+    for slot in ("a", "b", "a", "c", "b"):
+        assert cache.get(slot, None, lambda slot=slot: built.append(slot) or slot) == slot
+    # "a" 最近被访问过，"c" 加入时淘汰 "b"，再次访问 "b" 时重新构建并淘汰 "a"
+    assert built == ["a", "b", "c", "b"]
+    assert len(cache) == 2 and list(cache._entries) == ["c", "b"]
+
+
+def test_get_derived_version_replaces_entry():
+    calls, builder = _counting("v1")
+    assert shared_store.get_derived("index_map", "key", builder, version=1) == "v1"
+    assert shared_store.get_derived("index_map", "key", builder, version=1) == "v1"
+    assert len(calls) == 1
+
+    calls2, builder2 = _counting("v2")
+    assert shared_store.get_derived("index_map", "key", builder2, version=2) == "v2"
+    assert len(calls2) == 1
+    # 新版本替换旧条目，不额外占用
+    assert shared_store.stats()["derived"] == 1
+
+    # 不同的键或种类各自缓存；键为 None 时每次都重新构建
+    shared_store.get_derived("text_index", "key", builder)
+    shared_store.get_derived("index_map", None, builder)
+    shared_store.get_derived("index_map", None, builder)
+    assert len(calls) == 4 and shared_store.stats()["derived"] == 2
+
+
+def test_get_frame_shares_object_and_reloads_on_token_change(tmp_path):
+    path = str(tmp_path / "a.xlsx")
+    frame = object()
+    calls, loader = _counting((frame, None))
+    assert shared_store.get_frame("AI2D", path, None, ("a", 1, 1), loader)[0] is frame
+    assert shared_store.get_frame("AI2D", path, None, ("a", 1, 1), loader)[0] is frame
+    assert len(calls) == 1
+
+    shared_store.get_frame("AI2D", path, None, ("a", 2, 1), loader)
+    shared_store.get_frame("MMMU", path, None, ("a", 2, 1), loader)
+    assert len(calls) == 3 and shared_store.stats()["frames"] == 2
+
+
+def test_get_frame_errors_are_not_kept(tmp_path):
+    path = str(tmp_path / "a.xlsx")
+    calls, loader = _counting((None, "读取失败"))
+    assert shared_store.get_frame("AI2D", path, None, None, loader) == (None, "读取失败")
+    assert shared_store.get_frame("AI2D", path, None, None, loader) == (None, "读取失败")
+    assert len(calls) == 2 and shared_store.stats()["frames"] == 0
+
+
+def test_concurrent_get_builds_once():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_builder():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(shared_store.get_derived("slow", "key", slow_builder)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    started.wait(5)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == ["value"] * 4 and len(calls) == 1
+
+
+def test_max_frames_env(monkeypatch):
+    monkeypatch.setenv(shared_store.SHARED_FRAMES_ENV, "3")
+    assert shared_store.get_max_frames() == 3
+    monkeypatch.setenv(shared_store.SHARED_FRAMES_ENV, "0")
+    assert shared_store.get_max_frames() == 1
+    monkeypatch.setenv(shared_store.SHARED_FRAMES_ENV, "many")
+    assert shared_store.get_max_frames() == shared_store.DEFAULT_MAX_SHARED_FRAMES